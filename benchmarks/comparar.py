@@ -0,0 +1,53 @@
+"""
+Compara dos resultados de benchmarks.ejecutar (por ejemplo de dos commits).
+
+    python -m benchmarks.comparar base.json nuevo.json [--umbral 0.1]
+
+Muestra el cambio de filas/segundo y de memoria de cada medición presente en
+ambos y termina con código 1 si alguna se volvió más lenta que el umbral.
+"""
+import argparse
+import json
+import sys
+from typing import Dict, Tuple
+
+UMBRAL = 0.1
+
+
+def _clave(fila: Dict) -> Tuple:
+    return fila['proyecto'], fila['objetivo'], fila['filas']
+
+
+def cargar(ruta: str) -> Dict:
+    with open(ruta, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def comparar(base: Dict, nuevo: Dict, umbral: float = UMBRAL) -> int:
+    """Imprime la comparación y retorna el número de regresiones mayores que umbral."""
+    anteriores = {_clave(fila): fila for fila in base['resultados'] if 'error' not in fila}
+    regresiones = 0
+    print(f"{base['commit']} -> {nuevo['commit']}")
+    for fila in nuevo['resultados']:
+        anterior = anteriores.get(_clave(fila))
+        if anterior is None or 'error' in fila or not anterior['filas_por_segundo'] or not fila['filas_por_segundo']:
+            continue
+        razon = fila['filas_por_segundo'] / anterior['filas_por_segundo']
+        marca = ''
+        if razon < 1 - umbral:
+            regresiones += 1
+            marca = '  ⚠️ regresión'
+        print(f"{fila['proyecto']:<26} {fila['objetivo']:<60} {fila['filas']:>8} "
+              f"{anterior['filas_por_segundo']:>12,.0f} -> {fila['filas_por_segundo']:>12,.0f} filas/s "
+              f"(x{razon:.2f}) {anterior['rss_max_mb']:>8} -> {fila['rss_max_mb']:>8} MB{marca}")
+    return regresiones
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compara dos resultados del benchmark.")
+    parser.add_argument('base')
+    parser.add_argument('nuevo')
+    parser.add_argument('--umbral', type=float, default=UMBRAL,
+                        help="Caída relativa de filas/segundo que se considera regresión")
+    args = parser.parse_args()
+    sys.exit(1 if comparar(cargar(args.base), cargar(args.nuevo), args.umbral) else 0)
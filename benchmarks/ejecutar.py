@@ -0,0 +1,159 @@
+"""
+Benchmark de rendimiento de los procesadores, validadores y endpoints.
+
+Para cada tamaño (10k, 100k y 1M filas por defecto) y cada proyecto genera una
+entrada sintética (ver benchmarks.generadores; se reutiliza entre ejecuciones)
+y mide, cada cosa en un proceso aparte:
+
+- El CSVProcessor del proyecto (procesar_csv en notificaciones).
+- Cada método de validación sobre las columnas de su tipo.
+- Los endpoints de normalización de main.py (carga directa y trabajos) y, con
+  los datos del proyecto de referencia, los de conversión y unión.
+
+Escribe filas/segundo y pico de memoria (RSS) en un JSON con el commit, que se
+compara con el de otro commit mediante benchmarks.comparar:
+
+    python -m benchmarks.ejecutar --filas 10000 100000 --proyectos DIAN_PQR_MUISCA
+    python -m benchmarks.comparar resultados-<base>.json resultados-<nuevo>.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+from typing import Dict, List
+
+from benchmarks.proyectos import ENDPOINTS_GENERALES, PROYECTOS, RAIZ
+
+FILAS = [10000, 100000, 1000000]
+OBJETIVOS = ('procesador', 'validadores', 'endpoints')
+PROYECTO_REFERENCIA = 'DIAN_PQR_MUISCA'
+# Filas sobre las que se miden los métodos de validación
+MUESTRA_VALIDADORES = 100000
+# Filas por bloque del motor vectorizado en el CSVProcessor (el valor por defecto de la API)
+BATCH_SIZE = 10000
+
+
+def commit_actual() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=RAIZ, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'desconocido'
+
+
+def ejecutar_tarea(tarea: Dict, directorio: str) -> List[Dict]:
+    """Corre una tarea de benchmarks.medir en un proceso nuevo y retorna sus resultados."""
+    fd, ruta_resultados = tempfile.mkstemp(suffix='.json', dir=directorio)
+    os.close(fd)
+    try:
+        proceso = subprocess.run([sys.executable, '-m', 'benchmarks.medir', json.dumps(tarea), ruta_resultados],
+                                 cwd=RAIZ, capture_output=True, text=True)
+        if proceso.returncode != 0:
+            objetivo = f"POST {tarea['ruta']}" if 'ruta' in tarea else tarea['tarea']
+            return [{"proyecto": tarea['proyecto'], "objetivo": objetivo,
+                     "filas": tarea['filas'], "error": proceso.stderr.strip()[-2000:]}]
+        with open(ruta_resultados, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    finally:
+        os.remove(ruta_resultados)
+
+
+def entrada(directorio: str, proyecto: str, filas: int, extension: str, args) -> str:
+    """Ruta de la entrada sintética del proyecto; la genera si no existe."""
+    ruta = os.path.join(directorio, 'datos', f"{proyecto}_{filas}_s{args.semilla}_{args.suciedad}.{extension}")
+    if not os.path.exists(ruta):
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        errores = ejecutar_tarea({'tarea': 'generar', 'proyecto': proyecto, 'filas': filas, 'ruta': ruta,
+                                  'semilla': args.semilla, 'suciedad': args.suciedad}, directorio)
+        if errores:
+            raise RuntimeError(f"No se pudo generar {ruta}: {errores[0]['error']}")
+    return ruta
+
+
+def main(argv=None) -> str:
+    parser = argparse.ArgumentParser(description="Benchmark de procesadores, validadores y endpoints.")
+    parser.add_argument('--filas', type=int, nargs='+', default=FILAS)
+    parser.add_argument('--proyectos', nargs='+', choices=sorted(PROYECTOS), default=list(PROYECTOS))
+    parser.add_argument('--objetivos', nargs='+', choices=OBJETIVOS, default=list(OBJETIVOS))
+    parser.add_argument('--proyecto-referencia', choices=sorted(PROYECTOS), default=PROYECTO_REFERENCIA,
+                        help="Proyecto cuyos datos se usan en los endpoints de conversión y unión")
+    parser.add_argument('--directorio', default=os.path.join(tempfile.gettempdir(), 'benchmarks'),
+                        help="Datos generados (se reutilizan) y archivos de trabajo")
+    parser.add_argument('--salida', help="JSON de resultados (por defecto resultados-<commit>.json en el directorio)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                        help="Filas por bloque del motor vectorizado (0 valida celda a celda)")
+    parser.add_argument('--muestra-validadores', type=int, default=MUESTRA_VALIDADORES)
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--suciedad', type=float, default=0.05)
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.directorio, exist_ok=True)
+    trabajo = tempfile.mkdtemp(dir=args.directorio, prefix='trabajo-')
+    commit = commit_actual()
+    resultados = []
+
+    def medir(tarea: Dict) -> None:
+        for fila in ejecutar_tarea(tarea, args.directorio):
+            resultados.append(fila)
+            if 'error' in fila:
+                print(f"❌ {fila['proyecto']} {fila['objetivo']} ({fila['filas']} filas): error", file=sys.stderr)
+            else:
+                print(f"{fila['proyecto']:<26} {fila['objetivo']:<60} {fila['filas']:>8} filas "
+                      f"{fila['filas_por_segundo'] or 0:>12,.0f} filas/s {fila['rss_max_mb']:>8} MB")
+
+    try:
+        for filas in args.filas:
+            for nombre in args.proyectos:
+                proyecto = PROYECTOS[nombre]
+                ruta_csv = entrada(args.directorio, nombre, filas, 'csv', args)
+                if 'procesador' in args.objetivos:
+                    medir({'tarea': 'procesador', 'proyecto': nombre, 'filas': filas, 'entrada': ruta_csv,
+                           'directorio': trabajo, 'workers': args.workers,
+                           'batch_size': args.batch_size})
+                if 'validadores' in args.objetivos:
+                    medir({'tarea': 'validadores', 'proyecto': nombre, 'filas': filas, 'entrada': ruta_csv,
+                           'muestra': args.muestra_validadores})
+                if 'endpoints' in args.objetivos and proyecto.endpoint:
+                    campos = {'nombre_archivo_salida': 'salida.csv', 'nombre_archivo_errores': 'errores.csv'}
+                    for ruta in (proyecto.endpoint, proyecto.endpoint.replace('/upload/', '/trabajos/')):
+                        medir({'tarea': 'endpoint', 'proyecto': nombre, 'filas': filas, 'entrada': ruta_csv,
+                               'directorio': trabajo, 'ruta': ruta, 'campos': campos, 'campo_archivos': 'file'})
+            if 'endpoints' in args.objetivos:
+                for ruta, (extension, campos, campo_archivos) in ENDPOINTS_GENERALES.items():
+                    try:
+                        ruta_entrada = entrada(args.directorio, args.proyecto_referencia, filas, extension, args)
+                    except RuntimeError as e:
+                        resultados.append({"proyecto": args.proyecto_referencia, "objetivo": f"POST {ruta}",
+                                           "filas": filas, "error": str(e)})
+                        continue
+                    medir({'tarea': 'endpoint', 'proyecto': args.proyecto_referencia, 'filas': filas,
+                           'entrada': ruta_entrada, 'directorio': trabajo, 'ruta': ruta, 'campos': campos,
+                           'campo_archivos': campo_archivos})
+    finally:
+        shutil.rmtree(trabajo, ignore_errors=True)
+
+    salida = args.salida or os.path.join(args.directorio, f"resultados-{commit}.json")
+    with open(salida, 'w', encoding='utf-8') as f:
+        json.dump({
+            "commit": commit,
+            "fecha": datetime.now().isoformat(timespec='seconds'),
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "cpus": os.cpu_count(),
+            "workers": args.workers,
+            "semilla": args.semilla,
+            "suciedad": args.suciedad,
+            "resultados": resultados,
+        }, f, ensure_ascii=False, indent=2)
+    print(f"✅ Resultados en {salida}")
+    return salida
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+"""
+Datos sintéticos con la forma de los archivos reales de cada proyecto.
+
+Cada columna se genera según su tipo en el type_mapping del proyecto y, con
+probabilidad `suciedad`, con los defectos que traen los archivos reales:
+
+- Nulos escritos como "$null$", "nan", "NULL" o "N.A".
+- Fechas en los formatos mezclados que aceptan los validadores (AAAA-MM-DD,
+  AAAA/MM/DD, DD/MM/AAAA, rangos) y algunas imposibles.
+- NIT con dígito de verificación (mod 11 de la DIAN), con puntos, con guion o
+  con basura alrededor.
+- Valores de catálogo (choice_*) tomados de valores_choice: canónicos, alias de
+  los diccionarios de reemplazo, en minúsculas, sin tildes o con errores de
+  digitación.
+- Textos con comas, saltos de línea, '|' y espacios sobrantes (entre comillas
+  en el CSV, como los exporta Excel).
+
+Los valores de cada columna se toman de un conjunto fijo por columna para que
+se repitan como en los archivos reales; la semilla hace que la salida sea la
+misma en cada ejecución.
+"""
+import csv
+import importlib
+import random
+import re
+import sys
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from benchmarks.proyectos import RAIZ, Proyecto
+from repository.nit import digito_verificacion
+from repository.normalizacion_texto import quitar_tildes
+
+DELIMITADOR = '|'
+FILAS_POR_BLOQUE = 50000
+NULOS = ['$null$', 'nan', 'NULL', 'N.A', '']
+# Valores distintos por columna según su tipo
+VALORES_POR_TIPO = {'nit': 200000, 'int': 50000, 'float': 50000, 'str': 20000}
+VALORES_POR_DEFECTO = 5000
+PALABRAS = [
+    'solicitud', 'derecho', 'petición', 'queja', 'reclamo', 'traslado', 'devolución', 'impuesto',
+    'renta', 'declaración', 'sanción', 'recurso', 'reconsideración', 'notificación', 'expediente',
+    'funcionario', 'contribuyente', 'aduana', 'régimen', 'información', 'respuesta', 'término',
+    'Bogotá', 'Medellín', 'Cali', 'Barranquilla', 'Bucaramanga', 'Cúcuta', 'Pereira', 'Ibagué',
+]
+FECHA_INICIAL = date(2015, 1, 1)
+DIAS = 4000
+
+
+def cargar_proyecto(proyecto: Proyecto):
+    """
+    Importa el módulo del procesador y el validador del proyecto como lo hacen sus
+    scripts (con el directorio del proyecto en sys.path). Retorna (módulo, validador).
+    """
+    for ruta in (RAIZ, proyecto.ruta):
+        if ruta not in sys.path:
+            sys.path.insert(0, ruta)
+    modulo = importlib.import_module(proyecto.procesador)
+    validador = None
+    if proyecto.validador:
+        modulo_validador, clase = proyecto.validador
+        validador = getattr(importlib.import_module(modulo_validador), clase)()
+    return modulo, validador
+
+
+def catalogos(modulo, validador, tipos: Sequence[str]) -> Dict[str, Tuple[List[str], List[str]]]:
+    """
+    Valores (canónicos, alias) de cada tipo choice_*: los del IndiceCatalogo y del
+    diccionario de reemplazo que usa el método del validador de ese tipo.
+    """
+    from repository.indice_catalogos import IndiceCatalogo
+
+    resultado = {}
+    metodos = getattr(getattr(modulo, 'CSVProcessor', None), 'VALIDATION_METHODS', {})
+    for tipo in tipos:
+        if not tipo.startswith('choice') or tipo not in metodos or validador is None:
+            continue
+        funcion = getattr(validador, metodos[tipo][0])
+        globales = funcion.__func__.__globals__
+        canonicos, alias = [], []
+        for nombre in funcion.__code__.co_names:
+            valor = globales.get(nombre)
+            if isinstance(valor, IndiceCatalogo):
+                canonicos.extend(sorted(valor.canonicos))
+            elif isinstance(valor, dict) and nombre.startswith('VALORES_REEMPLAZ'):
+                alias.extend(str(clave) for clave in valor)
+            elif isinstance(valor, (list, set, tuple)) and nombre.startswith('VALORES_'):
+                canonicos.extend(sorted(str(v) for v in valor))
+        if canonicos:
+            resultado[tipo] = (canonicos, alias)
+    return resultado
+
+
+def _error_digitacion(rng: random.Random, valor: str) -> str:
+    """Intercambia, borra o duplica una letra (como 'BUCARAMNAGA')."""
+    if len(valor) < 4:
+        return valor
+    i = rng.randrange(1, len(valor) - 2)
+    operacion = rng.randrange(3)
+    if operacion == 0:
+        return valor[:i] + valor[i + 1] + valor[i] + valor[i + 2:]
+    if operacion == 1:
+        return valor[:i] + valor[i + 1:]
+    return valor[:i] + valor[i] + valor[i:]
+
+
+class GeneradorColumna:
+    """Valores sintéticos de una columna según su tipo del type_mapping."""
+
+    def __init__(self, tipo: str, rng: random.Random, suciedad: float,
+                 catalogo: Optional[Tuple[List[str], List[str]]] = None):
+        self.tipo = tipo
+        self.rng = rng
+        self.suciedad = suciedad
+        self.catalogo = catalogo
+        distintos = VALORES_POR_TIPO.get(tipo, VALORES_POR_DEFECTO)
+        self.valores = [self.valor() for _ in range(distintos)]
+
+    def valor(self) -> str:
+        rng = self.rng
+        if rng.random() < self.suciedad / 2:
+            return rng.choice(NULOS)
+        sucio = rng.random() < self.suciedad
+        generar = getattr(self, '_' + self.tipo.replace('-', '_'), None)
+        if generar is None:
+            generar = self._choice if self.tipo.startswith('choice') else self._str
+        return generar(sucio)
+
+    def _int(self, sucio: bool) -> str:
+        numero = str(self.rng.randrange(0, 10 ** self.rng.randrange(1, 9)))
+        if sucio:
+            return self.rng.choice([numero + '.0', f' {numero} ', numero + 'A', '1.234.567'])
+        return numero
+
+    def _float(self, sucio: bool) -> str:
+        numero = f"{self.rng.uniform(0, 10 ** 8):.2f}"
+        if sucio:
+            return self.rng.choice([numero.replace('.', ','), f"${numero}", numero + ' COP', numero.split('.')[0]])
+        return numero
+
+    def _fecha(self) -> date:
+        return FECHA_INICIAL + timedelta(days=self.rng.randrange(DIAS))
+
+    def _date(self, sucio: bool) -> str:
+        fecha = self._fecha()
+        if sucio:
+            return self.rng.choice([
+                fecha.strftime('%Y/%m/%d'), fecha.strftime('%d/%m/%Y'), fecha.strftime('%d/%m/%Y %H:%M:%S'),
+                f"{fecha:%Y-%m-%d} - {fecha + timedelta(days=30):%Y-%m-%d}",
+                f"{fecha:%d/%m/%Y} - {fecha + timedelta(days=30):%d/%m/%Y}",
+                f"{fecha.year}-02-30", fecha.strftime('%Y%m%d'), 'SIN FECHA',
+            ])
+        return fecha.strftime('%Y-%m-%d')
+
+    def _datetime(self, sucio: bool) -> str:
+        fecha = self._fecha()
+        hora = f"{self.rng.randrange(24):02d}:{self.rng.randrange(60):02d}:{self.rng.randrange(60):02d}"
+        if sucio:
+            return self.rng.choice([
+                fecha.strftime('%Y-%m-%d'), f"{fecha:%d/%m/%Y} {hora}", f"{fecha:%Y/%m/%d} {hora}",
+                f"{fecha:%Y-%m-%d} {hora[:5]}", f"{fecha:%Y-%m-%d}T{hora}",
+            ])
+        return f"{fecha:%Y-%m-%d} {hora}"
+
+    def _nit(self, sucio: bool) -> str:
+        base = str(self.rng.choice([self.rng.randrange(800000000, 999999999),
+                                    self.rng.randrange(1000000, 1999999999)]))
+        dv = digito_verificacion(base)
+        if sucio:
+            con_puntos = f"{int(base):,}".replace(',', '.')
+            return self.rng.choice([
+                f"{con_puntos}-{dv}", f"{base}-{dv}", f"{base}{dv}", f"{base}.000000",
+                f" NIT {base} ", f"{base}-{(dv + 1) % 10}", base[:4],
+            ])
+        return base
+
+    def _choice(self, sucio: bool) -> str:
+        if not self.catalogo:
+            return self._str(sucio)
+        canonicos, alias = self.catalogo
+        valor = self.rng.choice(canonicos)
+        if sucio:
+            opciones = [valor.lower(), quitar_tildes(valor), f"  {valor} ", _error_digitacion(self.rng, valor)]
+            if alias:
+                opciones.append(self.rng.choice(alias))
+            return self.rng.choice(opciones)
+        return valor
+
+    def _expediente(self, sucio: bool) -> str:
+        anio = self.rng.randrange(2010, 2026)
+        valor = f"{self.rng.randrange(1, 99999):05d}-{anio}"
+        if sucio:
+            return self.rng.choice([f"EXP-{valor}", f"{valor} ", f"{anio}-{valor}", valor.replace('-', '/')])
+        return valor
+
+    def _str_sin_caracteres_especiales(self, sucio: bool) -> str:
+        valor = self._str(False)
+        if sucio:
+            return self.rng.choice([f"{valor} #{self.rng.randrange(100)}", f"«{valor}»", f"{valor} (Ñ) *", f"{valor};"])
+        return valor
+
+    def _str(self, sucio: bool) -> str:
+        valor = ' '.join(self.rng.choice(PALABRAS) for _ in range(self.rng.randrange(1, 6)))
+        if sucio:
+            return self.rng.choice([
+                f"{valor}, {self.rng.choice(PALABRAS)}", f"{valor}\n{self.rng.choice(PALABRAS)}",
+                f"{valor} | {self.rng.choice(PALABRAS)}", f"  {valor.upper()}  ", f'{valor} "{valor}"',
+            ])
+        return valor
+
+    def muestra(self, filas: int) -> List[str]:
+        return self.rng.choices(self.valores, k=filas)
+
+
+def tipos_columnas(columnas: Sequence[str], type_mapping: Dict[str, List[int]]) -> List[str]:
+    """Tipo de cada columna (posiciones del type_mapping desde 1; 'str' si no aparece)."""
+    tipos = ['str'] * len(columnas)
+    for tipo, posiciones in type_mapping.items():
+        for posicion in posiciones:
+            if 0 < posicion <= len(columnas) and tipos[posicion - 1] == 'str':
+                tipos[posicion - 1] = tipo
+    return tipos
+
+
+def generar_csv(ruta: str, columnas: Sequence[str], tipos: Sequence[str], filas: int,
+                catalogos_por_tipo: Optional[Dict[str, Tuple[List[str], List[str]]]] = None,
+                semilla: int = 0, suciedad: float = 0.05) -> None:
+    """Escribe un CSV separado por '|' con filas sintéticas de las columnas y tipos dados."""
+    rng = random.Random(semilla)
+    catalogos_por_tipo = catalogos_por_tipo or {}
+    generadores = [GeneradorColumna(tipo, rng, suciedad, catalogos_por_tipo.get(tipo)) for tipo in tipos]
+    # Las columnas de mes y archivo de los consolidados
+    for i, columna in enumerate(columnas):
+        if columna.upper() == 'MES_REPORTE':
+            generadores[i].valores = [f"{mes}_{anio}" for anio in range(2020, 2026) for mes in range(1, 13)]
+        elif columna.upper() == 'NOMBRE_ARCHIVO':
+            generadores[i].valores = [f"ARCHIVO_I{anio}{mes:02d}01.csv" for anio in range(2020, 2026) for mes in range(1, 13)]
+    with open(ruta, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f, delimiter=DELIMITADOR, lineterminator='\n')
+        writer.writerow(columnas)
+        restantes = filas
+        while restantes > 0:
+            n = min(restantes, FILAS_POR_BLOQUE)
+            writer.writerows(zip(*(generador.muestra(n) for generador in generadores)))
+            restantes -= n
+
+
+def _nombres_spss(columnas: Sequence[str]) -> List[str]:
+    """Nombres de variable válidos en SPSS (letra inicial, sin espacios, únicos)."""
+    nombres = []
+    for i, columna in enumerate(columnas):
+        nombre = re.sub(r'\W', '_', quitar_tildes(columna))[:60] or f"V{i}"
+        if not nombre[0].isalpha():
+            nombre = 'V' + nombre
+        while nombre.upper() in {n.upper() for n in nombres}:
+            nombre = f"{nombre}_{i}"
+        nombres.append(nombre)
+    return nombres
+
+
+def csv_a_xlsx(ruta_csv: str, ruta_xlsx: str) -> None:
+    """Copia el CSV a un libro de una hoja (xlsxwriter en modo de memoria constante)."""
+    import xlsxwriter
+
+    libro = xlsxwriter.Workbook(ruta_xlsx, {'constant_memory': True})
+    hoja = libro.add_worksheet('Hoja1')
+    with open(ruta_csv, 'r', newline='', encoding='utf-8') as f:
+        for fila, valores in enumerate(csv.reader(f, delimiter=DELIMITADOR)):
+            hoja.write_row(fila, 0, valores)
+    libro.close()
+
+
+def csv_a_sav(ruta_csv: str, ruta_sav: str) -> None:
+    """Copia el CSV a un archivo SPSS con todas las columnas como texto."""
+    import pandas as pd
+    import pyreadstat
+
+    df = pd.read_csv(ruta_csv, sep=DELIMITADOR, dtype=str, keep_default_na=False)
+    df.columns = _nombres_spss(list(df.columns))
+    pyreadstat.write_sav(df, ruta_sav)
@@ -0,0 +1,183 @@
+"""
+Mediciones del benchmark. Cada una corre en su propio proceso (ver
+benchmarks.ejecutar): los proyectos importan módulos con los mismos nombres
+(validadores, valores_choice) y el pico de memoria debe ser el de la medición.
+
+    python -m benchmarks.medir '<tarea en JSON>' resultados.json
+"""
+import csv
+import io
+import json
+import os
+import resource
+import sys
+import time
+from contextlib import redirect_stdout
+from typing import Dict, List
+
+from benchmarks.generadores import (
+    DELIMITADOR, cargar_proyecto, catalogos, csv_a_sav, csv_a_xlsx, generar_csv, tipos_columnas,
+)
+from benchmarks.proyectos import PROYECTOS, RAIZ, Proyecto, encabezados, type_mapping
+
+# Validadores de notificaciones, que no tiene CSVProcessor: tipo -> función del módulo
+FUNCIONES_NOTIFICACIONES = {
+    'int': 'validar_entero',
+    'float': 'validar_flotante',
+    'date': 'validar_fecha',
+    'datetime': 'validar_fecha_hora',
+    'nit': 'limpiar_nit',
+}
+# Segundos entre consultas del estado de un trabajo
+INTERVALO_TRABAJOS = 0.2
+
+
+def memoria() -> Dict[str, float]:
+    """Pico de memoria residente (MB) del proceso y de sus procesos hijos."""
+    propio = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    hijos = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return {"rss_max_mb": round(propio / 1024, 1), "rss_max_hijos_mb": round(hijos / 1024, 1)}
+
+
+def resultado(proyecto: str, objetivo: str, filas: int, segundos: float, **extra) -> Dict:
+    return {
+        "proyecto": proyecto,
+        "objetivo": objetivo,
+        "filas": filas,
+        "segundos": round(segundos, 3),
+        "filas_por_segundo": round(filas / segundos, 1) if segundos else None,
+        **memoria(),
+        **extra,
+    }
+
+
+def generar(proyecto: Proyecto, filas: int, ruta: str, semilla: int, suciedad: float) -> List[Dict]:
+    """Genera la entrada CSV del proyecto; las entradas .txt, .xlsx y .sav se derivan del CSV."""
+    base, extension = os.path.splitext(ruta)
+    ruta_csv = base + '.csv'
+    if not os.path.exists(ruta_csv):
+        modulo, validador = cargar_proyecto(proyecto)
+        columnas = encabezados(proyecto)
+        tipos = tipos_columnas(columnas, type_mapping(proyecto))
+        generar_csv(ruta_csv + '.tmp', columnas, tipos, filas, catalogos(modulo, validador, set(tipos)),
+                    semilla, suciedad)
+        os.replace(ruta_csv + '.tmp', ruta_csv)
+    if extension == '.txt':
+        os.link(ruta_csv, ruta)
+    elif extension == '.xlsx':
+        csv_a_xlsx(ruta_csv, ruta)
+    elif extension == '.sav':
+        csv_a_sav(ruta_csv, ruta)
+    return []
+
+
+def procesador(proyecto: Proyecto, filas: int, entrada: str, directorio: str, workers: int,
+               batch_size: int = 0) -> List[Dict]:
+    """Normalización completa del archivo con el CSVProcessor (o procesar_csv) del proyecto."""
+    modulo, validador = cargar_proyecto(proyecto)
+    mapping = type_mapping(proyecto)
+    salida = os.path.join(directorio, 'salida.csv')
+    errores = os.path.join(directorio, 'errores.csv')
+    inicio = time.perf_counter()
+    if hasattr(modulo, 'CSVProcessor'):
+        modulo.CSVProcessor(validator=validador).process_csv(entrada, salida, errores, mapping, workers=workers,
+                                                             batch_size=batch_size or None)
+        objetivo = 'CSVProcessor.process_csv'
+    else:
+        with redirect_stdout(io.StringIO()):
+            modulo.procesar_csv(entrada, salida, errores, mapping)
+        objetivo = 'procesar_csv'
+    return [resultado(proyecto.nombre, objetivo, filas, time.perf_counter() - inicio, workers=workers,
+                      batch_size=batch_size)]
+
+
+def validadores(proyecto: Proyecto, filas: int, entrada: str, muestra: int) -> List[Dict]:
+    """
+    Valores por segundo de cada método de validación sobre las columnas de su tipo
+    (primeras `muestra` filas, sin memoización; los vacíos se omiten como al procesar).
+    """
+    modulo, validador = cargar_proyecto(proyecto)
+    columnas = encabezados(proyecto)
+    tipos = tipos_columnas(columnas, type_mapping(proyecto))
+    clase = getattr(modulo, 'CSVProcessor', None)
+    limpiar = clase(validator=validador).clean_value if clase else str.strip
+    with open(entrada, 'r', newline='', encoding='utf-8') as f:
+        lector = csv.reader(f, delimiter=DELIMITADOR)
+        next(lector)
+        filas_muestra = [fila for _, fila in zip(range(muestra), lector)]
+
+    resultados = []
+    for tipo in sorted(set(tipos)):
+        if clase is not None:
+            if tipo not in clase.VALIDATION_METHODS:
+                continue
+            nombre = clase.VALIDATION_METHODS[tipo][0]
+            funcion = getattr(validador, nombre)
+            objetivo = f"{type(validador).__name__}.{nombre}"
+        elif tipo in FUNCIONES_NOTIFICACIONES:
+            nombre = FUNCIONES_NOTIFICACIONES[tipo]
+            funcion = getattr(modulo, nombre)
+            objetivo = nombre
+        else:
+            continue
+        indices = [i for i, t in enumerate(tipos) if t == tipo]
+        valores = [v for fila in filas_muestra if len(fila) == len(columnas)
+                   for v in (limpiar(fila[i]) for i in indices) if v]
+        inicio = time.perf_counter()
+        for valor in valores:
+            funcion(valor)
+        segundos = time.perf_counter() - inicio
+        resultados.append(resultado(
+            proyecto.nombre, objetivo, len(filas_muestra), segundos, tipo=tipo, valores=len(valores),
+            valores_por_segundo=round(len(valores) / segundos, 1) if segundos else None,
+        ))
+    return resultados
+
+
+def endpoint(proyecto: Proyecto, filas: int, entrada: str, directorio: str, ruta: str,
+             campos: Dict[str, str], campo_archivos: str) -> List[Dict]:
+    """Solicitud completa a un endpoint de main.py, incluido el envío de la respuesta."""
+    # Sin caché de resultados (cada repetición debe calcular) y con el espacio temporal aparte
+    os.environ['CACHE_RESULTADOS_MAX_BYTES'] = '0'
+    os.environ['ESPACIO_TEMPORAL_DIR'] = os.path.join(directorio, 'espacio_temporal')
+    cargar_proyecto(proyecto)
+    from fastapi.testclient import TestClient
+
+    import main
+
+    cliente = TestClient(main.app)
+    inicio = time.perf_counter()
+    with open(entrada, 'rb') as f:
+        archivos = [(campo_archivos, (os.path.basename(entrada), f))]
+        if ruta.endswith('/trabajos/'):
+            respuesta = cliente.post(ruta, files=archivos, data=campos)
+            trabajo = respuesta.json()
+            while trabajo.get("estado") in ("pendiente", "procesando"):
+                time.sleep(INTERVALO_TRABAJOS)
+                trabajo = cliente.get(f"/api/v1/trabajos/{trabajo['id']}/").json()
+            descarga = cliente.stream('GET', f"/api/v1/trabajos/{trabajo['id']}/descarga/")
+        else:
+            descarga = cliente.stream('POST', ruta, files=archivos, data=campos)
+        with descarga as respuesta:
+            enviados = sum(len(bloque) for bloque in respuesta.iter_bytes())
+            estado = respuesta.status_code
+    return [resultado(proyecto.nombre, f"POST {ruta}", filas, time.perf_counter() - inicio,
+                      estado_http=estado, bytes_respuesta=enviados)]
+
+
+TAREAS = {
+    'generar': generar,
+    'procesador': procesador,
+    'validadores': validadores,
+    'endpoint': endpoint,
+}
+
+
+if __name__ == "__main__":
+    tarea = json.loads(sys.argv[1])
+    nombre = tarea.pop('tarea')
+    proyecto_tarea = PROYECTOS[tarea.pop('proyecto')]
+    os.chdir(RAIZ)
+    resultados_tarea = TAREAS[nombre](proyecto_tarea, **tarea)
+    with open(sys.argv[2], 'w', encoding='utf-8') as f:
+        json.dump(resultados_tarea, f, ensure_ascii=False)
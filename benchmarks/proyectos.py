@@ -0,0 +1,107 @@
+"""
+Proyectos y endpoints que mide el benchmark.
+
+Los encabezados (REFERENCE_HEADERS) y el type_mapping de cada proyecto se leen
+del código del propio proyecto (el type_mapping del bloque __main__ del script
+de transformación), sin importarlo, para que los datos sintéticos sigan a los
+scripts cuando cambian.
+"""
+import ast
+import os
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@dataclass(frozen=True)
+class Proyecto:
+    nombre: str
+    # Directorio del proyecto (relativo a la raíz); se agrega a sys.path como en los scripts
+    directorio: str
+    # Módulo con CSVProcessor (o con procesar_csv en notificaciones), relativo al directorio
+    procesador: str
+    # (módulo, clase) del validador; None si el proyecto valida con funciones del procesador
+    validador: Optional[Tuple[str, str]]
+    # Módulo con REFERENCE_HEADERS (por defecto el del procesador)
+    encabezados: Optional[str] = None
+    # Endpoint de normalización de main.py que usa este proyecto
+    endpoint: Optional[str] = None
+
+    @property
+    def ruta(self) -> str:
+        return os.path.join(RAIZ, self.directorio)
+
+    def archivo(self, modulo: str) -> str:
+        return os.path.join(self.ruta, *modulo.split('.')) + '.py'
+
+
+PROYECTOS: Dict[str, Proyecto] = {proyecto.nombre: proyecto for proyecto in [
+    Proyecto('DIAN_PQR_DYNAMICS', 'repository/proyectos/DIAN/PQR', 'transformar_columnas_pqr_dynamics',
+             ('validadores.validadores_pqr_dynamics', 'ValidadoresPQRDynamics')),
+    Proyecto('DIAN_PQR_MUISCA', 'repository/proyectos/DIAN/PQR', 'transformar_columnas_pqr_muisca',
+             ('validadores.validadores_pqr_muisca', 'ValidadoresPQRMuisca'),
+             endpoint='/api/v1/normalizar-columnas/Dian/pqr/upload/'),
+    Proyecto('DIAN_DEFENSORIA', 'repository/proyectos/DIAN/defensoria', 'transformar_columnas_defensoria',
+             ('validadores.validadores_defensoria', 'ValidadoresDefensoria')),
+    Proyecto('DIAN_DISCIPLINARIOS', 'repository/proyectos/DIAN/disciplinarios', 'transformar_columnas_disciplinarios',
+             ('validadores.validadores_disciplinarios', 'ValidadoresDisciplinarios'),
+             endpoint='/api/v1/normalizar-columnas/Dian/disciplinarios/upload/'),
+    Proyecto('UGPP_PQR', 'repository/proyectos/UGPP/PQR', 'transformar_columnas_pqr_ugpp',
+             ('validadores.validadores_pqr_ugpp', 'ValidadoresPQRUGPP')),
+    Proyecto('UGPP_DISCIPLINARIOS', 'repository/proyectos/UGPP/disciplinarios', 'transformar_columnas_disciplinarios',
+             ('validadores.validadores_disciplianrios', 'ValidadoresDisciplinarios')),
+    Proyecto('COLJUEGOS_PQR', 'repository/proyectos/COLJUEGOS/pqr', 'transformar_columnas_pqr_coljuegos',
+             ('validadores.validadores_pqr_coljuegos', 'ValidadoresPQRColjuegos'),
+             endpoint='/api/v1/normalizar-columnas/coljuegos/pqr/upload/'),
+    Proyecto('COLJUEGOS_DISCIPLINARIOS', 'repository/proyectos/COLJUEGOS/disciplinarios',
+             'transformar_columnas_disciplinarios_col',
+             ('validadores.validadores_disciplianrios', 'ValidadoresDisciplinarios'),
+             endpoint='/api/v1/normalizar-columnas/coljuegos/disciplinarios/upload/'),
+    Proyecto('DIAN_NOTIFICACIONES', 'repository/proyectos/DIAN/notificaciones', 'codigo.transformar_columnas',
+             None, encabezados='codigo.reorganizar_columnas'),
+]}
+
+# Endpoints de conversión y unión que se miden con los datos de un proyecto de referencia:
+# ruta -> (extensión de la entrada, campos del formulario, campo de los archivos)
+ENDPOINTS_GENERALES: Dict[str, Tuple[str, Dict[str, str], str]] = {
+    '/unir-csv': ('csv', {}, 'files'),
+    '/api/v1/csv-a-otro-separador-upload/': ('csv', {'antiguo_separador': '|', 'nuevo_separador': ';'}, 'files'),
+    '/api/v1/txt-a-csv-upload/': ('txt', {'separador_entrada': '|', 'separador_salida': '|'}, 'files'),
+    '/api/v1/xlsx-a-csv-upload/': ('xlsx', {'separador_salida': '|'}, 'files'),
+    '/api/v1/xlsx-a-csv-con-columna-mes-de-reporte-upload/': ('xlsx', {'separador_salida': '|'}, 'files'),
+    '/api/v1/sav-a-csv-upload/': ('sav', {}, 'files'),
+    '/api/v1/unir-archivos-csv-en-xlsx-upload/': ('csv', {'separador_salida': '|'}, 'files'),
+}
+
+
+def valor_literal(ruta: str, nombre: str):
+    """Valor de la última asignación literal a nombre en el archivo (también dentro de bloques if)."""
+    with open(ruta, 'r', encoding='utf-8') as f:
+        arbol = ast.parse(f.read(), ruta)
+    valor = None
+    for nodo in ast.walk(arbol):
+        if isinstance(nodo, ast.Assign) and any(
+                isinstance(destino, ast.Name) and destino.id == nombre for destino in nodo.targets):
+            try:
+                valor = ast.literal_eval(nodo.value)
+            except ValueError:
+                # REFERENCE_HEADERS = REFERENCE_HEADERS en el cuerpo de CSVProcessor
+                continue
+    if valor is None:
+        raise LookupError(f"{nombre} no está definido en {ruta}")
+    return valor
+
+
+def encabezados(proyecto: Proyecto) -> List[str]:
+    """REFERENCE_HEADERS del proyecto."""
+    return valor_literal(proyecto.archivo(proyecto.encabezados or proyecto.procesador), 'REFERENCE_HEADERS')
+
+
+def type_mapping(proyecto: Proyecto) -> Dict[str, List[int]]:
+    """type_mapping (posiciones desde 1) del bloque __main__ del script del proyecto."""
+    ruta = proyecto.archivo(proyecto.procesador)
+    try:
+        return valor_literal(ruta, 'type_mapping')
+    except LookupError:
+        return valor_literal(ruta, 'tipos_por_posicion')
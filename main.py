@@ -1,15 +1,46 @@
-from fastapi import FastAPI, File, UploadFile, Body, Form
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi import FastAPI, File, UploadFile, Body, Form, Header
+from fastapi.responses import (
+    FileResponse,
+    JSONResponse,
+    PlainTextResponse,
+    Response,
+    StreamingResponse,
+)
 from fastapi.middleware.cors import CORSMiddleware
+import inspect
 import os
-import pandas as pd
-import tempfile
-from typing import List
-import zipfile
+from typing import List, Optional
 import csv
+import json
+import time
+from concurrent.futures import as_completed, wait
+from functools import partial
+from itertools import chain
+from starlette.background import BackgroundTask
+from repository.cache_resultados import CacheResultados, hash_archivo, version_codigo
+from repository.espacio_temporal import EspacioAgotado, EspacioTemporal
+from repository.metricas import CACHE, REGISTRO, MiddlewareMetricas, observar_etapa
+from repository.procesos import PROCESOS, cerrar_pool, pool_compartido
+from repository.trabajos import COMPLETADO, NOMBRE_ZIP, GestorTrabajos
+from repository.zip_en_streaming import TAMANO_BLOQUE, generar_zip
 
 app = FastAPI()
 
+# Detalle de los archivos que no se pudieron convertir, incluido en el ZIP
+ERRORES_CONVERSION = "errores_conversion.json"
+# Filas por bloque del motor vectorizado al normalizar columnas (0 valida celda a celda)
+NORMALIZAR_BATCH_SIZE = int(os.environ.get("NORMALIZAR_BATCH_SIZE", "10000"))
+# Formatos de salida de la normalización y de la unión de CSV
+FORMATOS_SALIDA = ("csv", "parquet")
+# Tipo de contenido de los resultados que se envían sin ZIP, por extensión
+TIPOS_MEDIA = {".csv": "text/csv", ".parquet": "application/vnd.apache.parquet"}
+# Primeros bytes de un ZIP: distinguen en la caché un ZIP de un archivo único
+FIRMA_ZIP = b"PK\x03\x04"
+# Resultados ya calculados por contenido de los archivos, parámetros y versión del código
+cache_resultados = CacheResultados()
+# Directorios de trabajo de las solicitudes, con cuota de disco compartida
+espacio_temporal = EspacioTemporal()
+
 # Permitir CORS para el frontend (ajusta el origen si es necesario)
 app.add_middleware(
     CORSMiddleware,
@@ -18,134 +49,373 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Duración de cada solicitud hasta terminar de enviar la respuesta (ver /metrics)
+app.add_middleware(MiddlewareMetricas)
+
+
+@app.exception_handler(EspacioAgotado)
+def espacio_agotado(request, exc):
+    return JSONResponse(
+        status_code=503,
+        content={"error": str(exc)},
+        headers={"Retry-After": str(espacio_temporal.reintento)},
+    )
+
+
+@app.on_event("shutdown")
+def cerrar_procesos():
+    cerrar_pool()
+
+
+def _respuesta_zip(archivos, nombre_zip, temp_dir=None, clave=None, confirmar=None):
+    """
+    Envía el ZIP de archivos ((ruta, nombre) o rutas) en streaming a medida que se
+    comprime cada miembro; temp_dir se elimina cuando termina el envío. Con clave,
+    el ZIP se guarda en la caché mientras se envía (si confirmar() lo permite) y se
+    responde con su ETag.
+    """
+    miembros = (
+        (archivo, os.path.basename(archivo)) if isinstance(archivo, str) else archivo
+        for archivo in archivos
+    )
+    contenido = generar_zip(miembros)
+    headers = {"Content-Disposition": f'attachment; filename="{nombre_zip}"'}
+    if clave is not None:
+        contenido = cache_resultados.guardar_mientras_envia(
+            clave, contenido, confirmar or (lambda: True)
+        )
+        headers["ETag"] = _etag(clave)
+    return StreamingResponse(
+        contenido,
+        media_type="application/zip",
+        headers=headers,
+        background=(
+            BackgroundTask(espacio_temporal.liberar, temp_dir) if temp_dir else None
+        ),
+    )
+
+
+def _tipo_media(nombre):
+    """Tipo de contenido de un resultado según su extensión."""
+    return TIPOS_MEDIA.get(
+        os.path.splitext(nombre)[1].lower(), "application/octet-stream"
+    )
+
+
+def _leer_en_bloques(ruta):
+    """Bytes del archivo en bloques de TAMANO_BLOQUE."""
+    with open(ruta, "rb") as origen:
+        yield from iter(partial(origen.read, TAMANO_BLOQUE), b"")
+
+
+def _respuesta_resultado(
+    archivos, nombre_zip, temp_dir=None, clave=None, tipo_media=None
+):
+    """
+    Como _respuesta_zip, pero si de los archivos [(ruta, nombre)] solo existe uno
+    se envía tal cual en streaming (con tipo_media o el de su extensión) en lugar
+    de comprimirlo en un ZIP de un solo miembro.
+    """
+    existentes = [(ruta, nombre) for ruta, nombre in archivos if os.path.exists(ruta)]
+    if len(existentes) != 1:
+        return _respuesta_zip(existentes, nombre_zip, temp_dir, clave)
+    [(ruta, nombre)] = existentes
+    contenido = _leer_en_bloques(ruta)
+    headers = {"Content-Disposition": f'attachment; filename="{nombre}"'}
+    if clave is not None:
+        contenido = cache_resultados.guardar_mientras_envia(
+            clave, contenido, lambda: True
+        )
+        headers["ETag"] = _etag(clave)
+    return StreamingResponse(
+        contenido,
+        media_type=tipo_media or _tipo_media(nombre),
+        headers=headers,
+        background=(
+            BackgroundTask(espacio_temporal.liberar, temp_dir) if temp_dir else None
+        ),
+    )
+
+
+def _etag(clave):
+    return f'"{clave}"'
+
+
+def _clave_cache(endpoint, codigo, entradas, *parametros):
+    """
+    Clave en la caché del resultado de endpoint para las entradas [(nombre, ruta)]
+    y los parámetros; codigo es el archivo o directorio del código que lo produce
+    (su versión forma parte de la clave). None si la caché está desactivada.
+    """
+    if not cache_resultados.activa:
+        return None
+    return cache_resultados.clave(
+        endpoint,
+        version_codigo(codigo),
+        [(nombre, hash_archivo(ruta)) for nombre, ruta in entradas],
+        list(parametros),
+    )
+
+
+def _respuesta_en_cache(clave, nombre_zip, if_none_match, temp_dir, unico=None):
+    """
+    Respuesta inmediata si el resultado de la clave ya se conoce: 304 si el cliente
+    envía su ETag en If-None-Match, o el resultado guardado en la caché. Si no es un
+    ZIP, es el archivo único (nombre, tipo_media) de _respuesta_resultado. None si
+    hay que calcularlo; si no, temp_dir se elimina.
+    """
+    if clave is None:
+        return None
+    etag = _etag(clave)
+    if if_none_match and etag in [valor.strip() for valor in if_none_match.split(",")]:
+        CACHE.sumar(cache="resultados", resultado="no_modificado")
+        espacio_temporal.liberar(temp_dir)
+        return Response(status_code=304, headers={"ETag": etag})
+    ruta = cache_resultados.obtener(clave)
+    if ruta is None:
+        CACHE.sumar(cache="resultados", resultado="fallo")
+        return None
+    CACHE.sumar(cache="resultados", resultado="acierto")
+    nombre, tipo_media = nombre_zip, "application/zip"
+    if unico is not None:
+        with open(ruta, "rb") as guardado:
+            if guardado.read(len(FIRMA_ZIP)) != FIRMA_ZIP:
+                nombre, tipo_media = unico
+    return FileResponse(
+        ruta,
+        media_type=tipo_media,
+        filename=nombre,
+        headers={"ETag": etag},
+        background=BackgroundTask(espacio_temporal.liberar, temp_dir),
+    )
+
+
+def _guardar_archivos(files, temp_dir):
+    """
+    Guarda los archivos cargados en temp_dir (reservando su espacio) y retorna
+    [(nombre, ruta)]. Si no caben en la cuota, libera temp_dir y lanza EspacioAgotado.
+    """
+    inicio = time.perf_counter()
+    entradas = []
+    try:
+        for file in files:
+            temp_input_path = os.path.join(temp_dir, file.filename)
+            espacio_temporal.guardar(file.file, temp_input_path)
+            entradas.append((file.filename, temp_input_path))
+    except EspacioAgotado:
+        espacio_temporal.liberar(temp_dir)
+        raise
+    observar_etapa("api", "carga", time.perf_counter() - inicio)
+    return entradas
+
+
+def _conversiones(convertir, entradas, temp_dir, args):
+    """
+    Ejecuta convertir(ruta, temp_dir, *args) por cada entrada en el pool compartido de
+    procesos y genera (nombre, ruta convertida, error) en orden de terminación.
+    """
+    if PROCESOS <= 1 or len(entradas) <= 1:
+        for nombre, ruta in entradas:
+            try:
+                yield nombre, convertir(ruta, temp_dir, *args), None
+            except Exception as e:
+                yield nombre, None, str(e)
+        return
+    pool = pool_compartido()
+    futuros = {}
+    try:
+        for nombre, ruta in entradas:
+            futuros[pool.submit(convertir, ruta, temp_dir, *args)] = nombre
+        for futuro in as_completed(futuros):
+            try:
+                yield futuros[futuro], futuro.result(), None
+            except Exception as e:
+                yield futuros[futuro], None, str(e)
+    finally:
+        # Si el cliente se desconecta no se inician las conversiones pendientes; las
+        # que ya corren terminan antes de liberar temp_dir
+        for futuro in futuros:
+            futuro.cancel()
+        wait(futuros)
+
+
+def _convertir_archivos(convertir, entradas, temp_dir, fallidos, *args):
+    """
+    Genera las rutas convertidas a medida que terminan y agrega a fallidos
+    {"archivo", "error"} por cada archivo que falla. Si hubo fallos y al menos una
+    conversión exitosa, al final genera también ERRORES_CONVERSION con el detalle.
+    """
+
+    def convertidas():
+        for nombre, ruta, error in _conversiones(convertir, entradas, temp_dir, args):
+            if error is None:
+                yield ruta
+            else:
+                fallidos.append({"archivo": nombre, "error": error})
+
+    return _con_errores_conversion(convertidas(), fallidos, temp_dir)
+
+
+def _con_errores_conversion(archivos, fallidos, temp_dir):
+    """
+    Genera las rutas de archivos y, si hubo fallos y al menos una conversión
+    exitosa, al final también ERRORES_CONVERSION con el detalle de fallidos.
+    """
+    convertidos = 0
+    for ruta in archivos:
+        convertidos += 1
+        yield ruta
+    if fallidos and convertidos:
+        ruta_errores = os.path.join(temp_dir, ERRORES_CONVERSION)
+        with open(ruta_errores, "w", encoding="utf-8") as f:
+            json.dump(fallidos, f, ensure_ascii=False, indent=2)
+        yield ruta_errores
+
+
+def _formato_no_soportado(formato):
+    """Respuesta 400 si el formato de salida no es uno de FORMATOS_SALIDA; si no, None."""
+    if formato in FORMATOS_SALIDA:
+        return None
+    return JSONResponse(
+        status_code=400,
+        content={
+            "error": f"Formato de salida no soportado: {formato}",
+            "formatos": list(FORMATOS_SALIDA),
+        },
+    )
+
+
+def _primero_y_resto(archivos):
+    """
+    Avanza el generador de conversión hasta el primer archivo convertido. Retorna
+    None si no se convirtió ninguno; si no, un iterador que empieza por ese archivo
+    y convierte el resto a medida que se envía el ZIP.
+    """
+    primero = next(archivos, None)
+    if primero is None:
+        return None
+    return chain([primero], archivos)
 
 
 @app.post("/unir-csv")
-def unir_csv(files: List[UploadFile] = File(...)):
-    def clean_value(val):
-        if isinstance(val, str) and val.endswith(".0"):
-            return val[:-2]
-        return val
+def unir_csv(files: List[UploadFile] = File(...), formato: str = Form("csv")):
+    from repository.unit_todos_csv import bloques_csv_unido, leer_cabecera
 
-    dataframes = []
+    no_soportado = _formato_no_soportado(formato)
+    if no_soportado:
+        return no_soportado
+    temp_dir = espacio_temporal.crear_directorio()
+    rutas = []
     for file in files:
         try:
-            # Guardar archivo temporalmente
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".csv") as tmp:
-                tmp.write(file.file.read())
-                tmp_path = tmp.name
-            df = pd.read_csv(tmp_path, delimiter="|", dtype=str)
-            df = df.applymap(clean_value)
-            dataframes.append(df)
-            os.unlink(tmp_path)
+            # Guardar archivo temporalmente y validar su cabecera
+            tmp_path = os.path.join(temp_dir, f"{len(rutas)}.csv")
+            espacio_temporal.guardar(file.file, tmp_path)
+            leer_cabecera(tmp_path)
+            rutas.append(tmp_path)
+        except EspacioAgotado:
+            espacio_temporal.liberar(temp_dir)
+            raise
         except Exception as e:
+            espacio_temporal.liberar(temp_dir)
             return JSONResponse(
                 status_code=500,
                 content={"error": f"Error al leer {file.filename}: {str(e)}"},
             )
 
-    if not dataframes:
+    if not rutas:
+        espacio_temporal.liberar(temp_dir)
         return JSONResponse(
             status_code=400, content={"error": "No se cargó ningún archivo válido."}
         )
-    else:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".csv") as out_tmp:
-            combined_df = pd.concat(dataframes, ignore_index=True)
-            combined_df.to_csv(out_tmp.name, sep="|", index=False)
-            out_path = out_tmp.name
-        return FileResponse(
-            out_path,
-            filename="consolidado_coljuegos_pqr_2021.csv",
-            media_type="text/csv",
+
+    # El consolidado se escribe completo antes de responder: una fila inválida de
+    # cualquier archivo se informa con un error en lugar de truncar la descarga
+    archivo_salida = os.path.join(temp_dir, f"consolidado_coljuegos_pqr_2021.{formato}")
+    try:
+        if formato == "parquet":
+            from repository.salida_parquet import escribir_union_parquet
+
+            escribir_union_parquet(rutas, archivo_salida)
+        else:
+            with open(archivo_salida, "w", newline="", encoding="utf-8") as salida:
+                for bloque in bloques_csv_unido(rutas):
+                    salida.write(bloque)
+    except Exception as e:
+        espacio_temporal.liberar(temp_dir)
+        return JSONResponse(
+            status_code=500, content={"error": f"Error al unir los archivos: {e}"}
         )
+    return FileResponse(
+        archivo_salida,
+        media_type=TIPOS_MEDIA[f".{formato}"],
+        filename=os.path.basename(archivo_salida),
+        background=BackgroundTask(espacio_temporal.liberar, temp_dir),
+    )
 
 
 @app.post("/api/v1/csv-a-otro-separador/")
 def csv_a_otro_separador(body: dict = Body(...)):
-    import io
-    import re
+    from repository.transformar.csv_a_otro_separador import convertir_separador
 
     lista_archivos_csv_at = body.get("lista_archivos_csv_at", [])
     antiguo_separador = body.get("antiguo_separador", "|@")
     nuevo_separador = body.get("nuevo_separador", "|")
 
-    archivos_convertidos = []
-    temp_dir = tempfile.mkdtemp()
-    for nombre_archivo_csv_at in lista_archivos_csv_at:
-        if not os.path.exists(nombre_archivo_csv_at):
-            continue
-        try:
-            nombre_archivo_base, _ = os.path.splitext(
-                os.path.basename(nombre_archivo_csv_at)
-            )
-            nombre_archivo_csv_pipe = nombre_archivo_base + ".csv"
-            archivo_salida = os.path.join(temp_dir, nombre_archivo_csv_pipe)
-            with open(
-                nombre_archivo_csv_at, "r", newline="", encoding="utf-8"
-            ) as infile, open(
-                archivo_salida, "w", newline="", encoding="utf-8"
-            ) as outfile:
-                coincidencia_fecha = re.search(r"I(\d{8})", nombre_archivo_csv_at)
-                mes_reporte = "Desconocido"
-                if coincidencia_fecha:
-                    fecha_str = coincidencia_fecha.group(1)
-                    anio = fecha_str[:4]
-                    mes = fecha_str[4:6]
-                    mes_reporte = f"{mes}_{anio}"
-                primera_linea = infile.readline().strip()
-                cabecera = primera_linea.split(antiguo_separador)
-                nueva_cabecera = ["nombre_archivo", "mes_reporte"] + cabecera
-                outfile.write(nuevo_separador.join(nueva_cabecera) + "\n")
-                for line in infile:
-                    campos = line.strip().split(antiguo_separador)
-                    nueva_linea = [
-                        os.path.basename(nombre_archivo_csv_at),
-                        mes_reporte,
-                    ] + campos
-                    outfile.write(nuevo_separador.join(nueva_linea) + "\n")
-            archivos_convertidos.append(archivo_salida)
-        except UnicodeDecodeError:
-            try:
-                with open(
-                    nombre_archivo_csv_at, "r", newline="", encoding="latin-1"
-                ) as infile_latin, open(
-                    archivo_salida, "w", newline="", encoding="utf-8"
-                ) as outfile:
-                    coincidencia_fecha = re.search(r"I(\d{8})", nombre_archivo_csv_at)
-                    mes_reporte = "Desconocido"
-                    if coincidencia_fecha:
-                        fecha_str = coincidencia_fecha.group(1)
-                        anio = fecha_str[:4]
-                        mes = fecha_str[4:6]
-                        mes_reporte = f"{mes}_{anio}"
-                    primera_linea = infile_latin.readline().strip()
-                    cabecera = primera_linea.split(antiguo_separador)
-                    nueva_cabecera = ["nombre_archivo", "mes_reporte"] + cabecera
-                    outfile.write(nuevo_separador.join(nueva_cabecera) + "\n")
-                    for line in infile_latin:
-                        campos = line.strip().split(antiguo_separador)
-                        nueva_linea = [
-                            os.path.basename(nombre_archivo_csv_at),
-                            mes_reporte,
-                        ] + campos
-                        outfile.write(nuevo_separador.join(nueva_linea) + "\n")
-                archivos_convertidos.append(archivo_salida)
-            except Exception as e_latin:
+    temp_dir = espacio_temporal.crear_directorio()
+    # Los archivos se leen del disco del servidor: se reserva el tamaño de sus salidas
+    try:
+        espacio_temporal.reservar(
+            temp_dir,
+            sum(
+                os.path.getsize(ruta)
+                for ruta in lista_archivos_csv_at
+                if os.path.isfile(ruta)
+            ),
+        )
+    except EspacioAgotado:
+        espacio_temporal.liberar(temp_dir)
+        raise
+
+    fallidos = []
+
+    def convertir():
+        for nombre_archivo_csv_at in lista_archivos_csv_at:
+            if not os.path.exists(nombre_archivo_csv_at):
+                fallidos.append(
+                    {"archivo": nombre_archivo_csv_at, "error": "El archivo no existe"}
+                )
                 continue
-        except Exception as e:
-            continue
-    if not archivos_convertidos:
+            try:
+                nombre_archivo_base, _ = os.path.splitext(
+                    os.path.basename(nombre_archivo_csv_at)
+                )
+                nombre_archivo_csv_pipe = nombre_archivo_base + ".csv"
+                archivo_salida = os.path.join(temp_dir, nombre_archivo_csv_pipe)
+                convertir_separador(
+                    nombre_archivo_csv_at,
+                    archivo_salida,
+                    os.path.basename(nombre_archivo_csv_at),
+                    antiguo_separador,
+                    nuevo_separador,
+                )
+                yield archivo_salida
+            except Exception as e:
+                fallidos.append({"archivo": nombre_archivo_csv_at, "error": str(e)})
+
+    archivos_convertidos = _primero_y_resto(
+        _con_errores_conversion(convertir(), fallidos, temp_dir)
+    )
+    if archivos_convertidos is None:
+        espacio_temporal.liberar(temp_dir)
         return JSONResponse(
-            status_code=400, content={"error": "No se pudo convertir ningún archivo."}
+            status_code=400,
+            content={
+                "error": "No se pudo convertir ningún archivo.",
+                "archivos_fallidos": fallidos,
+            },
         )
-    # Crear ZIP
-    zip_path = os.path.join(temp_dir, "csv_convertidos.zip")
-    with zipfile.ZipFile(zip_path, "w") as zipf:
-        for file in archivos_convertidos:
-            zipf.write(file, os.path.basename(file))
-    return FileResponse(
-        zip_path, filename="csv_convertidos.zip", media_type="application/zip"
-    )
+    return _respuesta_zip(archivos_convertidos, "csv_convertidos.zip", temp_dir)
 
 
 @app.post("/api/v1/csv-a-otro-separador-upload/")
@@ -153,115 +423,116 @@ def csv_a_otro_separador_upload(
     files: list[UploadFile] = File(...),
     antiguo_separador: str = Form("|@"),
     nuevo_separador: str = Form("|"),
+    if_none_match: Optional[str] = Header(None),
 ):
-    import re
-    import shutil
+    from repository.transformar.csv_a_otro_separador import convertir_separador
 
-    temp_dir = tempfile.mkdtemp()
-    archivos_convertidos = []
-    for file in files:
-        # Guardar archivo temporalmente
-        temp_input_path = os.path.join(temp_dir, file.filename)
-        with open(temp_input_path, "wb") as f:
-            shutil.copyfileobj(file.file, f)
-        try:
-            nombre_archivo_base, _ = os.path.splitext(os.path.basename(file.filename))
-            nombre_archivo_csv_pipe = nombre_archivo_base + ".csv"
-            archivo_salida = os.path.join(temp_dir, nombre_archivo_csv_pipe)
-            with open(
-                temp_input_path, "r", newline="", encoding="utf-8"
-            ) as infile, open(
-                archivo_salida, "w", newline="", encoding="utf-8"
-            ) as outfile:
-                coincidencia_fecha = re.search(r"I(\d{8})", file.filename)
-                mes_reporte = "Desconocido"
-                if coincidencia_fecha:
-                    fecha_str = coincidencia_fecha.group(1)
-                    anio = fecha_str[:4]
-                    mes = fecha_str[4:6]
-                    mes_reporte = f"{mes}_{anio}"
-                primera_linea = infile.readline().strip()
-                cabecera = primera_linea.split(antiguo_separador)
-                nueva_cabecera = ["nombre_archivo", "mes_reporte"] + cabecera
-                outfile.write(nuevo_separador.join(nueva_cabecera) + "\n")
-                for line in infile:
-                    campos = line.strip().split(antiguo_separador)
-                    nueva_linea = [file.filename, mes_reporte] + campos
-                    outfile.write(nuevo_separador.join(nueva_linea) + "\n")
-            archivos_convertidos.append(archivo_salida)
-        except UnicodeDecodeError:
+    temp_dir = espacio_temporal.crear_directorio()
+    # Se guardan todos antes de responder; la conversión avanza con el envío
+    entradas = _guardar_archivos(files, temp_dir)
+    clave = _clave_cache(
+        "csv-a-otro-separador",
+        inspect.getfile(convertir_separador),
+        entradas,
+        antiguo_separador,
+        nuevo_separador,
+    )
+    en_cache = _respuesta_en_cache(
+        clave, "csv_convertidos.zip", if_none_match, temp_dir
+    )
+    if en_cache:
+        return en_cache
+
+    fallidos = []
+
+    def convertir():
+        for nombre_archivo, temp_input_path in entradas:
             try:
-                with open(
-                    temp_input_path, "r", newline="", encoding="latin-1"
-                ) as infile_latin, open(
-                    archivo_salida, "w", newline="", encoding="utf-8"
-                ) as outfile:
-                    coincidencia_fecha = re.search(r"I(\d{8})", file.filename)
-                    mes_reporte = "Desconocido"
-                    if coincidencia_fecha:
-                        fecha_str = coincidencia_fecha.group(1)
-                        anio = fecha_str[:4]
-                        mes = fecha_str[4:6]
-                        mes_reporte = f"{mes}_{anio}"
-                    primera_linea = infile_latin.readline().strip()
-                    cabecera = primera_linea.split(antiguo_separador)
-                    nueva_cabecera = ["nombre_archivo", "mes_reporte"] + cabecera
-                    outfile.write(nuevo_separador.join(nueva_cabecera) + "\n")
-                    for line in infile_latin:
-                        campos = line.strip().split(antiguo_separador)
-                        nueva_linea = [file.filename, mes_reporte] + campos
-                        outfile.write(nuevo_separador.join(nueva_linea) + "\n")
-                archivos_convertidos.append(archivo_salida)
-            except Exception as e_latin:
-                continue
-        except Exception as e:
-            continue
-    if not archivos_convertidos:
+                nombre_archivo_base, _ = os.path.splitext(
+                    os.path.basename(nombre_archivo)
+                )
+                nombre_archivo_csv_pipe = nombre_archivo_base + ".csv"
+                archivo_salida = os.path.join(temp_dir, nombre_archivo_csv_pipe)
+                convertir_separador(
+                    temp_input_path,
+                    archivo_salida,
+                    nombre_archivo,
+                    antiguo_separador,
+                    nuevo_separador,
+                )
+                yield archivo_salida
+            except Exception as e:
+                fallidos.append({"archivo": nombre_archivo, "error": str(e)})
+
+    archivos_convertidos = _primero_y_resto(
+        _con_errores_conversion(convertir(), fallidos, temp_dir)
+    )
+    if archivos_convertidos is None:
+        espacio_temporal.liberar(temp_dir)
         return JSONResponse(
-            status_code=400, content={"error": "No se pudo convertir ningún archivo."}
+            status_code=400,
+            content={
+                "error": "No se pudo convertir ningún archivo.",
+                "archivos_fallidos": fallidos,
+            },
         )
-    # Crear ZIP
-    zip_path = os.path.join(temp_dir, "csv_convertidos.zip")
-    with zipfile.ZipFile(zip_path, "w") as zipf:
-        for file in archivos_convertidos:
-            zipf.write(file, os.path.basename(file))
-    return FileResponse(
-        zip_path, filename="csv_convertidos.zip", media_type="application/zip"
+    # Un ZIP al que le faltan archivos no se guarda en la caché
+    return _respuesta_zip(
+        archivos_convertidos,
+        "csv_convertidos.zip",
+        temp_dir,
+        clave,
+        confirmar=lambda: not fallidos,
     )
 
 
 @app.post("/api/v1/sav-a-csv-upload/")
-def sav_a_csv_upload(files: list[UploadFile] = File(...)):
-    import shutil
+def sav_a_csv_upload(
+    files: list[UploadFile] = File(...),
+    etiquetas: bool = Form(True),
+    if_none_match: Optional[str] = Header(None),
+):
+    from repository.transformar.sav_a_csv import convertir_sav_a_csv
 
-    temp_dir = tempfile.mkdtemp()
-    archivos_convertidos = []
-    for file in files:
-        # Guardar archivo temporalmente
-        temp_input_path = os.path.join(temp_dir, file.filename)
-        with open(temp_input_path, "wb") as f:
-            shutil.copyfileobj(file.file, f)
-        try:
-            nombre_archivo_base, _ = os.path.splitext(os.path.basename(file.filename))
-            nombre_archivo_csv = nombre_archivo_base + ".csv"
-            archivo_salida = os.path.join(temp_dir, nombre_archivo_csv)
-            df = pd.read_spss(temp_input_path)
-            df.to_csv(archivo_salida, index=False, sep="|")
-            archivos_convertidos.append(archivo_salida)
-        except Exception as e:
-            continue
-    if not archivos_convertidos:
+    temp_dir = espacio_temporal.crear_directorio()
+    # Se guardan todos antes de responder; la conversión avanza con el envío
+    entradas = _guardar_archivos(files, temp_dir)
+    # Con un solo archivo el pool compartido se usa para leer sus bloques en paralelo
+    if len(entradas) == 1:
+        procesos = PROCESOS
+        convertir = partial(convertir_sav_a_csv, pool=pool_compartido())
+    else:
+        procesos = 1
+        convertir = convertir_sav_a_csv
+    clave = _clave_cache(
+        "sav-a-csv", inspect.getfile(convertir_sav_a_csv), entradas, etiquetas
+    )
+    en_cache = _respuesta_en_cache(
+        clave, "csv_convertidos.zip", if_none_match, temp_dir
+    )
+    if en_cache:
+        return en_cache
+    fallidos = []
+    archivos_convertidos = _primero_y_resto(
+        _convertir_archivos(
+            convertir, entradas, temp_dir, fallidos, etiquetas, procesos
+        )
+    )
+    if archivos_convertidos is None:
+        espacio_temporal.liberar(temp_dir)
         return JSONResponse(
             status_code=400,
-            content={"error": "No se pudo convertir ningún archivo .sav."},
+            content={
+                "error": "No se pudo convertir ningún archivo .sav.",
+                "archivos_fallidos": fallidos,
+            },
         )
-    # Crear ZIP
-    zip_path = os.path.join(temp_dir, "csv_convertidos.zip")
-    with zipfile.ZipFile(zip_path, "w") as zipf:
-        for file in archivos_convertidos:
-            zipf.write(file, os.path.basename(file))
-    return FileResponse(
-        zip_path, filename="csv_convertidos.zip", media_type="application/zip"
+    return _respuesta_zip(
+        archivos_convertidos,
+        "csv_convertidos.zip",
+        temp_dir,
+        clave,
+        confirmar=lambda: not fallidos,
     )
 
 
@@ -270,206 +541,146 @@ def txt_a_csv_upload(
     files: list[UploadFile] = File(...),
     separador_entrada: str = Form("|"),
     separador_salida: str = Form("|"),
+    if_none_match: Optional[str] = Header(None),
 ):
-    import shutil
+    from repository.transformar.txt_a_csv import convertir_txt_a_csv
 
-    temp_dir = tempfile.mkdtemp()
-    archivos_convertidos = []
-    for file in files:
-        # Guardar archivo temporalmente
-        temp_input_path = os.path.join(temp_dir, file.filename)
-        with open(temp_input_path, "wb") as f:
-            shutil.copyfileobj(file.file, f)
-        try:
-            nombre_archivo_base, _ = os.path.splitext(os.path.basename(file.filename))
-            nombre_archivo_csv = nombre_archivo_base + "_CONVERTIDO.csv"
-            archivo_salida = os.path.join(temp_dir, nombre_archivo_csv)
-            with open(temp_input_path, "r", encoding="utf-8") as txt_file:
-                lines = txt_file.readlines()
-                if not lines:
-                    continue
-                with open(
-                    archivo_salida, "w", newline="", encoding="utf-8"
-                ) as csv_file:
-                    writer = csv.writer(csv_file, delimiter=separador_salida)
-                    for line in lines:
-                        line = line.strip()
-                        if not line:
-                            continue
-                        row = [field.strip() for field in line.split(separador_entrada)]
-                        writer.writerow(row)
-            archivos_convertidos.append(archivo_salida)
-        except Exception as e:
-            continue
-    if not archivos_convertidos:
+    temp_dir = espacio_temporal.crear_directorio()
+    # Se guardan todos antes de responder; la conversión avanza con el envío
+    entradas = _guardar_archivos(files, temp_dir)
+    clave = _clave_cache(
+        "txt-a-csv",
+        inspect.getfile(convertir_txt_a_csv),
+        entradas,
+        separador_entrada,
+        separador_salida,
+    )
+    en_cache = _respuesta_en_cache(
+        clave, "csv_convertidos.zip", if_none_match, temp_dir
+    )
+    if en_cache:
+        return en_cache
+    fallidos = []
+    archivos_convertidos = _primero_y_resto(
+        _convertir_archivos(
+            convertir_txt_a_csv,
+            entradas,
+            temp_dir,
+            fallidos,
+            separador_entrada,
+            separador_salida,
+        )
+    )
+    if archivos_convertidos is None:
+        espacio_temporal.liberar(temp_dir)
         return JSONResponse(
             status_code=400,
-            content={"error": "No se pudo convertir ningún archivo .txt."},
+            content={
+                "error": "No se pudo convertir ningún archivo .txt.",
+                "archivos_fallidos": fallidos,
+            },
         )
-    # Crear ZIP
-    zip_path = os.path.join(temp_dir, "csv_convertidos.zip")
-    with zipfile.ZipFile(zip_path, "w") as zipf:
-        for file in archivos_convertidos:
-            zipf.write(file, os.path.basename(file))
-    return FileResponse(
-        zip_path, filename="csv_convertidos.zip", media_type="application/zip"
+    return _respuesta_zip(
+        archivos_convertidos,
+        "csv_convertidos.zip",
+        temp_dir,
+        clave,
+        confirmar=lambda: not fallidos,
     )
 
 
 @app.post("/api/v1/xlsx-a-csv-con-columna-mes-de-reporte-upload/")
 def xlsx_a_csv_upload(
-    files: list[UploadFile] = File(...), separador_salida: str = Form("|")
+    files: list[UploadFile] = File(...),
+    separador_salida: str = Form("|"),
+    if_none_match: Optional[str] = Header(None),
 ):
-    import shutil
-    import re
-
-    temp_dir = tempfile.mkdtemp()
-    archivos_convertidos = []
-    MESES = {
-        "Enero": "01",
-        "Febrero": "02",
-        "Marzo": "03",
-        "Abril": "04",
-        "Mayo": "05",
-        "Junio": "06",
-        "Julio": "07",
-        "Agosto": "08",
-        "Septiembre": "09",
-        "Octubre": "10",
-        "Noviembre": "11",
-        "Diciembre": "12",
-    }
-    MESES_LOWER = {
-        "enero": "1",
-        "febrero": "2",
-        "marzo": "3",
-        "abril": "4",
-        "mayo": "5",
-        "junio": "6",
-        "julio": "7",
-        "agosto": "8",
-        "septiembre": "9",
-        "octubre": "10",
-        "noviembre": "11",
-        "diciembre": "12",
-    }
-    for file in files:
-        temp_input_path = os.path.join(temp_dir, file.filename)
-        with open(temp_input_path, "wb") as f:
-            shutil.copyfileobj(file.file, f)
-        try:
-            nombre_archivo_base, _ = os.path.splitext(os.path.basename(file.filename))
-            nombre_archivo_csv = (
-                nombre_archivo_base.replace(" ", "_")
-                .replace("de_", "")
-                .replace("de", "")
-                .replace(".", "_")
-                + ".csv"
-            )
-            archivo_salida = os.path.join(temp_dir, nombre_archivo_csv)
-            coincidencia = re.search(r"Mes_([A-Za-z]+)_(\d{4})", nombre_archivo_csv)
-            coincidencia_2 = re.search(
-                r"Mes_de_([A-Za-z]+)_de_(\d{4})", nombre_archivo_csv
-            )
-            coincidencia_fecha = re.search(r"I(\d{8})", nombre_archivo_csv)
-            coincidencia_pqr = re.search(r"(\d{4})-(\d{2})", nombre_archivo_csv)
-            coincidencia_dynamics = re.search(r"_(\w+)_(\d{4})_", nombre_archivo_csv)
-            mes_reporte = "Desconocido"
-            if coincidencia:
-                mes_nombre = coincidencia.group(1).capitalize()
-                anio = coincidencia.group(2)
-                mes_numero = MESES.get(mes_nombre)
-                if mes_numero:
-                    mes_reporte = f"{mes_numero}_{anio}"
-            elif coincidencia_2:
-                mes_nombre = coincidencia_2.group(1).capitalize()
-                anio = coincidencia_2.group(2)
-                mes_numero = MESES.get(mes_nombre)
-                if mes_numero:
-                    mes_reporte = f"{mes_numero}_{anio}"
-            if coincidencia_fecha:
-                fecha_str = coincidencia_fecha.group(1)
-                anio = fecha_str[:4]
-                mes = fecha_str[4:6]
-                mes_reporte = f"{mes}_{anio}"
-            if coincidencia_dynamics:
-                mes_nombre = coincidencia_dynamics.group(1).lower()
-                anio = coincidencia_dynamics.group(2)
-                mes_numero = MESES_LOWER.get(mes_nombre)
-                if mes_numero:
-                    mes_reporte = f"{mes_numero}_{anio}"
-            if coincidencia_pqr:
-                anio = coincidencia_pqr.group(1)
-                mes_numero = coincidencia_pqr.group(2)
-                mes_numero_sin_cero = str(int(mes_numero))
-                mes_reporte = f"{mes_numero_sin_cero}_{anio}"
-            df = pd.read_excel(temp_input_path)
-            if not df.empty and len(df) > 0:
-                df = df.iloc[1:]
-            df.insert(0, "nombre_archivo", nombre_archivo_base)
-            df.insert(1, "mes_reporte", mes_reporte)
-            df.to_csv(
-                archivo_salida, index=False, sep=separador_salida, encoding="utf-8"
-            )
-            archivos_convertidos.append(archivo_salida)
-        except Exception as e:
-            continue
-    if not archivos_convertidos:
+    from repository.transformar.xlsx_a_csv_add_col_mes_reporte import (
+        convertir_xlsx_a_csv_con_mes_reporte,
+    )
+
+    temp_dir = espacio_temporal.crear_directorio()
+    # Se guardan todos antes de responder; la conversión avanza con el envío
+    entradas = _guardar_archivos(files, temp_dir)
+    clave = _clave_cache(
+        "xlsx-a-csv-con-columna-mes-de-reporte",
+        inspect.getfile(convertir_xlsx_a_csv_con_mes_reporte),
+        entradas,
+        separador_salida,
+    )
+    en_cache = _respuesta_en_cache(
+        clave, "csv_convertidos.zip", if_none_match, temp_dir
+    )
+    if en_cache:
+        return en_cache
+    fallidos = []
+    archivos_convertidos = _primero_y_resto(
+        _convertir_archivos(
+            convertir_xlsx_a_csv_con_mes_reporte,
+            entradas,
+            temp_dir,
+            fallidos,
+            separador_salida,
+        )
+    )
+    if archivos_convertidos is None:
+        espacio_temporal.liberar(temp_dir)
         return JSONResponse(
             status_code=400,
-            content={"error": "No se pudo convertir ningún archivo .xlsx."},
+            content={
+                "error": "No se pudo convertir ningún archivo .xlsx.",
+                "archivos_fallidos": fallidos,
+            },
         )
-    # Crear ZIP
-    zip_path = os.path.join(temp_dir, "csv_convertidos.zip")
-    with zipfile.ZipFile(zip_path, "w") as zipf:
-        for file in archivos_convertidos:
-            zipf.write(file, os.path.basename(file))
-    return FileResponse(
-        zip_path, filename="csv_convertidos.zip", media_type="application/zip"
+    return _respuesta_zip(
+        archivos_convertidos,
+        "csv_convertidos.zip",
+        temp_dir,
+        clave,
+        confirmar=lambda: not fallidos,
     )
 
 
 @app.post("/api/v1/xlsx-a-csv-upload/")
 def xlsx_a_csv_con_columna_mes_de_reporte_upload(
-    files: list[UploadFile] = File(...), separador_salida: str = Form("|")
+    files: list[UploadFile] = File(...),
+    separador_salida: str = Form("|"),
+    if_none_match: Optional[str] = Header(None),
 ):
-    import shutil
+    from repository.transformar.xlsx_a_csv import convertir_xlsx_a_csv
 
-    temp_dir = tempfile.mkdtemp()
-    archivos_convertidos = []
-    for file in files:
-        temp_input_path = os.path.join(temp_dir, file.filename)
-        with open(temp_input_path, "wb") as f:
-            shutil.copyfileobj(file.file, f)
-        try:
-            nombre_archivo_base, _ = os.path.splitext(os.path.basename(file.filename))
-            nombre_archivo_csv = (
-                nombre_archivo_base.replace(" ", "_")
-                .replace("de_", "")
-                .replace("de", "")
-                .replace(".", "_")
-                + ".csv"
-            )
-            archivo_salida = os.path.join(temp_dir, nombre_archivo_csv)
-            df = pd.read_excel(temp_input_path)
-            df.to_csv(
-                archivo_salida, index=False, sep=separador_salida, encoding="utf-8"
-            )
-            archivos_convertidos.append(archivo_salida)
-        except Exception as e:
-            continue
-    if not archivos_convertidos:
+    temp_dir = espacio_temporal.crear_directorio()
+    # Se guardan todos antes de responder; la conversión avanza con el envío
+    entradas = _guardar_archivos(files, temp_dir)
+    clave = _clave_cache(
+        "xlsx-a-csv", inspect.getfile(convertir_xlsx_a_csv), entradas, separador_salida
+    )
+    en_cache = _respuesta_en_cache(
+        clave, "csv_convertidos.zip", if_none_match, temp_dir
+    )
+    if en_cache:
+        return en_cache
+    fallidos = []
+    archivos_convertidos = _primero_y_resto(
+        _convertir_archivos(
+            convertir_xlsx_a_csv, entradas, temp_dir, fallidos, separador_salida
+        )
+    )
+    if archivos_convertidos is None:
+        espacio_temporal.liberar(temp_dir)
         return JSONResponse(
             status_code=400,
-            content={"error": "No se pudo convertir ningún archivo .xlsx."},
+            content={
+                "error": "No se pudo convertir ningún archivo .xlsx.",
+                "archivos_fallidos": fallidos,
+            },
         )
-    # Crear ZIP
-    zip_path = os.path.join(temp_dir, "csv_convertidos.zip")
-    with zipfile.ZipFile(zip_path, "w") as zipf:
-        for file in archivos_convertidos:
-            zipf.write(file, os.path.basename(file))
-    return FileResponse(
-        zip_path, filename="csv_convertidos.zip", media_type="application/zip"
+    return _respuesta_zip(
+        archivos_convertidos,
+        "csv_convertidos.zip",
+        temp_dir,
+        clave,
+        confirmar=lambda: not fallidos,
     )
 
 
@@ -477,60 +688,22 @@ def xlsx_a_csv_con_columna_mes_de_reporte_upload(
 def unir_archivos_csv_en_xlsx_upload(
     files: list[UploadFile] = File(...), separador_salida: str = Form("|")
 ):
-    import shutil
+    from repository.unir_csv_en_excel import escribir_csv_en_excel
 
-    temp_dir = tempfile.mkdtemp()
-    rutas_csv = []
-    for file in files:
-        temp_input_path = os.path.join(temp_dir, file.filename)
-        with open(temp_input_path, "wb") as f:
-            shutil.copyfileobj(file.file, f)
-        rutas_csv.append(temp_input_path)
+    temp_dir = espacio_temporal.crear_directorio()
+    rutas_csv = [ruta for _, ruta in _guardar_archivos(files, temp_dir)]
     archivo_excel_salida = os.path.join(temp_dir, "Consolidado_Final.xlsx")
     try:
-        max_filas = 1048576  # Límite de filas en Excel
-        excel_data = {}
-        for ruta in rutas_csv:
-            try:
-                nombre_base = os.path.basename(ruta).replace(".csv", "")[:25]
-                data = []
-                with open(ruta, "r", encoding="utf-8") as archivo_csv:
-                    lector_csv = csv.reader(archivo_csv, delimiter=separador_salida)
-                    for fila in lector_csv:
-                        data.append(fila)
-                df = pd.DataFrame(data)
-                num_partes = (len(df) // max_filas) + 1
-                for i in range(num_partes):
-                    inicio = i * max_filas
-                    fin = (i + 1) * max_filas
-                    nombre_hoja = f"{nombre_base}_part{i+1}"[:31]
-                    excel_data[nombre_hoja] = df.iloc[inicio:fin]
-            except Exception as e:
-                continue
-        with pd.ExcelWriter(archivo_excel_salida) as writer:
-            for sheet_name, df in excel_data.items():
-                df.to_excel(writer, sheet_name=sheet_name, index=False, header=False)
+        # Filas en streaming hacia el libro; una hoja _partN por cada límite de Excel
+        escribir_csv_en_excel(rutas_csv, archivo_excel_salida, separador_salida)
     except Exception as e:
+        espacio_temporal.liberar(temp_dir)
         return JSONResponse(status_code=500, content={"error": f"Error general: {e}"})
-    # Crear ZIP
-    zip_path = os.path.join(temp_dir, "consolidado_xlsx.zip")
-    import zipfile
-
-    with zipfile.ZipFile(zip_path, "w") as zipf:
-        zipf.write(archivo_excel_salida, os.path.basename(archivo_excel_salida))
-    return FileResponse(
-        zip_path, filename="consolidado_xlsx.zip", media_type="application/zip"
-    )
+    return _respuesta_zip([archivo_excel_salida], "consolidado_xlsx.zip", temp_dir)
 
 
-@app.post("/api/v1/normalizar-columnas/coljuegos/disciplinarios/upload/")
-def normalizar_columnas_coljuegos_disciplinarios_upload(
-    file: UploadFile = File(...),
-    nombre_archivo_salida: str = Form(...),
-    nombre_archivo_errores: str = Form(...),
-):
-    import shutil
-    import zipfile
+def _normalizador_coljuegos_disciplinarios():
+    """CSVProcessor y type_mapping de COLJUEGOS disciplinarios."""
     from repository.proyectos.COLJUEGOS.disciplinarios.transformar_columnas_disciplinarios_col import (
         CSVProcessor,
     )
@@ -538,12 +711,6 @@ def normalizar_columnas_coljuegos_disciplinarios_upload(
         ValidadoresDisciplinarios,
     )
 
-    temp_dir = tempfile.mkdtemp()
-    temp_input_path = os.path.join(temp_dir, file.filename)
-    with open(temp_input_path, "wb") as f:
-        shutil.copyfileobj(file.file, f)
-    output_file = os.path.join(temp_dir, nombre_archivo_salida)
-    error_file = os.path.join(temp_dir, nombre_archivo_errores)
     # type_mapping como en el ejemplo del script
     type_mapping = {
         "int": [],
@@ -581,31 +748,75 @@ def normalizar_columnas_coljuegos_disciplinarios_upload(
         "choice_direccion_seccional": [12],
         "choice_proceso": [14],
     }
-    processor = CSVProcessor(validator=ValidadoresDisciplinarios())
+    return CSVProcessor(validator=ValidadoresDisciplinarios()), type_mapping
+
+
+@app.post("/api/v1/normalizar-columnas/coljuegos/disciplinarios/upload/")
+def normalizar_columnas_coljuegos_disciplinarios_upload(
+    file: UploadFile = File(...),
+    nombre_archivo_salida: str = Form(...),
+    nombre_archivo_errores: str = Form(...),
+    formato_salida: str = Form("csv"),
+    dv_valido: bool = Form(False),
+    if_none_match: Optional[str] = Header(None),
+):
+    no_soportado = _formato_no_soportado(formato_salida)
+    if no_soportado:
+        return no_soportado
+    temp_dir = espacio_temporal.crear_directorio()
+    [(_, temp_input_path)] = _guardar_archivos([file], temp_dir)
+    output_file = os.path.join(temp_dir, nombre_archivo_salida)
+    error_file = os.path.join(temp_dir, nombre_archivo_errores)
+    processor, type_mapping = _normalizador_coljuegos_disciplinarios()
+    processor.check_digit = dv_valido
+    # El directorio del proyecto incluye sus validadores y los catálogos de valores_choice
+    clave = _clave_cache(
+        "normalizar-columnas",
+        os.path.dirname(inspect.getfile(type(processor))),
+        [(file.filename, temp_input_path)],
+        nombre_archivo_salida,
+        nombre_archivo_errores,
+        formato_salida,
+        dv_valido,
+        type_mapping,
+    )
+    en_cache = _respuesta_en_cache(
+        clave,
+        "archivos_procesados.zip",
+        if_none_match,
+        temp_dir,
+        (nombre_archivo_salida, TIPOS_MEDIA[f".{formato_salida}"]),
+    )
+    if en_cache:
+        return en_cache
     try:
-        processor.process_csv(temp_input_path, output_file, error_file, type_mapping)
+        processor.process_csv(
+            temp_input_path,
+            output_file,
+            error_file,
+            type_mapping,
+            workers=PROCESOS,
+            batch_size=NORMALIZAR_BATCH_SIZE or None,
+            pool=pool_compartido(),
+            output_format=formato_salida,
+        )
     except Exception as e:
+        espacio_temporal.liberar(temp_dir)
         return JSONResponse(
             status_code=500, content={"error": f"Error procesando archivo: {e}"}
         )
-    # Crear ZIP con ambos archivos
-    zip_path = os.path.join(temp_dir, "archivos_procesados.zip")
-    with zipfile.ZipFile(zip_path, "w") as zipf:
-        zipf.write(output_file, nombre_archivo_salida)
-        zipf.write(error_file, nombre_archivo_errores)
-    return FileResponse(
-        zip_path, filename="archivos_procesados.zip", media_type="application/zip"
+    # ZIP con ambos archivos si hubo errores; si no, solo el de salida sin ZIP
+    return _respuesta_resultado(
+        [(output_file, nombre_archivo_salida), (error_file, nombre_archivo_errores)],
+        "archivos_procesados.zip",
+        temp_dir,
+        clave,
+        TIPOS_MEDIA[f".{formato_salida}"],
     )
 
 
-@app.post("/api/v1/normalizar-columnas/coljuegos/pqr/upload/")
-def normalizar_columnas_coljuegos_pqr_upload(
-    file: UploadFile = File(...),
-    nombre_archivo_salida: str = Form(...),
-    nombre_archivo_errores: str = Form(...),
-):
-    import shutil
-    import zipfile
+def _normalizador_coljuegos_pqr():
+    """CSVProcessor y type_mapping de COLJUEGOS pqr."""
     from repository.proyectos.COLJUEGOS.pqr.transformar_columnas_pqr_coljuegos import (
         CSVProcessor,
     )
@@ -613,12 +824,6 @@ def normalizar_columnas_coljuegos_pqr_upload(
         ValidadoresPQRColjuegos,
     )
 
-    temp_dir = tempfile.mkdtemp()
-    temp_input_path = os.path.join(temp_dir, file.filename)
-    with open(temp_input_path, "wb") as f:
-        shutil.copyfileobj(file.file, f)
-    output_file = os.path.join(temp_dir, nombre_archivo_salida)
-    error_file = os.path.join(temp_dir, nombre_archivo_errores)
     # type_mapping como en el ejemplo del script
     type_mapping = {
         "int": [],
@@ -632,31 +837,75 @@ def normalizar_columnas_coljuegos_pqr_upload(
         "choice_dependencia_asignada": [12],
         "choice_linea_negocio": [7],
     }
-    processor = CSVProcessor(validator=ValidadoresPQRColjuegos())
+    return CSVProcessor(validator=ValidadoresPQRColjuegos()), type_mapping
+
+
+@app.post("/api/v1/normalizar-columnas/coljuegos/pqr/upload/")
+def normalizar_columnas_coljuegos_pqr_upload(
+    file: UploadFile = File(...),
+    nombre_archivo_salida: str = Form(...),
+    nombre_archivo_errores: str = Form(...),
+    formato_salida: str = Form("csv"),
+    dv_valido: bool = Form(False),
+    if_none_match: Optional[str] = Header(None),
+):
+    no_soportado = _formato_no_soportado(formato_salida)
+    if no_soportado:
+        return no_soportado
+    temp_dir = espacio_temporal.crear_directorio()
+    [(_, temp_input_path)] = _guardar_archivos([file], temp_dir)
+    output_file = os.path.join(temp_dir, nombre_archivo_salida)
+    error_file = os.path.join(temp_dir, nombre_archivo_errores)
+    processor, type_mapping = _normalizador_coljuegos_pqr()
+    processor.check_digit = dv_valido
+    # El directorio del proyecto incluye sus validadores y los catálogos de valores_choice
+    clave = _clave_cache(
+        "normalizar-columnas",
+        os.path.dirname(inspect.getfile(type(processor))),
+        [(file.filename, temp_input_path)],
+        nombre_archivo_salida,
+        nombre_archivo_errores,
+        formato_salida,
+        dv_valido,
+        type_mapping,
+    )
+    en_cache = _respuesta_en_cache(
+        clave,
+        "archivos_procesados.zip",
+        if_none_match,
+        temp_dir,
+        (nombre_archivo_salida, TIPOS_MEDIA[f".{formato_salida}"]),
+    )
+    if en_cache:
+        return en_cache
     try:
-        processor.process_csv(temp_input_path, output_file, error_file, type_mapping)
+        processor.process_csv(
+            temp_input_path,
+            output_file,
+            error_file,
+            type_mapping,
+            workers=PROCESOS,
+            batch_size=NORMALIZAR_BATCH_SIZE or None,
+            pool=pool_compartido(),
+            output_format=formato_salida,
+        )
     except Exception as e:
+        espacio_temporal.liberar(temp_dir)
         return JSONResponse(
             status_code=500, content={"error": f"Error procesando archivo: {e}"}
         )
-    # Crear ZIP con ambos archivos
-    zip_path = os.path.join(temp_dir, "archivos_procesados.zip")
-    with zipfile.ZipFile(zip_path, "w") as zipf:
-        zipf.write(output_file, nombre_archivo_salida)
-        zipf.write(error_file, nombre_archivo_errores)
-    return FileResponse(
-        zip_path, filename="archivos_procesados.zip", media_type="application/zip"
+    # ZIP con ambos archivos si hubo errores; si no, solo el de salida sin ZIP
+    return _respuesta_resultado(
+        [(output_file, nombre_archivo_salida), (error_file, nombre_archivo_errores)],
+        "archivos_procesados.zip",
+        temp_dir,
+        clave,
+        TIPOS_MEDIA[f".{formato_salida}"],
     )
 
 
-@app.post("/api/v1/normalizar-columnas/Dian/disciplinarios/upload/")
-def normalizar_columnas_dian_disciplinarios_upload(
-    file: UploadFile = File(...),
-    nombre_archivo_salida: str = Form(...),
-    nombre_archivo_errores: str = Form(...),
-):
-    import shutil
-    import zipfile
+def _normalizador_dian_disciplinarios():
+    """CSVProcessor y type_mapping de DIAN disciplinarios."""
     from repository.proyectos.DIAN.disciplinarios.transformar_columnas_disciplinarios import (
         CSVProcessor,
     )
@@ -664,12 +913,6 @@ def normalizar_columnas_dian_disciplinarios_upload(
         ValidadoresDisciplinarios,
     )
 
-    temp_dir = tempfile.mkdtemp()
-    temp_input_path = os.path.join(temp_dir, file.filename)
-    with open(temp_input_path, "wb") as f:
-        shutil.copyfileobj(file.file, f)
-    output_file = os.path.join(temp_dir, nombre_archivo_salida)
-    error_file = os.path.join(temp_dir, nombre_archivo_errores)
     # type_mapping como en el ejemplo del script
     type_mapping = {
         "int": [],
@@ -716,31 +959,75 @@ def normalizar_columnas_dian_disciplinarios_upload(
         "choice_direccion_seccional": [12],
         "expediente": [3],
     }
-    processor = CSVProcessor(validator=ValidadoresDisciplinarios())
+    return CSVProcessor(validator=ValidadoresDisciplinarios()), type_mapping
+
+
+@app.post("/api/v1/normalizar-columnas/Dian/disciplinarios/upload/")
+def normalizar_columnas_dian_disciplinarios_upload(
+    file: UploadFile = File(...),
+    nombre_archivo_salida: str = Form(...),
+    nombre_archivo_errores: str = Form(...),
+    formato_salida: str = Form("csv"),
+    dv_valido: bool = Form(False),
+    if_none_match: Optional[str] = Header(None),
+):
+    no_soportado = _formato_no_soportado(formato_salida)
+    if no_soportado:
+        return no_soportado
+    temp_dir = espacio_temporal.crear_directorio()
+    [(_, temp_input_path)] = _guardar_archivos([file], temp_dir)
+    output_file = os.path.join(temp_dir, nombre_archivo_salida)
+    error_file = os.path.join(temp_dir, nombre_archivo_errores)
+    processor, type_mapping = _normalizador_dian_disciplinarios()
+    processor.check_digit = dv_valido
+    # El directorio del proyecto incluye sus validadores y los catálogos de valores_choice
+    clave = _clave_cache(
+        "normalizar-columnas",
+        os.path.dirname(inspect.getfile(type(processor))),
+        [(file.filename, temp_input_path)],
+        nombre_archivo_salida,
+        nombre_archivo_errores,
+        formato_salida,
+        dv_valido,
+        type_mapping,
+    )
+    en_cache = _respuesta_en_cache(
+        clave,
+        "archivos_procesados.zip",
+        if_none_match,
+        temp_dir,
+        (nombre_archivo_salida, TIPOS_MEDIA[f".{formato_salida}"]),
+    )
+    if en_cache:
+        return en_cache
     try:
-        processor.process_csv(temp_input_path, output_file, error_file, type_mapping)
+        processor.process_csv(
+            temp_input_path,
+            output_file,
+            error_file,
+            type_mapping,
+            workers=PROCESOS,
+            batch_size=NORMALIZAR_BATCH_SIZE or None,
+            pool=pool_compartido(),
+            output_format=formato_salida,
+        )
     except Exception as e:
+        espacio_temporal.liberar(temp_dir)
         return JSONResponse(
             status_code=500, content={"error": f"Error procesando archivo: {e}"}
         )
-    # Crear ZIP con ambos archivos
-    zip_path = os.path.join(temp_dir, "archivos_procesados.zip")
-    with zipfile.ZipFile(zip_path, "w") as zipf:
-        zipf.write(output_file, nombre_archivo_salida)
-        zipf.write(error_file, nombre_archivo_errores)
-    return FileResponse(
-        zip_path, filename="archivos_procesados.zip", media_type="application/zip"
+    # ZIP con ambos archivos si hubo errores; si no, solo el de salida sin ZIP
+    return _respuesta_resultado(
+        [(output_file, nombre_archivo_salida), (error_file, nombre_archivo_errores)],
+        "archivos_procesados.zip",
+        temp_dir,
+        clave,
+        TIPOS_MEDIA[f".{formato_salida}"],
     )
 
 
-@app.post("/api/v1/normalizar-columnas/Dian/pqr/upload/")
-def normalizar_columnas_dian_pqr_upload(
-    file: UploadFile = File(...),
-    nombre_archivo_salida: str = Form(...),
-    nombre_archivo_errores: str = Form(...),
-):
-    import shutil
-    import zipfile
+def _normalizador_dian_pqr():
+    """CSVProcessor y type_mapping de DIAN pqr."""
     from repository.proyectos.DIAN.PQR.transformar_columnas_pqr_muisca import (
         CSVProcessor,
     )
@@ -748,12 +1035,6 @@ def normalizar_columnas_dian_pqr_upload(
         ValidadoresPQRMuisca,
     )
 
-    temp_dir = tempfile.mkdtemp()
-    temp_input_path = os.path.join(temp_dir, file.filename)
-    with open(temp_input_path, "wb") as f:
-        shutil.copyfileobj(file.file, f)
-    output_file = os.path.join(temp_dir, nombre_archivo_salida)
-    error_file = os.path.join(temp_dir, nombre_archivo_errores)
     # type_mapping como en el ejemplo del script
     type_mapping = {
         "int": [],
@@ -790,18 +1071,162 @@ def normalizar_columnas_dian_pqr_upload(
         "choice_estado_solicitud": [17],
         "choice_direccion_seccional": [18, 23, 29],
     }
-    processor = CSVProcessor(validator=ValidadoresPQRMuisca())
+    return CSVProcessor(validator=ValidadoresPQRMuisca()), type_mapping
+
+
+@app.post("/api/v1/normalizar-columnas/Dian/pqr/upload/")
+def normalizar_columnas_dian_pqr_upload(
+    file: UploadFile = File(...),
+    nombre_archivo_salida: str = Form(...),
+    nombre_archivo_errores: str = Form(...),
+    formato_salida: str = Form("csv"),
+    dv_valido: bool = Form(False),
+    if_none_match: Optional[str] = Header(None),
+):
+    no_soportado = _formato_no_soportado(formato_salida)
+    if no_soportado:
+        return no_soportado
+    temp_dir = espacio_temporal.crear_directorio()
+    [(_, temp_input_path)] = _guardar_archivos([file], temp_dir)
+    output_file = os.path.join(temp_dir, nombre_archivo_salida)
+    error_file = os.path.join(temp_dir, nombre_archivo_errores)
+    processor, type_mapping = _normalizador_dian_pqr()
+    processor.check_digit = dv_valido
+    # El directorio del proyecto incluye sus validadores y los catálogos de valores_choice
+    clave = _clave_cache(
+        "normalizar-columnas",
+        os.path.dirname(inspect.getfile(type(processor))),
+        [(file.filename, temp_input_path)],
+        nombre_archivo_salida,
+        nombre_archivo_errores,
+        formato_salida,
+        dv_valido,
+        type_mapping,
+    )
+    en_cache = _respuesta_en_cache(
+        clave,
+        "archivos_procesados.zip",
+        if_none_match,
+        temp_dir,
+        (nombre_archivo_salida, TIPOS_MEDIA[f".{formato_salida}"]),
+    )
+    if en_cache:
+        return en_cache
     try:
-        processor.process_csv(temp_input_path, output_file, error_file, type_mapping)
+        processor.process_csv(
+            temp_input_path,
+            output_file,
+            error_file,
+            type_mapping,
+            workers=PROCESOS,
+            batch_size=NORMALIZAR_BATCH_SIZE or None,
+            pool=pool_compartido(),
+            output_format=formato_salida,
+        )
     except Exception as e:
+        espacio_temporal.liberar(temp_dir)
         return JSONResponse(
             status_code=500, content={"error": f"Error procesando archivo: {e}"}
         )
-    # Crear ZIP con ambos archivos
-    zip_path = os.path.join(temp_dir, "archivos_procesados.zip")
-    with zipfile.ZipFile(zip_path, "w") as zipf:
-        zipf.write(output_file, nombre_archivo_salida)
-        zipf.write(error_file, nombre_archivo_errores)
-    return FileResponse(
-        zip_path, filename="archivos_procesados.zip", media_type="application/zip"
+    # ZIP con ambos archivos si hubo errores; si no, solo el de salida sin ZIP
+    return _respuesta_resultado(
+        [(output_file, nombre_archivo_salida), (error_file, nombre_archivo_errores)],
+        "archivos_procesados.zip",
+        temp_dir,
+        clave,
+        TIPOS_MEDIA[f".{formato_salida}"],
+    )
+
+
+NORMALIZADORES = {
+    ("coljuegos", "disciplinarios"): _normalizador_coljuegos_disciplinarios,
+    ("coljuegos", "pqr"): _normalizador_coljuegos_pqr,
+    ("Dian", "disciplinarios"): _normalizador_dian_disciplinarios,
+    ("Dian", "pqr"): _normalizador_dian_pqr,
+}
+gestor_trabajos = GestorTrabajos(espacio=espacio_temporal)
+
+
+@app.post("/api/v1/normalizar-columnas/{proyecto}/{tipo}/trabajos/")
+def crear_trabajo_normalizar_columnas(
+    proyecto: str,
+    tipo: str,
+    file: UploadFile = File(...),
+    nombre_archivo_salida: str = Form(...),
+    nombre_archivo_errores: str = Form(...),
+    formato_salida: str = Form("csv"),
+    dv_valido: bool = Form(False),
+):
+    """Encola la normalización y retorna el id del trabajo sin esperar el resultado."""
+    normalizador = NORMALIZADORES.get((proyecto, tipo))
+    if normalizador is None:
+        return JSONResponse(
+            status_code=404,
+            content={"error": f"No hay normalizador para {proyecto}/{tipo}"},
+        )
+    no_soportado = _formato_no_soportado(formato_salida)
+    if no_soportado:
+        return no_soportado
+    temp_dir = espacio_temporal.crear_directorio()
+    [(_, temp_input_path)] = _guardar_archivos([file], temp_dir)
+    output_file = os.path.join(temp_dir, nombre_archivo_salida)
+    error_file = os.path.join(temp_dir, nombre_archivo_errores)
+    processor, type_mapping = normalizador()
+    processor.check_digit = dv_valido
+
+    def ejecucion(progreso):
+        processor.process_csv(
+            temp_input_path,
+            output_file,
+            error_file,
+            type_mapping,
+            workers=PROCESOS,
+            batch_size=NORMALIZAR_BATCH_SIZE or None,
+            pool=pool_compartido(),
+            progress=progreso,
+            output_format=formato_salida,
+        )
+        return [
+            (output_file, nombre_archivo_salida),
+            (error_file, nombre_archivo_errores),
+        ]
+
+    trabajo = gestor_trabajos.enviar(file.filename, temp_dir, ejecucion)
+    return JSONResponse(status_code=202, content=trabajo.resumen())
+
+
+@app.get("/api/v1/trabajos/{trabajo_id}/")
+def estado_trabajo(trabajo_id: str):
+    trabajo = gestor_trabajos.obtener(trabajo_id)
+    if trabajo is None:
+        return JSONResponse(status_code=404, content={"error": "Trabajo no encontrado"})
+    return trabajo.resumen()
+
+
+@app.get("/api/v1/trabajos/{trabajo_id}/descarga/")
+def descargar_trabajo(trabajo_id: str):
+    trabajo = gestor_trabajos.obtener(trabajo_id)
+    if trabajo is None:
+        return JSONResponse(status_code=404, content={"error": "Trabajo no encontrado"})
+    if trabajo.estado != COMPLETADO:
+        return JSONResponse(
+            status_code=409,
+            content={"error": f"El trabajo está {trabajo.estado}", **trabajo.resumen()},
+        )
+    return _respuesta_resultado(trabajo.archivos, NOMBRE_ZIP)
+
+
+@app.post("/api/v1/trabajos/{trabajo_id}/cancelar/")
+def cancelar_trabajo(trabajo_id: str):
+    trabajo = gestor_trabajos.cancelar(trabajo_id)
+    if trabajo is None:
+        return JSONResponse(status_code=404, content={"error": "Trabajo no encontrado"})
+    return trabajo.resumen()
+
+
+@app.get("/metrics")
+def metrics():
+    """Métricas en el formato de texto de Prometheus (ver repository.metricas)."""
+    return PlainTextResponse(
+        REGISTRO.texto(), media_type="text/plain; version=0.0.4; charset=utf-8"
     )
@@ -0,0 +1,260 @@
+"""
+Almacén de consolidados particionado por proyecto y mes_reporte.
+
+En lugar de volver a leer todos los archivos históricos para agregar un mes,
+cada archivo se ingesta una sola vez en particiones por mes:
+
+    <raiz>/<proyecto>/manifiesto.json
+    <raiz>/<proyecto>/mes_reporte=<MM_AAAA>/datos-<id>.csv
+
+- Ingestar normaliza las filas igual que la unión de unit_todos_csv (nulos
+  vacíos, sin '.0' final) y escribe solo las particiones de los meses que trae
+  el archivo. El mes sale de la columna mes_reporte o, si no existe, del nombre
+  del archivo (I<AAAAMMDD>).
+- Volver a ingestar un mes reemplaza solo su partición. Los datos nuevos se
+  escriben con otro nombre y el manifiesto (que se reemplaza de forma atómica)
+  es el que los publica; el archivo anterior se borra después.
+- Exportar concatena las particiones en orden cronológico: las que tienen las
+  columnas del consolidado se copian tal cual y el resto se proyecta a la unión
+  de columnas, sin volver a normalizar.
+"""
+import csv
+import fcntl
+import io
+import json
+import os
+import re
+import shutil
+import tempfile
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, Optional, Sequence, Tuple
+
+from repository.transformar.csv_a_otro_separador import mes_reporte_de
+from repository.unit_todos_csv import DELIMITADOR, FILAS_POR_BLOQUE, esquema_union, filas_archivo, leer_cabecera
+
+MANIFIESTO = 'manifiesto.json'
+COLUMNA_MES = 'mes_reporte'
+MES_DESCONOCIDO = 'Desconocido'
+# Bytes por bloque al copiar una partición tal cual
+TAMANO_BLOQUE = 1 << 20
+
+
+def clave_mes(mes: str) -> str:
+    """Mes canónico de la partición: 'M_AAAA' o 'MM_AAAA' a 'MM_AAAA'; otro valor no vacío, tal cual."""
+    mes = (mes or '').strip()
+    coincidencia = re.fullmatch(r'(\d{1,2})_(\d{4})', mes)
+    if coincidencia:
+        return f"{int(coincidencia.group(1)):02d}_{coincidencia.group(2)}"
+    return mes or MES_DESCONOCIDO
+
+
+def orden_mes(mes: str) -> Tuple[int, int, str]:
+    """Orden cronológico de las particiones; los meses que no son MM_AAAA van al final."""
+    coincidencia = re.fullmatch(r'(\d{2})_(\d{4})', mes)
+    if coincidencia:
+        return int(coincidencia.group(2)), int(coincidencia.group(1)), ''
+    return 10000, 0, mes
+
+
+def nombre_particion(mes: str) -> str:
+    """Nombre de carpeta seguro para el mes."""
+    return re.sub(r'[^\w-]', '_', mes)
+
+
+def _directorio_proyecto(raiz: str, proyecto: str) -> str:
+    return os.path.join(raiz, proyecto)
+
+
+def leer_manifiesto(raiz: str, proyecto: str) -> Dict:
+    """Manifiesto del proyecto: {"proyecto", "particiones": {mes: {...}}} (vacío si no existe)."""
+    ruta = os.path.join(_directorio_proyecto(raiz, proyecto), MANIFIESTO)
+    if not os.path.exists(ruta):
+        return {"proyecto": proyecto, "particiones": {}}
+    with open(ruta, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _guardar_manifiesto(raiz: str, proyecto: str, manifiesto: Dict) -> None:
+    """Escribe el manifiesto en un temporal y lo reemplaza de forma atómica."""
+    directorio = _directorio_proyecto(raiz, proyecto)
+    ruta_tmp = os.path.join(directorio, f".{MANIFIESTO}.{uuid.uuid4().hex}")
+    with open(ruta_tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifiesto, f, ensure_ascii=False, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(ruta_tmp, os.path.join(directorio, MANIFIESTO))
+
+
+@contextmanager
+def _bloqueo(raiz: str, proyecto: str):
+    """Bloqueo exclusivo del proyecto mientras se publica una ingesta (entre procesos)."""
+    with open(os.path.join(_directorio_proyecto(raiz, proyecto), '.bloqueo'), 'w') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def ingestar(raiz: str, proyecto: str, archivo: str, mes_reporte: Optional[str] = None,
+             delimitador: str = DELIMITADOR) -> Dict[str, int]:
+    """
+    Normaliza un archivo y reemplaza las particiones de los meses que contiene.
+
+    Args:
+        raiz: Directorio raíz del almacén.
+        proyecto: Nombre del proyecto (por ejemplo 'COLJUEGOS_PQR').
+        archivo: CSV a ingestar.
+        mes_reporte: Si se indica, todas las filas van a ese mes.
+        delimitador: Separador del CSV (también el de las particiones).
+
+    Returns:
+        Filas escritas por mes.
+    """
+    cabecera = leer_cabecera(archivo, delimitador)
+    _, (proyeccion,) = esquema_union([cabecera])
+    columna_mes = next((i for i, columna in enumerate(cabecera) if columna.lower() == COLUMNA_MES), None)
+    if mes_reporte is None and columna_mes is None:
+        mes_reporte = mes_reporte_de(os.path.basename(archivo))
+    mes_fijo = clave_mes(mes_reporte) if mes_reporte is not None else None
+
+    directorio = _directorio_proyecto(raiz, proyecto)
+    os.makedirs(directorio, exist_ok=True)
+    temp_dir = tempfile.mkdtemp(dir=directorio, prefix='.ingesta-')
+    try:
+        # mes -> [archivo abierto, writer, ruta temporal, filas]
+        salidas: Dict[str, list] = {}
+
+        def salida(mes: str) -> list:
+            if mes not in salidas:
+                ruta = os.path.join(temp_dir, f"{len(salidas)}.csv")
+                f = open(ruta, 'w', newline='', encoding='utf-8')
+                writer = csv.writer(f, delimiter=delimitador, lineterminator='\n')
+                writer.writerow(cabecera)
+                salidas[mes] = [f, writer, ruta, 0]
+            return salidas[mes]
+
+        try:
+            if mes_fijo is not None:
+                # Un archivo sin filas deja su mes vacío
+                salida(mes_fijo)
+            for fila in filas_archivo(archivo, proyeccion, delimitador):
+                destino = salida(mes_fijo or clave_mes(fila[columna_mes]))
+                destino[1].writerow(fila)
+                destino[3] += 1
+        finally:
+            for f, _, _, _ in salidas.values():
+                f.close()
+
+        ingestado = datetime.now().isoformat(timespec='seconds')
+        with _bloqueo(raiz, proyecto):
+            manifiesto = leer_manifiesto(raiz, proyecto)
+            reemplazados = []
+            for mes, (_, _, ruta, filas) in salidas.items():
+                carpeta = f"{COLUMNA_MES}={nombre_particion(mes)}"
+                os.makedirs(os.path.join(directorio, carpeta), exist_ok=True)
+                relativa = f"{carpeta}/datos-{uuid.uuid4().hex[:12]}.csv"
+                os.replace(ruta, os.path.join(directorio, relativa))
+                anterior = manifiesto["particiones"].get(mes)
+                if anterior:
+                    reemplazados.append(anterior["archivo"])
+                manifiesto["particiones"][mes] = {
+                    "archivo": relativa,
+                    "filas": filas,
+                    "columnas": cabecera,
+                    "origen": os.path.basename(archivo),
+                    "ingestado": ingestado,
+                }
+            _guardar_manifiesto(raiz, proyecto, manifiesto)
+        for relativa in reemplazados:
+            try:
+                os.remove(os.path.join(directorio, relativa))
+            except FileNotFoundError:
+                pass
+        return {mes: filas for mes, (_, _, _, filas) in salidas.items()}
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def bloques_exportacion(raiz: str, proyecto: str, meses: Optional[Sequence[str]] = None,
+                        filas_por_bloque: int = FILAS_POR_BLOQUE) -> Iterator[str]:
+    """
+    Genera el texto del consolidado del proyecto (o de los meses indicados) por bloques.
+
+    El esquema es la unión de las columnas de las particiones, en orden cronológico.
+    """
+    manifiesto = leer_manifiesto(raiz, proyecto)
+    seleccion = None if meses is None else {clave_mes(mes) for mes in meses}
+    particiones = sorted(
+        ((mes, particion) for mes, particion in manifiesto["particiones"].items()
+         if seleccion is None or mes in seleccion),
+        key=lambda item: orden_mes(item[0]),
+    )
+    if not particiones:
+        return
+    columnas, proyecciones = esquema_union([particion["columnas"] for _, particion in particiones])
+    directorio = _directorio_proyecto(raiz, proyecto)
+
+    bloque = io.StringIO()
+    writer = csv.writer(bloque, delimiter=DELIMITADOR, lineterminator='\n')
+    writer.writerow(columnas)
+    yield bloque.getvalue()
+    for (_, particion), proyeccion in zip(particiones, proyecciones):
+        ruta = os.path.join(directorio, particion["archivo"])
+        if particion["columnas"] == columnas:
+            # Mismas columnas que el consolidado: se copia todo lo que sigue a la cabecera
+            with open(ruta, 'r', newline='', encoding='utf-8') as f:
+                next(csv.reader(f, delimiter=DELIMITADOR), None)
+                while True:
+                    texto = f.read(TAMANO_BLOQUE)
+                    if not texto:
+                        break
+                    yield texto
+            continue
+        bloque.seek(0)
+        bloque.truncate()
+        pendientes = 0
+        for fila in filas_archivo(ruta, proyeccion, DELIMITADOR, normalizar=False):
+            writer.writerow(fila)
+            pendientes += 1
+            if pendientes >= filas_por_bloque:
+                yield bloque.getvalue()
+                bloque.seek(0)
+                bloque.truncate()
+                pendientes = 0
+        yield bloque.getvalue()
+
+
+def exportar(raiz: str, proyecto: str, archivo_salida: str, meses: Optional[Sequence[str]] = None) -> int:
+    """Escribe el consolidado en archivo_salida y retorna el número de filas."""
+    manifiesto = leer_manifiesto(raiz, proyecto)
+    seleccion = None if meses is None else {clave_mes(mes) for mes in meses}
+    with open(archivo_salida, 'w', newline='', encoding='utf-8') as salida:
+        for texto in bloques_exportacion(raiz, proyecto, meses):
+            salida.write(texto)
+    return sum(particion["filas"] for mes, particion in manifiesto["particiones"].items()
+               if seleccion is None or mes in seleccion)
+
+
+if __name__ == "__main__":
+    base_path = os.path.expanduser("~/Documentos/ITRC/DOCUMENTOS_LIMPIAR/copia_COLJUEGOS_PQRS")
+    raiz_almacen = os.path.join(base_path, "almacen")
+    proyecto = "COLJUEGOS_PQR"
+
+    # Solo el mes nuevo: los consolidados históricos ya están en el almacén
+    for filename in ["ARCHIVO_COLJ_I20250101_F20250131.csv"]:
+        file_path = os.path.join(base_path, filename)
+        if not os.path.isfile(file_path):
+            print(f"⚠️ Archivo no encontrado: {file_path}")
+            continue
+        try:
+            for mes, filas in ingestar(raiz_almacen, proyecto, file_path).items():
+                print(f"📥 {filename}: mes {mes} ({filas} filas)")
+        except Exception as e:
+            print(f"❌ Error al ingestar {filename}: {e}")
+
+    output_file = os.path.join(base_path, "consolidado_coljuegos_pqr.csv")
+    filas = exportar(raiz_almacen, proyecto, output_file)
+    print(f"✅ Consolidado generado con éxito en: {output_file} ({filas} filas)")
@@ -0,0 +1,152 @@
+"""
+Caché en disco de los resultados de conversión y normalización.
+
+La clave es un hash del contenido de los archivos cargados, el endpoint, sus
+parámetros (separadores, type_mapping, formato) y la versión del código que
+produce el resultado: el hash de los .py del conversor o del proyecto
+(validadores y catálogos de valores_choice) y de los módulos compartidos. Si
+cambia el código o un catálogo cambia la clave, así que las entradas viejas
+dejan de usarse y salen por el LRU.
+
+El resultado (un ZIP o un archivo único) se guarda mientras se envía al
+cliente; solo se publica en la caché si el envío termina completo. El tamaño
+total se limita eliminando primero las entradas usadas hace más tiempo.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import uuid
+from functools import lru_cache
+from typing import Callable, Iterable, Iterator, Optional, Tuple
+
+DIRECTORIO = os.environ.get("CACHE_RESULTADOS_DIR", os.path.join(tempfile.gettempdir(), "cache_resultados"))
+# Tamaño máximo de la caché en bytes (0 la desactiva)
+MAX_BYTES = int(os.environ.get("CACHE_RESULTADOS_MAX_BYTES", str(5 << 30)))
+# Módulos compartidos por conversores y procesadores (repository/*.py)
+DIRECTORIO_REPOSITORIO = os.path.dirname(os.path.abspath(__file__))
+
+
+def hash_archivo(ruta: str) -> str:
+    """SHA-256 del contenido de un archivo."""
+    h = hashlib.sha256()
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(1 << 20), b''):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+@lru_cache(maxsize=128)
+def _hash_codigo(firma: Tuple[Tuple[str, int, int], ...]) -> str:
+    """Hash del contenido de los archivos de la firma (memoizado mientras no cambien)."""
+    h = hashlib.sha256()
+    for ruta, _, _ in firma:
+        h.update(ruta.encode('utf-8'))
+        with open(ruta, 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+def version_codigo(*rutas: str) -> str:
+    """
+    Versión del código en las rutas (archivos o directorios, recursivos) más los
+    módulos de repository/: hash de los .py, recalculado solo si cambia el tamaño
+    o la fecha de modificación de alguno.
+    """
+    archivos = [os.path.join(DIRECTORIO_REPOSITORIO, nombre)
+                for nombre in os.listdir(DIRECTORIO_REPOSITORIO) if nombre.endswith('.py')]
+    for ruta in rutas:
+        if os.path.isdir(ruta):
+            for directorio, subdirectorios, nombres in os.walk(ruta):
+                subdirectorios[:] = [d for d in subdirectorios if d != '__pycache__']
+                archivos.extend(os.path.join(directorio, nombre) for nombre in nombres if nombre.endswith('.py'))
+        else:
+            archivos.append(ruta)
+    firma = []
+    for archivo in sorted(set(archivos)):
+        estado = os.stat(archivo)
+        firma.append((archivo, estado.st_size, estado.st_mtime_ns))
+    return _hash_codigo(tuple(firma))
+
+
+class CacheResultados:
+    """Resultados por clave en un directorio, con límite de tamaño y desalojo LRU."""
+
+    def __init__(self, directorio: str = DIRECTORIO, max_bytes: int = MAX_BYTES):
+        self.directorio = directorio
+        self.max_bytes = max_bytes
+        if self.activa:
+            os.makedirs(directorio, exist_ok=True)
+
+    @property
+    def activa(self) -> bool:
+        return self.max_bytes > 0
+
+    @staticmethod
+    def clave(*partes) -> str:
+        """Clave de caché a partir de partes serializables en JSON (rutas de archivo no: usar hash_archivo)."""
+        return hashlib.sha256(json.dumps(partes, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+    def _ruta(self, clave: str) -> str:
+        return os.path.join(self.directorio, clave)
+
+    def obtener(self, clave: str) -> Optional[str]:
+        """Ruta del resultado si está en la caché (y lo marca como usado); si no, None."""
+        if not self.activa:
+            return None
+        ruta = self._ruta(clave)
+        try:
+            os.utime(ruta)
+        except FileNotFoundError:
+            return None
+        return ruta
+
+    def guardar_mientras_envia(self, clave: str, bloques: Iterable[bytes],
+                               confirmar: Callable[[], bool] = lambda: True) -> Iterator[bytes]:
+        """
+        Reenvía los bloques y los escribe en la caché. El resultado se publica solo si
+        el envío termina y confirmar() es verdadero (por ejemplo, si no hubo archivos
+        fallidos); si el cliente se desconecta o hay un error se descarta.
+        """
+        if not self.activa:
+            yield from bloques
+            return
+        ruta_tmp = os.path.join(self.directorio, f".{clave}.{uuid.uuid4().hex}")
+        publicado = False
+        try:
+            with open(ruta_tmp, 'wb') as f:
+                for bloque in bloques:
+                    f.write(bloque)
+                    yield bloque
+            if confirmar():
+                os.replace(ruta_tmp, self._ruta(clave))
+                publicado = True
+                self.desalojar()
+        finally:
+            if not publicado:
+                try:
+                    os.remove(ruta_tmp)
+                except FileNotFoundError:
+                    pass
+
+    def desalojar(self) -> None:
+        """Elimina las entradas usadas hace más tiempo hasta quedar dentro de max_bytes."""
+        entradas = []
+        total = 0
+        for entrada in os.scandir(self.directorio):
+            if entrada.name.startswith('.') or not entrada.is_file():
+                continue
+            try:
+                estado = entrada.stat()
+            except FileNotFoundError:
+                continue
+            entradas.append((estado.st_mtime, estado.st_size, entrada.path))
+            total += estado.st_size
+        for _, tamano, ruta in sorted(entradas):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(ruta)
+            except FileNotFoundError:
+                pass
+            total -= tamano
@@ -0,0 +1,174 @@
+"""
+Espacio temporal de las solicitudes de la API.
+
+Cada solicitud trabaja en su propio directorio dentro de DIRECTORIO, que se
+elimina al terminar de enviar la respuesta (o de inmediato si la solicitud
+falla). Para que el disco no se llene bajo carga:
+
+- Cada directorio reserva bytes de una cuota de MAX_BYTES compartida por todos
+  los procesos de la API: los archivos cargados se copian por bloques y cada
+  bloque reserva RESERVA_POR_BYTE veces su tamaño (el archivo y lo que se genera
+  a partir de él). Si no cabe, la solicitud falla de inmediato con
+  EspacioAgotado (la API responde 503 con Retry-After), sin esperar en el hilo.
+- La reserva de cada proceso se guarda en un archivo de sesión que leen los
+  demás; el uso se suma desde esos archivos sin recorrer los directorios.
+- liberar elimina el directorio y devuelve su reserva; retener devuelve la
+  reserva sin eliminarlo (resultados que conserva otro componente con su propio
+  límite, ver repository.trabajos).
+- Cada proceso mantiene bloqueado un archivo de sesión mientras vive y nombra
+  sus directorios con esa sesión; se eliminan los directorios y las reservas de
+  las sesiones que ya no están bloqueadas (procesos reiniciados o caídos) al
+  iniciar y cuando la cuota se agota.
+"""
+import fcntl
+import os
+import shutil
+import tempfile
+import uuid
+from contextlib import contextmanager
+from typing import BinaryIO, Dict
+
+DIRECTORIO = os.environ.get("ESPACIO_TEMPORAL_DIR", os.path.join(tempfile.gettempdir(), "espacio_temporal"))
+# Bytes que pueden reservar a la vez los directorios de las solicitudes (0 sin límite)
+MAX_BYTES = int(os.environ.get("ESPACIO_TEMPORAL_MAX_BYTES", str(20 << 30)))
+# Bytes reservados por cada byte cargado: el archivo más su salida convertida
+RESERVA_POR_BYTE = int(os.environ.get("ESPACIO_TEMPORAL_RESERVA_POR_BYTE", "2"))
+# Segundos que se sugieren al cliente (Retry-After) cuando no hay espacio
+REINTENTO_SEGUNDOS = int(os.environ.get("ESPACIO_TEMPORAL_REINTENTO", "30"))
+# Bytes copiados (y reservados) por bloque al guardar un archivo cargado
+TAMANO_BLOQUE = 1 << 20
+
+
+class EspacioAgotado(Exception):
+    """La cuota del espacio temporal no alcanza para la solicitud."""
+
+
+class EspacioTemporal:
+    """Directorios temporales por solicitud con una cuota de disco compartida."""
+
+    def __init__(self, directorio: str = DIRECTORIO, max_bytes: int = MAX_BYTES,
+                 reintento: int = REINTENTO_SEGUNDOS):
+        self.directorio = directorio
+        self.max_bytes = max_bytes
+        self.reintento = reintento
+        os.makedirs(directorio, exist_ok=True)
+        self.sesion = f"{os.getpid()}{uuid.uuid4().hex[:8]}"
+        # Bytes reservados por cada directorio de esta sesión
+        self._reservas: Dict[str, int] = {}
+        # Bloqueado mientras viva el proceso (y los procesos hijos que lo heredan)
+        self._bloqueo = open(self._ruta_bloqueo(self.sesion), 'w')
+        fcntl.flock(self._bloqueo, fcntl.LOCK_EX)
+        self.limpiar_huerfanos()
+
+    def _ruta_bloqueo(self, sesion: str) -> str:
+        return os.path.join(self.directorio, f".{sesion}.bloqueo")
+
+    def _ruta_uso(self, sesion: str) -> str:
+        return os.path.join(self.directorio, f".{sesion}.uso")
+
+    @contextmanager
+    def _cuota(self):
+        """Bloqueo exclusivo de las reservas (entre hilos y procesos)."""
+        with open(os.path.join(self.directorio, '.cuota'), 'w') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _escribir_uso(self) -> None:
+        """Publica la reserva total de esta sesión para los demás procesos."""
+        ruta = self._ruta_uso(self.sesion)
+        with open(f"{ruta}.tmp", 'w') as f:
+            f.write(str(sum(self._reservas.values())))
+        os.replace(f"{ruta}.tmp", ruta)
+
+    def uso(self) -> int:
+        """Bytes reservados ahora por las solicitudes de todos los procesos."""
+        total = sum(self._reservas.values())
+        for entrada in os.scandir(self.directorio):
+            if not entrada.name.endswith('.uso') or entrada.path == self._ruta_uso(self.sesion):
+                continue
+            try:
+                with open(entrada.path) as f:
+                    total += int(f.read() or 0)
+            except (FileNotFoundError, ValueError):
+                pass
+        return total
+
+    def _cabe(self, n: int) -> bool:
+        """Si n bytes más caben en la cuota; antes de negarlo se descartan las sesiones caídas."""
+        if not self.max_bytes or self.uso() + n <= self.max_bytes:
+            return True
+        self.limpiar_huerfanos()
+        return self.uso() + n <= self.max_bytes
+
+    def _agotado(self) -> EspacioAgotado:
+        return EspacioAgotado(f"El espacio temporal supera {self.max_bytes} bytes; intente más tarde.")
+
+    def crear_directorio(self) -> str:
+        """Crea el directorio de una solicitud; lanza EspacioAgotado si la cuota está llena."""
+        with self._cuota():
+            if not self._cabe(1):
+                raise self._agotado()
+            directorio = tempfile.mkdtemp(dir=self.directorio, prefix=f"{self.sesion}-")
+            self._reservas[directorio] = 0
+        return directorio
+
+    def reservar(self, directorio: str, n: int) -> None:
+        """Reserva n bytes más para directorio; lanza EspacioAgotado (sin reservar) si no caben."""
+        if n <= 0:
+            return
+        with self._cuota():
+            if not self._cabe(n):
+                raise self._agotado()
+            self._reservas[directorio] = self._reservas.get(directorio, 0) + n
+            self._escribir_uso()
+
+    def guardar(self, origen: BinaryIO, ruta: str) -> None:
+        """Copia origen en ruta (dentro de un directorio de solicitud) reservando cada bloque."""
+        directorio = os.path.dirname(ruta)
+        with open(ruta, 'wb') as destino:
+            while True:
+                bloque = origen.read(TAMANO_BLOQUE)
+                if not bloque:
+                    break
+                self.reservar(directorio, len(bloque) * RESERVA_POR_BYTE)
+                destino.write(bloque)
+
+    def retener(self, directorio: str) -> None:
+        """Devuelve la reserva de directorio sin eliminarlo."""
+        with self._cuota():
+            if self._reservas.pop(directorio, 0):
+                self._escribir_uso()
+
+    def liberar(self, directorio: str) -> None:
+        """Elimina el directorio de una solicitud y su contenido y devuelve su reserva."""
+        shutil.rmtree(directorio, ignore_errors=True)
+        self.retener(directorio)
+
+    def limpiar_huerfanos(self) -> None:
+        """Elimina los directorios y reservas de sesiones que ya no están bloqueadas por un proceso."""
+        # Primero los directorios: la sesión de cada uno ya estaba bloqueada al crearlo
+        directorios = [entrada.path for entrada in os.scandir(self.directorio) if entrada.is_dir()]
+        activas = {self.sesion}
+        for entrada in os.scandir(self.directorio):
+            if not entrada.name.endswith('.bloqueo') or entrada.path == self._bloqueo.name:
+                continue
+            sesion = entrada.name[1:-len('.bloqueo')]
+            with open(entrada.path, 'a') as f:
+                try:
+                    fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    activas.add(sesion)
+                    continue
+                os.remove(entrada.path)
+        for entrada in os.scandir(self.directorio):
+            if entrada.name.endswith('.uso') and entrada.name[1:-len('.uso')] not in activas:
+                try:
+                    os.remove(entrada.path)
+                except FileNotFoundError:
+                    pass
+        for directorio in directorios:
+            if os.path.basename(directorio).split('-', 1)[0] not in activas:
+                shutil.rmtree(directorio, ignore_errors=True)
@@ -0,0 +1,174 @@
+"""
+Índice de catálogos para los valores_choice de los validadores.
+
+Cada catálogo (lista/set VALORES_* más su diccionario VALORES_REEMPLAZO_*) se
+compila una sola vez en:
+
+- Un set con los valores canónicos (búsqueda exacta O(1)).
+- Un diccionario clave plegada -> canónico (sin tildes, minúsculas, espacios
+  colapsados), que también resuelve los alias de los diccionarios de reemplazo.
+- Un índice de trigramas para corregir errores de digitación ("bucaramnaga",
+  "impuests"): los candidatos que comparten más trigramas se comparan con
+  distancia de edición (con transposiciones) y solo se acepta el mejor si es
+  único, está a MAX_EDICIONES o menos y supera el umbral de confianza.
+
+Cada corrección aproximada queda en el log de auditoría (logger de este módulo
+y el historial acotado IndiceCatalogo.auditoria).
+"""
+import logging
+from collections import Counter, OrderedDict, deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from repository.normalizacion_texto import quitar_tildes
+
+logger = logging.getLogger(__name__)
+
+# Confianza mínima (1 - distancia / longitud) para aceptar una corrección aproximada
+UMBRAL_CONFIANZA = 0.85
+# Número máximo de ediciones (inserción, borrado, sustitución o transposición) aceptadas
+MAX_EDICIONES = 2
+# Candidatos por trigramas que se comparan con distancia de edición
+MAX_CANDIDATOS = 10
+# Tamaño del historial de auditoría en memoria de cada índice
+TAMANO_AUDITORIA = 1000
+# Búsquedas aproximadas memoizadas por índice (LRU)
+TAMANO_APROXIMADOS = 10000
+
+
+def plegar(valor: str) -> str:
+    """Clave de comparación: sin tildes, en minúsculas y con los espacios colapsados."""
+    return " ".join(quitar_tildes(valor).lower().split())
+
+
+def mismo_caso(referencia: str, valor: str) -> str:
+    """Aplica a valor la convención de mayúsculas/minúsculas de referencia."""
+    if referencia.isupper():
+        return valor.upper()
+    if referencia.islower():
+        return valor.lower()
+    return valor
+
+
+def trigramas(clave: str) -> set:
+    """Trigramas de una clave con relleno en los extremos."""
+    relleno = f"  {clave} "
+    return {relleno[i:i + 3] for i in range(len(relleno) - 2)}
+
+
+def distancia_edicion(a: str, b: str, maximo: int) -> int:
+    """
+    Distancia de Damerau-Levenshtein restringida (OSA) entre a y b.
+    Retorna maximo + 1 en cuanto la distancia supera maximo.
+    """
+    if abs(len(a) - len(b)) > maximo:
+        return maximo + 1
+    anterior2 = None
+    anterior = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        actual = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            costo = 0 if a[i - 1] == b[j - 1] else 1
+            actual[j] = min(anterior[j] + 1, actual[j - 1] + 1, anterior[j - 1] + costo)
+            if (anterior2 is not None and i > 1 and j > 1
+                    and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                actual[j] = min(actual[j], anterior2[j - 2] + 1)
+        if min(actual) > maximo:
+            return maximo + 1
+        anterior2, anterior = anterior, actual
+    return anterior[-1]
+
+
+class IndiceCatalogo:
+    """Índice exacto y aproximado de un catálogo de valores_choice."""
+
+    def __init__(self, nombre: str, valores: Iterable[str], reemplazos: Optional[Dict[str, str]] = None,
+                 umbral: float = UMBRAL_CONFIANZA, max_ediciones: int = MAX_EDICIONES):
+        self.nombre = nombre
+        self.umbral = umbral
+        self.max_ediciones = max_ediciones
+        self.auditoria = deque(maxlen=TAMANO_AUDITORIA)
+
+        # Orden determinista: algunos catálogos son sets
+        self.canonicos = {quitar_tildes(valor) for valor in valores}
+        self._por_clave: Dict[str, str] = {}
+        for canonico in sorted(self.canonicos):
+            self._por_clave.setdefault(plegar(canonico), canonico)
+        for alias, destino in sorted((reemplazos or {}).items()):
+            destino = quitar_tildes(destino)
+            if destino in self.canonicos:
+                self._por_clave.setdefault(plegar(alias), destino)
+
+        self._claves: List[str] = list(self._por_clave)
+        self._por_trigrama: Dict[str, List[int]] = {}
+        for posicion, clave in enumerate(self._claves):
+            for trigrama in trigramas(clave):
+                self._por_trigrama.setdefault(trigrama, []).append(posicion)
+
+        # Resultados de las búsquedas aproximadas (LRU acotado): clave -> canónico o None
+        self._aproximados: "OrderedDict[str, Optional[str]]" = OrderedDict()
+
+    def __contains__(self, valor: str) -> bool:
+        return valor in self.canonicos
+
+    def resolver(self, valor: str) -> Tuple[str, bool]:
+        """
+        Busca el valor en el catálogo.
+
+        Returns:
+            Tupla (valor canónico, encontrado). El canónico conserva la convención de
+            mayúsculas/minúsculas del valor recibido. Si no hay coincidencia exacta ni
+            aproximada confiable se retorna el valor sin cambios y False.
+        """
+        if valor in self.canonicos:
+            return valor, True
+        clave = plegar(valor)
+        canonico = self._por_clave.get(clave)
+        if canonico is None:
+            canonico = self._aproximado(valor, clave)
+        if canonico is None:
+            return valor, False
+        return mismo_caso(valor, canonico), True
+
+    def _aproximado(self, valor: str, clave: str) -> Optional[str]:
+        """_buscar_aproximado memoizado en un LRU de TAMANO_APROXIMADOS claves."""
+        if clave in self._aproximados:
+            self._aproximados.move_to_end(clave)
+            return self._aproximados[clave]
+        canonico = self._buscar_aproximado(valor, clave)
+        self._aproximados[clave] = canonico
+        if len(self._aproximados) > TAMANO_APROXIMADOS:
+            self._aproximados.popitem(last=False)
+        return canonico
+
+    def _buscar_aproximado(self, valor: str, clave: str) -> Optional[str]:
+        """Mejor candidato por trigramas y distancia de edición, o None si no es confiable."""
+        comunes = Counter()
+        for trigrama in trigramas(clave):
+            comunes.update(self._por_trigrama.get(trigrama, ()))
+        if not comunes:
+            return None
+
+        mejores: List[Tuple[int, str]] = []
+        for posicion, _ in comunes.most_common(MAX_CANDIDATOS):
+            candidato = self._claves[posicion]
+            distancia = distancia_edicion(clave, candidato, self.max_ediciones)
+            if distancia <= self.max_ediciones:
+                mejores.append((distancia, candidato))
+        if not mejores:
+            return None
+        mejores.sort()
+        distancia, candidato = mejores[0]
+        canonico = self._por_clave[candidato]
+        # Empate entre dos canónicos distintos: ambiguo, no se corrige
+        if any(d == distancia and self._por_clave[c] != canonico for d, c in mejores[1:]):
+            return None
+        confianza = 1 - distancia / max(len(clave), len(candidato))
+        if confianza < self.umbral:
+            return None
+
+        self.auditoria.append({
+            "catalogo": self.nombre, "valor": valor, "canonico": canonico,
+            "distancia": distancia, "confianza": round(confianza, 3),
+        })
+        logger.info("Catálogo %s: '%s' corregido a '%s' (confianza %.3f)", self.nombre, valor, canonico, confianza)
+        return canonico
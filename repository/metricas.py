@@ -0,0 +1,326 @@
+"""
+Métricas de la API en el formato de texto de Prometheus (endpoint /metrics).
+
+- Duración de cada solicitud por endpoint, método y estado HTTP, hasta terminar
+  de enviar la respuesta (MiddlewareMetricas).
+- Duración por etapa del procesamiento de cada archivo en los CSVProcessor:
+  lectura (incluye el tokenizador), validación, escritura, unión de las partes
+  del modo paralelo y el resto (limpieza, reorganización y errores), más la
+  carga de los archivos y la compresión del ZIP de la respuesta. En el modo
+  paralelo las etapas suman el tiempo de todos los procesos.
+- Llamadas y tiempo acumulado de cada método de validación (solo las llamadas
+  reales: los aciertos de la memoización no llegan al método).
+- Errores de validación por tipo, filas procesadas, filas y bytes por segundo
+  del último archivo, y aciertos y fallos de las cachés.
+
+Los valores viven en la memoria del proceso: con varios workers de uvicorn cada
+uno expone los suyos. Los procesos del modo paralelo devuelven su Medicion al
+proceso principal, que es quien la registra.
+"""
+import threading
+import time
+from contextvars import ContextVar
+from functools import wraps
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+PREFIJO = 'itrc_'
+# Límites (segundos) de los histogramas de duración
+LIMITES_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+# Scope ASGI de la solicitud en curso (lo fija MiddlewareMetricas; los trabajos heredan el de su solicitud)
+SOLICITUD_ACTUAL: ContextVar[Optional[dict]] = ContextVar('solicitud_actual', default=None)
+
+# Medición activa en cada hilo (ver Medicion.__enter__ y medir_validador)
+_ACTUAL = threading.local()
+
+
+def _escapar(valor) -> str:
+    return str(valor).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _endpoint(scope: Optional[dict]) -> str:
+    """Plantilla de la ruta (p. ej. /api/v1/trabajos/{trabajo_id}/), para no crear una serie por id."""
+    if scope is None:
+        return ''
+    return getattr(scope.get('route'), 'path', None) or 'sin_ruta'
+
+
+def _etiquetas(nombres: Sequence[str], valores: Sequence[str], extra: Tuple[str, str] = None) -> str:
+    pares = list(zip(nombres, valores))
+    if extra:
+        pares.append(extra)
+    if not pares:
+        return ''
+    return '{' + ','.join(f'{nombre}="{_escapar(valor)}"' for nombre, valor in pares) + '}'
+
+
+class Registro:
+    """Conjunto de métricas que se exponen juntas."""
+
+    def __init__(self):
+        self.bloqueo = threading.Lock()
+        self.metricas: List['Metrica'] = []
+
+    def texto(self) -> str:
+        """Todas las métricas en el formato de texto de Prometheus (versión 0.0.4)."""
+        lineas = []
+        with self.bloqueo:
+            for metrica in self.metricas:
+                lineas.append(f"# HELP {metrica.nombre} {metrica.ayuda}")
+                lineas.append(f"# TYPE {metrica.nombre} {metrica.tipo}")
+                lineas.extend(metrica.lineas())
+        return '\n'.join(lineas) + '\n'
+
+
+class Metrica:
+    """Métrica con nombre, ayuda y etiquetas; guarda un valor por combinación de etiquetas."""
+    tipo = 'untyped'
+
+    def __init__(self, registro: Registro, nombre: str, ayuda: str, etiquetas: Sequence[str] = ()):
+        self.nombre = PREFIJO + nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self.valores: Dict[Tuple[str, ...], object] = {}
+        self._bloqueo = registro.bloqueo
+        registro.metricas.append(self)
+
+    def _clave(self, etiquetas: Dict[str, object]) -> Tuple[str, ...]:
+        return tuple(str(etiquetas.get(nombre, '')) for nombre in self.etiquetas)
+
+    def lineas(self) -> List[str]:
+        return [f"{self.nombre}{_etiquetas(self.etiquetas, clave)} {valor}"
+                for clave, valor in sorted(self.valores.items())]
+
+
+class Contador(Metrica):
+    tipo = 'counter'
+
+    def sumar(self, valor: float = 1, **etiquetas) -> None:
+        clave = self._clave(etiquetas)
+        with self._bloqueo:
+            self.valores[clave] = self.valores.get(clave, 0) + valor
+
+
+class Medidor(Metrica):
+    tipo = 'gauge'
+
+    def fijar(self, valor: float, **etiquetas) -> None:
+        clave = self._clave(etiquetas)
+        with self._bloqueo:
+            self.valores[clave] = valor
+
+
+class Histograma(Metrica):
+    tipo = 'histogram'
+
+    def __init__(self, registro: Registro, nombre: str, ayuda: str, etiquetas: Sequence[str] = (),
+                 limites: Sequence[float] = LIMITES_SEGUNDOS):
+        super().__init__(registro, nombre, ayuda, etiquetas)
+        self.limites = tuple(limites)
+
+    def observar(self, valor: float, **etiquetas) -> None:
+        clave = self._clave(etiquetas)
+        with self._bloqueo:
+            if clave not in self.valores:
+                self.valores[clave] = [[0] * len(self.limites), 0.0, 0]
+            cubetas, _, _ = datos = self.valores[clave]
+            for i, limite in enumerate(self.limites):
+                if valor <= limite:
+                    cubetas[i] += 1
+            datos[1] += valor
+            datos[2] += 1
+
+    def lineas(self) -> List[str]:
+        lineas = []
+        for clave, (cubetas, suma, cuenta) in sorted(self.valores.items()):
+            for limite, acumulado in zip(self.limites, cubetas):
+                lineas.append(f"{self.nombre}_bucket{_etiquetas(self.etiquetas, clave, ('le', limite))} {acumulado}")
+            lineas.append(f"{self.nombre}_bucket{_etiquetas(self.etiquetas, clave, ('le', '+Inf'))} {cuenta}")
+            lineas.append(f"{self.nombre}_sum{_etiquetas(self.etiquetas, clave)} {suma}")
+            lineas.append(f"{self.nombre}_count{_etiquetas(self.etiquetas, clave)} {cuenta}")
+        return lineas
+
+
+REGISTRO = Registro()
+SOLICITUDES = Histograma(
+    REGISTRO, 'solicitud_segundos', "Duración de las solicitudes hasta terminar de enviar la respuesta",
+    ('endpoint', 'metodo', 'estado'))
+ETAPAS = Histograma(
+    REGISTRO, 'etapa_segundos', "Duración de cada etapa del procesamiento por endpoint",
+    ('endpoint', 'origen', 'etapa'))
+VALIDADOR_LLAMADAS = Contador(
+    REGISTRO, 'validador_llamadas_total', "Llamadas a cada método de validación (sin aciertos de la memoización)",
+    ('metodo',))
+VALIDADOR_SEGUNDOS = Contador(
+    REGISTRO, 'validador_segundos_total', "Tiempo acumulado en cada método de validación", ('metodo',))
+ERRORES = Contador(
+    REGISTRO, 'errores_validacion_total', "Errores de validación escritos por tipo", ('procesador', 'tipo'))
+FILAS = Contador(REGISTRO, 'filas_procesadas_total', "Filas procesadas", ('procesador',))
+FILAS_POR_SEGUNDO = Medidor(
+    REGISTRO, 'filas_por_segundo', "Filas por segundo del último archivo procesado", ('procesador',))
+BYTES_POR_SEGUNDO = Medidor(
+    REGISTRO, 'bytes_por_segundo', "Bytes por segundo de la última operación (entrada del procesador o ZIP)",
+    ('origen',))
+BYTES = Contador(REGISTRO, 'bytes_total', "Bytes leídos por los procesadores o enviados en ZIP", ('origen',))
+CACHE = Contador(REGISTRO, 'cache_total', "Consultas a las cachés por resultado", ('cache', 'resultado'))
+
+
+def observar_etapa(origen: str, etapa: str, segundos: float) -> None:
+    """Registra la duración de una etapa en el endpoint de la solicitud en curso."""
+    ETAPAS.observar(segundos, endpoint=_endpoint(SOLICITUD_ACTUAL.get()), origen=origen, etapa=etapa)
+
+
+class Medicion:
+    """
+    Tiempos por etapa, llamadas a los validadores, errores y filas del
+    procesamiento de un archivo (o de un bloque en el modo paralelo). Es un
+    contexto: mientras está activo en un hilo, medir_validador registra en ella.
+    """
+
+    def __init__(self):
+        self.etapas: Dict[str, float] = {}
+        self.validadores: Dict[str, List[float]] = {}
+        self.errores: Dict[str, int] = {}
+        self.filas = 0
+
+    def __enter__(self) -> 'Medicion':
+        self._anterior = getattr(_ACTUAL, 'medicion', None)
+        _ACTUAL.medicion = self
+        return self
+
+    def __exit__(self, *exc) -> None:
+        _ACTUAL.medicion = self._anterior
+        del self._anterior
+
+    def sumar(self, etapa: str, segundos: float) -> None:
+        self.etapas[etapa] = self.etapas.get(etapa, 0.0) + segundos
+
+    def validador(self, nombre: str, segundos: float) -> None:
+        datos = self.validadores.get(nombre)
+        if datos is None:
+            self.validadores[nombre] = [1, segundos]
+        else:
+            datos[0] += 1
+            datos[1] += segundos
+
+    def iterar(self, etapa: str, iterable: Iterable) -> Iterator:
+        """Itera sumando a `etapa` el tiempo de obtener cada elemento."""
+        iterador = iter(iterable)
+        reloj = time.perf_counter
+        while True:
+            inicio = reloj()
+            try:
+                elemento = next(iterador)
+            except StopIteration:
+                self.sumar(etapa, reloj() - inicio)
+                return
+            self.sumar(etapa, reloj() - inicio)
+            yield elemento
+
+    def escritor(self, etapa: str, writer) -> '_EscritorMedido':
+        """Envuelve un csv.writer sumando a `etapa` el tiempo de writerow/writerows."""
+        return _EscritorMedido(self, etapa, writer)
+
+    def combinar(self, otra: 'Medicion') -> None:
+        for etapa, segundos in otra.etapas.items():
+            self.sumar(etapa, segundos)
+        for nombre, (llamadas, segundos) in otra.validadores.items():
+            datos = self.validadores.setdefault(nombre, [0, 0.0])
+            datos[0] += llamadas
+            datos[1] += segundos
+        for tipo, cantidad in otra.errores.items():
+            self.errores[tipo] = self.errores.get(tipo, 0) + cantidad
+        self.filas += otra.filas
+
+    def registrar(self, procesador: str, segundos: float, bytes_entrada: int,
+                  validation_stats: Dict[str, Dict] = None) -> None:
+        """Publica la medición del archivo completo (`segundos` de reloj) en REGISTRO."""
+        otros = segundos - sum(self.etapas.values())
+        for etapa, duracion in list(self.etapas.items()) + [('otros', max(otros, 0.0)), ('total', segundos)]:
+            observar_etapa(procesador, etapa, duracion)
+        for nombre, (llamadas, duracion) in self.validadores.items():
+            VALIDADOR_LLAMADAS.sumar(llamadas, metodo=nombre)
+            VALIDADOR_SEGUNDOS.sumar(duracion, metodo=nombre)
+        for tipo, cantidad in self.errores.items():
+            ERRORES.sumar(cantidad, procesador=procesador, tipo=tipo)
+        FILAS.sumar(self.filas, procesador=procesador)
+        BYTES.sumar(bytes_entrada, origen=procesador)
+        if segundos > 0:
+            FILAS_POR_SEGUNDO.fijar(self.filas / segundos, procesador=procesador)
+            BYTES_POR_SEGUNDO.fijar(bytes_entrada / segundos, origen=procesador)
+        for stats in (validation_stats or {}).values():
+            CACHE.sumar(stats.get('aciertos', 0), cache='validadores', resultado='acierto')
+            CACHE.sumar(stats.get('fallos', 0), cache='validadores', resultado='fallo')
+
+
+class _EscritorMedido:
+    def __init__(self, medicion: Medicion, etapa: str, writer):
+        self._medicion = medicion
+        self._etapa = etapa
+        self._writer = writer
+
+    def writerow(self, fila):
+        inicio = time.perf_counter()
+        resultado = self._writer.writerow(fila)
+        self._medicion.sumar(self._etapa, time.perf_counter() - inicio)
+        return resultado
+
+    def writerows(self, filas):
+        inicio = time.perf_counter()
+        resultado = self._writer.writerows(filas)
+        self._medicion.sumar(self._etapa, time.perf_counter() - inicio)
+        return resultado
+
+    def __getattr__(self, nombre):
+        return getattr(self._writer, nombre)
+
+
+def medir_validador(funcion: Callable, nombre: str) -> Callable:
+    """
+    Envuelve un método de validación para contar sus llamadas y su tiempo en la
+    Medicion activa del hilo (sin medición activa solo llama al método).
+    """
+    reloj = time.perf_counter
+
+    @wraps(funcion)
+    def medido(*args, **kwargs):
+        medicion = getattr(_ACTUAL, 'medicion', None)
+        if medicion is None:
+            return funcion(*args, **kwargs)
+        inicio = reloj()
+        try:
+            return funcion(*args, **kwargs)
+        finally:
+            medicion.validador(nombre, reloj() - inicio)
+    return medido
+
+
+class MiddlewareMetricas:
+    """
+    Middleware ASGI que mide cada solicitud HTTP hasta el último bloque de la
+    respuesta (incluye las respuestas en streaming y sus tareas de fondo) y fija
+    SOLICITUD_ACTUAL para las etapas medidas durante la solicitud.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        inicio = time.perf_counter()
+        estado = 500
+        token = SOLICITUD_ACTUAL.set(scope)
+
+        async def enviar(mensaje):
+            nonlocal estado
+            if mensaje['type'] == 'http.response.start':
+                estado = mensaje['status']
+            await send(mensaje)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            SOLICITUD_ACTUAL.reset(token)
+            SOLICITUDES.observar(time.perf_counter() - inicio, endpoint=_endpoint(scope),
+                                 metodo=scope.get('method', ''), estado=estado)
@@ -0,0 +1,167 @@
+"""
+Limpieza de NIT y cédulas y dígito de verificación de la DIAN (módulo 11).
+
+- separar_nit: quita ".000000", el prefijo del tipo de documento (NIT, CC,
+  C.C., CE, TI, ...) y los puntos de miles, y separa el número del dígito de
+  verificación declarado ("900.123.456-7" -> ("900123456", "7")). Con varios
+  guiones se conserva solo el primer número, como hacía limpiar_nit; los
+  valores que no son números separados por guiones no cambian más.
+- LimpiadorNit: limpiar_nit de los Validadores*; los vacíos y el trato de los
+  valores solo con letras dependen del proyecto.
+- dv_valido: "SI" / "NO" según el dígito de verificación declarado coincida
+  con el calculado, "" si el valor no trae dígito (columna DV_VALIDO).
+- LimpiadorNit.columna y dv_valido_columna para Series de pandas: los valores
+  que son solo dígitos (la mayoría) se resuelven en una pasada sobre la
+  columna, el resto una vez por valor distinto, y el módulo 11 se calcula con
+  NumPy para todos los NIT con dígito a la vez (digitos_verificacion).
+"""
+import re
+from functools import lru_cache
+from typing import FrozenSet, Iterable, Tuple
+
+# Pesos del dígito de verificación, del último dígito del NIT al primero
+PESOS_DV = (3, 7, 13, 17, 19, 23, 29, 37, 41, 43, 47, 53, 59, 67, 71)
+# Columna que agregan los CSVProcessor con check_digit
+COLUMNA_DV = "DV_VALIDO"
+DV_SI = "SI"
+DV_NO = "NO"
+# Valores que limpiar_nit trata como vacíos (comparados en minúsculas)
+VACIOS_NIT = frozenset({'nan', 'null', ''})
+VACIOS_NIT_AMPLIADOS = VACIOS_NIT | {
+    'sin registro', 'desconocido', 'no aplica', 'ninguna', 'no registra', 'sin', 'sin id',
+}
+# Tipos de documento que pueden preceder al número, con o sin puntos (C.C., N.I.T.)
+TIPOS_DOCUMENTO = ('NIT', 'NUIP', 'CC', 'CE', 'TI', 'RC', 'PAS', 'PA', 'PEP', 'PPT')
+# Valores distintos memoizados por dv_valido
+DV_CACHE_SIZE = 50000
+
+_PREFIJO = re.compile(
+    r"^(?:" + "|".join(r"\.?".join(tipo) for tipo in TIPOS_DOCUMENTO) + r")\.?\s*[:#-]?\s*(?=\d)",
+    re.IGNORECASE,
+)
+_MILES = re.compile(r"\d{1,3}(?:\.\d{3})+(?:-\d+)*")
+_NUMERICO = re.compile(r"\d+(?:-\d+)*")
+_CON_DV = re.compile(r"[0-9]+-[0-9]")
+_SOLO_LETRAS = re.compile(r"[a-zA-Z\s]+")
+
+
+def digito_verificacion(nit: str) -> int:
+    """Dígito de verificación de la DIAN (módulo 11) de un NIT sin DV."""
+    suma = sum(int(digito) * peso for digito, peso in zip(reversed(nit), PESOS_DV))
+    residuo = suma % 11
+    return 11 - residuo if residuo > 1 else residuo
+
+
+def separar_nit(valor: str) -> Tuple[str, str]:
+    """
+    Separa un valor ya sin espacios en los extremos en (número, dígito de verificación).
+    El dígito es "" si el valor no trae exactamente un guion seguido de un dígito.
+    """
+    valor = _PREFIJO.sub("", valor.replace(".000000", ""), count=1)
+    if _MILES.fullmatch(valor):
+        valor = valor.replace(".", "")
+    if _CON_DV.fullmatch(valor):
+        return valor[:-2], valor[-1]
+    if _NUMERICO.fullmatch(valor):
+        return valor.split("-")[0], ""
+    return valor, ""
+
+
+@lru_cache(maxsize=DV_CACHE_SIZE)
+def dv_valido(valor: str) -> str:
+    """Valor de DV_VALIDO para un valor limpio de una columna nit."""
+    nit, dv = separar_nit(valor.strip())
+    if not dv or len(nit) > len(PESOS_DV):
+        return ""
+    return DV_SI if digito_verificacion(nit) == int(dv) else DV_NO
+
+
+class LimpiadorNit:
+    """
+    limpiar_nit de un validador: (número sin dígito de verificación, es_valido).
+
+    Args:
+        vacios: Valores (en minúsculas) que se reportan como NIT inválido.
+        conservar_texto: Si los valores solo con letras se conservan como válidos;
+            si no, se reportan como inválidos.
+    """
+
+    def __init__(self, vacios: Iterable[str] = VACIOS_NIT, conservar_texto: bool = False):
+        self.vacios: FrozenSet[str] = frozenset(vacios)
+        self.conservar_texto = conservar_texto
+
+    def __call__(self, valor: str) -> Tuple[str, bool]:
+        valor_limpio = str(valor).strip() if valor else ""
+        if valor_limpio.isdecimal():
+            return valor_limpio, True
+        if not valor_limpio or valor_limpio.lower() in self.vacios:
+            return "", False
+        if _SOLO_LETRAS.fullmatch(valor_limpio):
+            return (valor_limpio, True) if self.conservar_texto else ("", False)
+        return separar_nit(valor_limpio)[0], True
+
+    def columna(self, valores):
+        """
+        Variante para una Series de cadenas no vacías.
+        Retorna (valores normalizados, máscara de válidos) como arrays de NumPy.
+        """
+        import numpy as np
+
+        resultado = valores.to_numpy(dtype=object, copy=True)
+        validos = np.ones(len(resultado), dtype=bool)
+        pendientes = _no_decimales(resultado)
+        if pendientes.any():
+            codigos, unicos = _factorizar(resultado[pendientes])
+            limpios = [self(valor) for valor in unicos]
+            normalizados = np.empty(len(limpios), dtype=object)
+            normalizados[:] = [normalizado for normalizado, _ in limpios]
+            validos_unicos = np.fromiter((es_valido for _, es_valido in limpios), dtype=bool, count=len(limpios))
+            resultado[pendientes] = normalizados[codigos]
+            validos[pendientes] = validos_unicos[codigos]
+        return resultado, validos
+
+
+def _no_decimales(valores):
+    """Máscara de los valores que no son solo dígitos: los demás quedan igual al limpiarlos y no traen DV."""
+    import numpy as np
+
+    return ~np.fromiter(map(str.isdecimal, valores), dtype=bool, count=len(valores))
+
+
+def _factorizar(valores):
+    import pandas as pd
+
+    return pd.factorize(valores, sort=False)
+
+
+def digitos_verificacion(nits):
+    """digito_verificacion de un array de NIT con solo dígitos ASCII y hasta len(PESOS_DV) dígitos."""
+    import numpy as np
+
+    ancho = len(PESOS_DV)
+    relleno = np.char.zfill(np.asarray(nits).astype(f"S{ancho}"), ancho)
+    digitos = relleno.view(np.uint8).reshape(-1, ancho).astype(np.int64) - ord("0")
+    residuo = digitos @ np.array(PESOS_DV[::-1], dtype=np.int64) % 11
+    return np.where(residuo > 1, 11 - residuo, residuo)
+
+
+def dv_valido_columna(valores):
+    """dv_valido sobre una Series o array de valores limpios: retorna un array de NumPy con "SI", "NO" o ""."""
+    import numpy as np
+
+    valores = np.asarray(valores, dtype=object)
+    resultado = np.full(len(valores), "", dtype=object)
+    pendientes = _no_decimales(valores)
+    if not pendientes.any():
+        return resultado
+    codigos, unicos = _factorizar(valores[pendientes])
+    partes = [separar_nit(valor.strip()) for valor in unicos]
+    con_dv = np.fromiter((bool(dv) and len(nit) <= len(PESOS_DV) for nit, dv in partes),
+                         dtype=bool, count=len(partes))
+    estados = np.full(len(partes), "", dtype=object)
+    if con_dv.any():
+        nits = [nit for (nit, _), si in zip(partes, con_dv) if si]
+        declarados = np.array([int(dv) for (_, dv), si in zip(partes, con_dv) if si], dtype=np.int64)
+        estados[con_dv] = np.where(digitos_verificacion(nits) == declarados, DV_SI, DV_NO).astype(object)
+    resultado[pendientes] = estados[codigos]
+    return resultado
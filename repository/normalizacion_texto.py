@@ -0,0 +1,120 @@
+"""
+Normalización de texto compartida por los validadores y los procesadores.
+
+- quitar_tildes: equivale a unicodedata.normalize('NFKD', ...) seguido de
+  encode('ASCII', 'ignore'). Las cadenas ASCII (la gran mayoría) se devuelven
+  sin copiarlas y las Latin-1 se traducen con una tabla de bytes precalculada;
+  solo el resto pasa por unicodedata.
+- normalizar_cadena / limpiar_cadena: _normalize_string y
+  validar_cadena_caracteres_especiales de los Validadores*.
+- NormalizadorEncabezados: strip + mayúsculas + reemplazos de un carácter con
+  una tabla de str.translate, memoizado por nombre (los encabezados se repiten
+  en cada archivo).
+- Variantes *_columna para Series de pandas, que normalizan una sola vez cada
+  valor distinto de la columna.
+"""
+import unicodedata
+from typing import Callable, Dict, Tuple
+
+# Reemplazos de normalize_column_name (el texto ya está en mayúsculas)
+REEMPLAZOS_ENCABEZADO = {
+    ' ': '_', '-': '_', 'Á': 'A', 'É': 'E', 'Í': 'I', 'Ó': 'O', 'Ú': 'U', 'Ñ': 'N', '.': '',
+}
+# Nombres memoizados por NormalizadorEncabezados antes de vaciar el memo
+MAX_ENCABEZADOS_MEMO = 10000
+
+
+def _nfkd_ascii(valor: str) -> str:
+    return unicodedata.normalize('NFKD', valor).encode('ASCII', 'ignore').decode('ASCII')
+
+
+def _tabla_latin1() -> Tuple[bytes, bytes]:
+    """
+    Tabla de bytes.translate con el resultado de _nfkd_ascii para cada carácter
+    Latin-1 y los bytes que se eliminan. Los que se expanden a varios caracteres
+    (¼ ½ ¾) quedan sin traducir para que la decodificación ASCII falle.
+    """
+    tabla = bytearray(range(256))
+    borrar = bytearray()
+    for codigo in range(128, 256):
+        ascii_ = _nfkd_ascii(chr(codigo))
+        if len(ascii_) == 1:
+            tabla[codigo] = ord(ascii_)
+        elif not ascii_:
+            borrar.append(codigo)
+    return bytes(tabla), bytes(borrar)
+
+
+_TABLA_LATIN1, _BORRAR_LATIN1 = _tabla_latin1()
+
+
+def quitar_tildes(valor: str) -> str:
+    """Elimina tildes y caracteres no ASCII conservando mayúsculas y puntuación."""
+    if valor.isascii():
+        return valor
+    try:
+        return valor.encode('latin-1').translate(_TABLA_LATIN1, _BORRAR_LATIN1).decode('ascii')
+    except UnicodeError:
+        # Fuera de Latin-1, o ¼ ½ ¾
+        return _nfkd_ascii(valor)
+
+
+def normalizar_cadena(valor: str) -> str:
+    """Cadena sin espacios en los extremos, tildes ni caracteres no ASCII."""
+    if not valor:
+        return ""
+    return quitar_tildes(valor.strip())
+
+
+def limpiar_cadena(valor: str) -> str:
+    """normalizar_cadena sin puntos ni comas."""
+    return normalizar_cadena(valor).replace('.', '').replace(',', '')
+
+
+class NormalizadorEncabezados:
+    """Normaliza nombres de columna: strip, mayúsculas y reemplazos de un carácter ('' elimina)."""
+
+    def __init__(self, reemplazos: Dict[str, str]):
+        # Identidad explícita para Latin-1: str.translate es más lento con claves ausentes
+        self.tabla = {codigo: codigo for codigo in range(256)}
+        self.tabla.update(str.maketrans({antes: despues or None for antes, despues in reemplazos.items()}))
+        self._memo: Dict[str, str] = {}
+
+    def __call__(self, nombre: str) -> str:
+        normalizado = self._memo.get(nombre)
+        if normalizado is None:
+            if len(self._memo) >= MAX_ENCABEZADOS_MEMO:
+                self._memo.clear()
+            normalizado = self._memo[nombre] = nombre.strip().upper().translate(self.tabla)
+        return normalizado
+
+
+NORMALIZAR_ENCABEZADO = NormalizadorEncabezados(REEMPLAZOS_ENCABEZADO)
+# Variante de los proyectos que también reemplazan '/' por '_'
+NORMALIZAR_ENCABEZADO_CON_BARRA = NormalizadorEncabezados({**REEMPLAZOS_ENCABEZADO, '/': '_'})
+
+
+def por_valor_distinto(valores, funcion: Callable[[str], str]):
+    """Aplica funcion una vez por valor distinto de la Series y expande el resultado (los nulos se conservan)."""
+    import numpy as np
+    import pandas as pd
+
+    codigos, unicos = pd.factorize(valores, sort=False)
+    transformados = np.empty(len(unicos), dtype=object)
+    transformados[:] = [funcion(valor) for valor in unicos]
+    resultado = valores.to_numpy(dtype=object, copy=True)
+    presentes = codigos >= 0
+    resultado[presentes] = transformados[codigos[presentes]]
+    return pd.Series(resultado, index=valores.index, name=valores.name)
+
+
+def quitar_tildes_columna(valores):
+    return por_valor_distinto(valores, quitar_tildes)
+
+
+def normalizar_cadena_columna(valores):
+    return por_valor_distinto(valores, normalizar_cadena)
+
+
+def limpiar_cadena_columna(valores):
+    return por_valor_distinto(valores, limpiar_cadena)
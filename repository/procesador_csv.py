@@ -0,0 +1,666 @@
+"""
+Motor de normalización de los CSVProcessor de los proyectos.
+
+BaseCSVProcessor lee el CSV con un tokenizador nativo, limpia y valida cada
+columna según el type_mapping con los métodos del validador del proyecto
+(memoizados por valor distinto, por bloques con el motor vectorizado o en
+varios procesos), reorganiza las columnas según los encabezados de referencia
+y escribe la salida (CSV o Parquet) y los errores en streaming.
+
+Cada proyecto define en su transformar_columnas_*.py una subclase CSVProcessor
+con sus tablas: REFERENCE_HEADERS, REPLACEMENT_MAP, VALIDATION_METHODS,
+ERROR_MESSAGES, la normalización de encabezados y el quoting de la salida.
+"""
+import csv
+import os
+import shutil
+import tempfile
+from concurrent.futures import Executor, ProcessPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Union, Optional, Tuple
+from dataclasses import dataclass, field
+from functools import lru_cache, partial
+from itertools import chain, islice
+import time
+import io
+
+from repository.metricas import Medicion, medir_validador
+from repository.nit import COLUMNA_DV, dv_valido, dv_valido_columna
+from repository.normalizacion_texto import NORMALIZAR_ENCABEZADO
+
+NULL_VALUES = {"$null$", "nan", "NULL", "N.A", "null", "N.A."}
+DELIMITER = '|'
+ENCODING = 'utf-8'
+# Filas leídas antes de procesar para inferir el formato de cada columna de fecha
+DATE_SAMPLE_SIZE = 200
+# Tamaño máximo del mapa valor -> (normalizado, es_valido) de cada columna validada
+VALUE_CACHE_SIZE = 50000
+
+# Mapas de las columnas de catálogo (choice_*), compartidos por todo el proceso:
+# (clase del validador, método) -> validador memoizado
+_CATALOG_CACHES: Dict[Tuple[type, str], Callable] = {}
+# Modo paralelo: rangos de bytes por proceso y tamaño mínimo de cada rango
+CHUNKS_PER_WORKER = 4
+MIN_CHUNK_BYTES = 1 << 20
+# Cada cuántas filas se llama al callback de progreso
+PROGRESS_EVERY = 10000
+# Formatos de salida de process_csv
+OUTPUT_FORMATS = ('csv', 'parquet')
+
+
+class PipeDialect(csv.Dialect):
+    """Dialecto de los CSV de entrada: separador '|', comillas dobles y '\\' como escape."""
+    delimiter = DELIMITER
+    quotechar = '"'
+    escapechar = '\\'
+    doublequote = True
+    skipinitialspace = False
+    lineterminator = '\n'
+    quoting = csv.QUOTE_MINIMAL
+
+
+def pipe_tokenizer(f) -> Iterator[List[str]]:
+    """
+    Tokenizador por defecto. Usa el lector csv nativo (C) en una sola pasada:
+    los campos entre comillas pueden contener comas y saltos de línea reales.
+    La secuencia literal '\\n' (o '\\\\n') se convierte en un salto de línea escapado.
+    El archivo debe abrirse con newline=''.
+    """
+    lines = (line.replace('\\\\n', '\\n').replace('\\n', '\\\n') for line in f)
+    return csv.reader(lines, PipeDialect)
+
+
+@dataclass
+class ErrorInfo:
+    columna: str
+    numero_columna: int
+    tipo: str
+    valor: str
+    fila: int
+    error: str
+
+
+@dataclass
+class ColumnPlan:
+    """Plan de columnas compilado una vez por archivo a partir del header y el type_mapping."""
+    # (índice, método de validación, nombre de columna, tipo, mensaje de error)
+    checks: List[Tuple[int, Callable[[str], Tuple[str, bool]], str, str, str]]
+    # Índice en la fila original para cada columna de salida (n_cols si no existe)
+    output_index: List[int]
+    # Número de columnas del header original
+    n_cols: int
+    # Índices de las columnas nit que se reportan en DV_VALIDO, en orden de salida
+    check_digits: List[int] = field(default_factory=list)
+
+
+class ErrorWriter:
+    """Escribe errores en CSV a medida que ocurren; el archivo se crea con el primer error."""
+
+    def __init__(self, file_path: Optional[str]):
+        self.file_path = file_path
+        self.count = 0
+        # Errores escritos por tipo (métricas)
+        self.by_type: Dict[str, int] = {}
+        self._file = None
+        self._writer = None
+
+    def write(self, error: ErrorInfo) -> None:
+        self.count += 1
+        self.by_type[error.tipo] = self.by_type.get(error.tipo, 0) + 1
+        if not self.file_path:
+            return
+        if self._writer is None:
+            self._file = open(self.file_path, 'w', newline='', encoding=ENCODING)
+            self._writer = csv.DictWriter(self._file, fieldnames=error.__dict__.keys())
+            self._writer.writeheader()
+        self._writer.writerow(error.__dict__)
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> 'ErrorWriter':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+class BaseCSVProcessor:
+    """Pipeline común de los CSVProcessor; las subclases definen las tablas del proyecto."""
+    # Encabezados de referencia (orden de salida)
+    REFERENCE_HEADERS: List[str] = []
+    # Mapeo de reemplazo de columnas
+    REPLACEMENT_MAP: Dict[str, str] = {}
+    # tipo -> (método del validador, clave del mensaje de error)
+    VALIDATION_METHODS: Dict[str, Tuple[str, str]] = {}
+    ERROR_MESSAGES: Dict[str, str] = {}
+    # Normalización de los nombres de columna (ver repository.normalizacion_texto)
+    HEADER_NORMALIZER: Callable[[str], str] = NORMALIZAR_ENCABEZADO
+    # Quoting de la salida CSV
+    QUOTING = csv.QUOTE_ALL
+
+    def __init__(self, validator=None, tokenizer=None, check_digit: bool = False):
+        self.validator = validator
+        self.tokenizer = tokenizer or pipe_tokenizer
+        # Aciertos/fallos de la memoización por columna del último archivo procesado
+        self.validation_stats: Dict[str, Dict[str, Union[str, int]]] = {}
+        # Medición por etapas del último archivo procesado (ver repository.metricas)
+        self.metrics: Optional[Medicion] = None
+        # Agrega DV_VALIDO con la verificación del dígito de las columnas nit (ver check_digit_columns)
+        self.check_digit = check_digit
+        self.error_messages = dict(self.ERROR_MESSAGES)
+
+    def normalize_column_name(self, column_name: str) -> str:
+        """Normaliza nombres de columnas reemplazando espacios y caracteres especiales."""
+        return self.HEADER_NORMALIZER(column_name)
+
+    def organize_headers(self, actual_headers: List[str]) -> List[str]:
+        """Organiza headers segue REFERENCE_HEADERS y aplica reemplazos."""
+        normalized = [self.normalize_column_name(h) for h in actual_headers]
+
+        # Aplicar reemplazos
+        for i, header in enumerate(normalized):
+            normalized[i] = self.REPLACEMENT_MAP.get(header, header)
+
+        # Eliminar duplicados manteniendo orden
+        seen = set()
+        unique_headers = []
+        for h in normalized:
+            if h not in seen:
+                seen.add(h)
+                unique_headers.append(h)
+
+        # Ordenar según REFERENCE_HEADERS
+        ref_headers_normalized = [self.normalize_column_name(h) for h in self.REFERENCE_HEADERS]
+        ordered = []
+        remaining = []
+        
+        for ref_h in ref_headers_normalized:
+            if ref_h in unique_headers:
+                ordered.append(ref_h)
+        
+        remaining = [h for h in unique_headers if h not in ordered]
+        return ordered + remaining
+
+    def check_digit_columns(self, header: List[str],
+                            type_mapping: Optional[Dict[str, List[int]]]) -> List[Tuple[int, str]]:
+        """
+        Columnas nit cuyo dígito de verificación se reporta si check_digit: (índice, columna de
+        salida). La columna es DV_VALIDO, o DV_VALIDO_<columna> si el archivo tiene varias nit.
+        """
+        if not self.check_digit or not type_mapping:
+            return []
+        columns = sorted({col_num - 1 for col_num in type_mapping.get("nit", []) if 0 < col_num <= len(header)})
+        if len(columns) == 1:
+            return [(columns[0], COLUMNA_DV)]
+        return [(idx, f"{COLUMNA_DV}_{self.normalize_column_name(header[idx])}") for idx in columns]
+
+    def output_headers(self, header: List[str], type_mapping: Optional[Dict[str, List[int]]]) -> List[str]:
+        """Headers de salida: organize_headers seguido de las columnas de check_digit_columns."""
+        return self.organize_headers(header) + [name for _, name in self.check_digit_columns(header, type_mapping)]
+
+    def clean_value(self, value: str) -> str:
+        """Limpia valores nulos y espacios."""
+        if value is None:
+            return ""
+        value = str(value).strip()
+        return "" if value.upper() in NULL_VALUES else value
+
+    def iter_csv(self, f) -> Iterator[List[str]]:
+        """Itera las filas de un archivo abierto (newline='') con el tokenizador configurado."""
+        return self.tokenizer(f)
+
+    def read_csv(self, input_file: str) -> Tuple[List[str], List[List[str]]]:
+        """Lee CSV completo en memoria. Para archivos grandes usar iter_csv."""
+        with open(input_file, 'r', newline='', encoding=ENCODING) as f:
+            data = list(self.iter_csv(f))
+            return data[0], data[1:] if len(data) > 1 else []
+
+    def process_csv(self, input_file: str, output_file: str, error_file: str = None, 
+                   type_mapping: Dict[str, List[int]] = None, batch_size: int = None,
+                   workers: int = None, progress: Callable[[int, int], None] = None,
+                   output_format: str = 'csv', pool: Executor = None) -> None:
+        """
+        Procesa CSV completo fila por fila (memoria constante) con:
+        - Normalización de headers
+        - Validación de datos
+        - Manejo de errores
+
+        Con batch_size, las filas se validan por bloques de ese tamaño con el motor
+        vectorizado (pandas); el resultado es idéntico al de la ruta celda a celda.
+        Con workers > 1 el archivo se procesa en paralelo (ver process_csv_parallel), en pool
+        si se recibe uno.
+        progress(filas_procesadas, errores) se llama periódicamente; si lanza una
+        excepción el procesamiento se detiene (cancelación).
+        Con output_format='parquet' la salida es un Parquet con las columnas validadas tipadas
+        (ver _output_writer).
+        """
+        if workers and workers > 1:
+            return self.process_csv_parallel(input_file, output_file, error_file, type_mapping,
+                                             batch_size, workers, progress, output_format, pool)
+        self.metrics = Medicion()
+        start = time.perf_counter()
+        try:
+            with open(input_file, 'r', newline='', encoding=ENCODING) as infile:
+                rows = self.iter_csv(infile)
+                header = next(rows, None)
+                if header is None:
+                    raise ValueError("El archivo no tiene encabezado")
+                normalized_header = self.output_headers(header, type_mapping)
+
+                with self._output_writer(output_file, header, normalized_header, type_mapping,
+                                         output_format) as writer, \
+                        ErrorWriter(error_file) as errors, self.metrics:
+                    self._process_rows(rows, header, normalized_header, type_mapping, writer, errors,
+                                       batch_size, progress=progress)
+
+        except Exception as e:
+            raise Exception(f"Error procesando archivo: {str(e)}")
+        self._record_metrics(input_file, time.perf_counter() - start)
+
+    def _process_rows(self, rows: Iterator[List[str]], header: List[str], normalized_header: List[str],
+                      type_mapping: Optional[Dict[str, List[int]]], writer, errors: ErrorWriter,
+                      batch_size: int = None, first_row: int = 1,
+                      progress: Callable[[int, int], None] = None) -> None:
+        """Procesa los registros de datos (sin header) numerándolos desde first_row."""
+        metrics = self.metrics
+        rows = metrics.iterar('lectura', rows)
+        writer = metrics.escritor('escritura', writer)
+        plan = self.build_column_plan(header, normalized_header, type_mapping)
+
+        sample = list(islice(rows, DATE_SAMPLE_SIZE))
+        self.infer_date_formats(plan, sample)
+        rows = chain(sample, rows)
+        cache_baseline = self.memoize_checks(plan)
+
+        row_num = first_row - 1
+        if not batch_size:
+            for row_num, row in enumerate(rows, start=first_row):
+                self._process_row(row, row_num, plan, writer, errors)
+                if progress and row_num % PROGRESS_EVERY == 0:
+                    progress(row_num - first_row + 1, errors.count)
+        else:
+            block = []
+            for row_num, row in enumerate(rows, start=first_row):
+                if progress and row_num % PROGRESS_EVERY == 0:
+                    progress(row_num - first_row, errors.count)
+                if len(row) != plan.n_cols:
+                    # Vaciar el bloque antes para conservar el orden de los errores
+                    self._process_block(block, plan, writer, errors)
+                    block = []
+                    self._process_row(row, row_num, plan, writer, errors)
+                    continue
+                block.append((row_num, row))
+                if len(block) >= batch_size:
+                    self._process_block(block, plan, writer, errors)
+                    block = []
+            self._process_block(block, plan, writer, errors)
+
+        metrics.filas += row_num - first_row + 1
+        metrics.errores = dict(errors.by_type)
+        self.validation_stats = self._cache_stats(plan, cache_baseline)
+        if progress:
+            progress(row_num - first_row + 1, errors.count)
+
+    def process_csv_parallel(self, input_file: str, output_file: str, error_file: str = None,
+                             type_mapping: Dict[str, List[int]] = None, batch_size: int = None,
+                             workers: int = None, progress: Callable[[int, int], None] = None,
+                             output_format: str = 'csv', pool: Executor = None) -> None:
+        """
+        Procesa el CSV en varios procesos:
+        - Divide el archivo en rangos de bytes que terminan en fin de registro, usando el
+          mismo tokenizer (los campos entre comillas con saltos de línea no se parten)
+        - Cada rango se procesa en un ProcessPoolExecutor con el mismo validador: el pool
+          recibido (compartido, no se cierra) o uno propio de hasta workers procesos
+        - Salida y errores se unen en orden, con los números de fila globales del archivo
+        - progress se llama en el proceso principal al terminar cada rango
+        """
+        workers = workers or os.cpu_count() or 1
+        start = time.perf_counter()
+        try:
+            header, chunks = self._split_chunks(input_file, workers * CHUNKS_PER_WORKER)
+            if len(chunks) <= 1:
+                return self.process_csv(input_file, output_file, error_file, type_mapping, batch_size,
+                                        progress=progress, output_format=output_format)
+            self.metrics = Medicion()
+            self.metrics.sumar('division', time.perf_counter() - start)
+            normalized_header = self.output_headers(header, type_mapping)
+
+            tmp_dir = tempfile.mkdtemp(dir=os.path.dirname(os.path.abspath(output_file)))
+            try:
+                parts = [(os.path.join(tmp_dir, f"{n}.{output_format}"), os.path.join(tmp_dir, f"{n}_errores.csv") if error_file else None)
+                         for n in range(len(chunks))]
+                own_pool = pool is None
+                if own_pool:
+                    pool = ProcessPoolExecutor(max_workers=min(workers, len(chunks)))
+                futures = []
+                try:
+                    for (chunk_start, chunk_end, first_row, _), (output_part, error_part) in zip(chunks, parts):
+                        futures.append(pool.submit(_process_chunk, self, input_file, chunk_start, chunk_end, first_row,
+                                                   header, type_mapping, batch_size, output_part, error_part,
+                                                   output_format))
+                    chunk_stats = []
+                    error_count = 0
+                    try:
+                        for future, (_, _, first_row, n_rows) in zip(futures, chunks):
+                            stats, chunk_errors, chunk_metrics = future.result()
+                            chunk_stats.append(stats)
+                            self.metrics.combinar(chunk_metrics)
+                            error_count += chunk_errors
+                            if progress:
+                                progress(first_row + n_rows - 1, error_count)
+                    except BaseException:
+                        # No lanzar los rangos pendientes (error o cancelación)
+                        for future in futures:
+                            future.cancel()
+                        raise
+                finally:
+                    # Los rangos que ya corren terminan antes de borrar tmp_dir
+                    if own_pool:
+                        pool.shutdown()
+                    else:
+                        wait(futures)
+
+                merge_start = time.perf_counter()
+                if output_format == 'parquet':
+                    with self._output_writer(output_file, header, normalized_header, type_mapping,
+                                             output_format) as writer:
+                        for output_part, _ in parts:
+                            writer.anexar(output_part)
+                else:
+                    with open(output_file, 'w', newline='', encoding=ENCODING) as outfile:
+                        self._make_writer(outfile).writerow(normalized_header)
+                        for output_part, _ in parts:
+                            with open(output_part, 'r', newline='', encoding=ENCODING) as part:
+                                shutil.copyfileobj(part, outfile)
+
+                # Los errores ya traen la fila global; solo se conserva el header del primero
+                error_parts = [error_part for _, error_part in parts if error_part and os.path.exists(error_part)]
+                if error_parts:
+                    with open(error_file, 'w', newline='', encoding=ENCODING) as errfile:
+                        for n, error_part in enumerate(error_parts):
+                            with open(error_part, 'r', newline='', encoding=ENCODING) as part:
+                                error_header = part.readline()
+                                if n == 0:
+                                    errfile.write(error_header)
+                                shutil.copyfileobj(part, errfile)
+                self.metrics.sumar('union_partes', time.perf_counter() - merge_start)
+            finally:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+
+            self.validation_stats = {}
+            for stats in chunk_stats:
+                for col_name, col_stats in stats.items():
+                    total = self.validation_stats.setdefault(col_name, {"tipo": col_stats["tipo"], "aciertos": 0, "fallos": 0})
+                    total["aciertos"] += col_stats["aciertos"]
+                    total["fallos"] += col_stats["fallos"]
+            self._record_metrics(input_file, time.perf_counter() - start)
+
+        except Exception as e:
+            raise Exception(f"Error procesando archivo: {str(e)}")
+
+    def _split_chunks(self, input_file: str, n_chunks: int) -> Tuple[List[str], List[Tuple[int, int, int, int]]]:
+        """
+        Recorre el archivo con el tokenizer y lo divide en rangos de bytes de registros completos.
+        Retorna el header y los rangos (inicio, fin, número de la primera fila, número de filas).
+        """
+        target = max(os.path.getsize(input_file) // max(n_chunks, 1), MIN_CHUNK_BYTES)
+        offset = 0
+
+        with open(input_file, 'r', newline='', encoding=ENCODING) as infile:
+            def counted_lines():
+                nonlocal offset
+                for line in infile:
+                    offset += len(line.encode(ENCODING))
+                    yield line
+
+            rows = self.tokenizer(counted_lines())
+            header = next(rows, None)
+            if header is None:
+                raise ValueError("El archivo no tiene encabezado")
+
+            chunks = []
+            start, first_row, row_num = offset, 1, 0
+            for row_num, _ in enumerate(rows, start=1):
+                # El tokenizer consume las líneas de un registro justo antes de entregarlo
+                if offset - start >= target:
+                    chunks.append((start, offset, first_row, row_num - first_row + 1))
+                    start, first_row = offset, row_num + 1
+            if offset > start:
+                chunks.append((start, offset, first_row, row_num - first_row + 1))
+        return header, chunks
+
+    def _process_row(self, row: List[str], row_num: int, plan: ColumnPlan, writer, errors: ErrorWriter) -> None:
+        """Limpia, valida, reorganiza y escribe una fila celda a celda."""
+        try:
+            if len(row) != plan.n_cols:
+                raise ValueError(f"Columnas esperadas: {plan.n_cols}, obtenidas: {len(row)}")
+
+            processed_row = [self.clean_value(raw_val) for raw_val in row]
+
+            # Validación de tipos según el plan de columnas
+            start = time.perf_counter()
+            check_digits = [dv_valido(processed_row[idx]) for idx in plan.check_digits]
+            for idx, validate, col_name, expected_type, message in plan.checks:
+                value = processed_row[idx]
+                if not value:
+                    continue
+                validated, is_valid = validate(value)
+                processed_row[idx] = validated
+                if not is_valid:
+                    errors.write(ErrorInfo(
+                        columna=col_name, numero_columna=idx + 1,
+                        tipo=expected_type, valor=value, fila=row_num,
+                        error=message
+                    ))
+            self.metrics.sumar('validacion', time.perf_counter() - start)
+
+            # Reorganizar según headers normalizados
+            processed_row.append("")
+            processed_row.extend(check_digits)
+            writer.writerow([processed_row[i] for i in plan.output_index])
+
+        except Exception as e:
+            errors.write(ErrorInfo(
+                columna="", numero_columna=0, tipo="processing",
+                valor=str(row), fila=row_num, error=str(e)
+            ))
+
+    def _process_block(self, block: List[Tuple[int, List[str]]], plan: ColumnPlan, writer, errors: ErrorWriter) -> None:
+        """Valida un bloque de filas (row_num, row) con el motor vectorizado y escribe resultado y errores en orden."""
+        if not block:
+            return
+        from repository.validacion_vectorizada import validar_bloque
+
+        start = time.perf_counter()
+        try:
+            # La columna vacía y las DV_VALIDO van después de las del archivo
+            cleaned, validated, error_mask = validar_bloque([row for _, row in block], plan.checks, NULL_VALUES,
+                                                            1 + len(plan.check_digits))
+        except Exception:
+            # Un validador falló: la ruta celda a celda produce los errores de procesamiento exactos
+            for row_num, row in block:
+                self._process_row(row, row_num, plan, writer, errors)
+            return
+        for position, idx in enumerate(plan.check_digits, start=plan.n_cols + 1):
+            validated[:, position] = dv_valido_columna(cleaned[:, idx])
+        self.metrics.sumar('validacion', time.perf_counter() - start)
+
+        for i, pos in zip(*error_mask.nonzero()):
+            idx, _, col_name, expected_type, message = plan.checks[pos]
+            errors.write(ErrorInfo(
+                columna=col_name, numero_columna=idx + 1,
+                tipo=expected_type, valor=cleaned[i, idx], fila=block[i][0],
+                error=message
+            ))
+
+        writer.writerows(validated[:, plan.output_index].tolist())
+
+    def build_column_plan(self, header: List[str], normalized_header: List[str],
+                          type_mapping: Dict[str, List[int]] = None) -> ColumnPlan:
+        """Compila validadores por columna y la permutación de salida una sola vez por archivo."""
+        expected_types = {}
+        for type_name, columns in (type_mapping or {}).items():
+            for col_num in columns:
+                expected_types.setdefault(col_num, type_name)
+
+        checks = []
+        if type_mapping and self.validator:
+            for idx, col_name in enumerate(header):
+                expected_type = expected_types.get(idx + 1, "str")
+                if expected_type not in self.VALIDATION_METHODS:
+                    continue
+                method, error_key = self.VALIDATION_METHODS[expected_type]
+                validate = medir_validador(getattr(self.validator, method),
+                                           f"{type(self.validator).__name__}.{method}")
+                checks.append((
+                    idx, validate, col_name, expected_type,
+                    self.error_messages.get(error_key, error_key)
+                ))
+
+        # Índice de la columna vacía que process_csv agrega al final de cada fila
+        missing = len(header)
+        # Las columnas DV_VALIDO van después de la columna vacía
+        check_digits = self.check_digit_columns(header, type_mapping)
+        extra_index = {name: missing + 1 + k for k, (_, name) in enumerate(check_digits)}
+        header_map = {self.normalize_column_name(h): i for i, h in enumerate(header)}
+        output_index = []
+        for final_header in normalized_header:
+            if final_header in extra_index:
+                output_index.append(extra_index[final_header])
+                continue
+            norm_header = self.normalize_column_name(final_header)
+            if norm_header in header_map:
+                output_index.append(header_map[norm_header])
+                continue
+            # Buscar posibles mapeos alternativos
+            for orig, replacement in self.REPLACEMENT_MAP.items():
+                if replacement == final_header and orig in header_map:
+                    output_index.append(header_map[orig])
+                    break
+            else:
+                output_index.append(missing)
+
+        return ColumnPlan(checks=checks, output_index=output_index, n_cols=len(header),
+                          check_digits=[idx for idx, _ in check_digits])
+
+    def infer_date_formats(self, plan: ColumnPlan, sample: List[List[str]]) -> None:
+        """
+        Fija en el plan el formato de entrada dominante de cada columna validada con validar_date,
+        inferido sobre una muestra de filas, para no probar todos los formatos en cada valor.
+        """
+        infer = getattr(self.validator, 'inferir_formato_fecha', None)
+        if infer is None:
+            return
+        for pos, (idx, validate, col_name, expected_type, message) in enumerate(plan.checks):
+            if getattr(validate, '__name__', '') != 'validar_date':
+                continue
+            date_format = infer(self.clean_value(row[idx]) for row in sample if len(row) == plan.n_cols)
+            if date_format:
+                plan.checks[pos] = (idx, partial(validate, formato_entrada=date_format),
+                                    col_name, expected_type, message)
+
+    def memoize_checks(self, plan: ColumnPlan) -> List[Tuple[int, int]]:
+        """
+        Envuelve cada validador del plan en un mapa LRU acotado valor -> (normalizado, es_valido),
+        de modo que cada valor distinto se valida una sola vez por archivo, o una sola vez por
+        proceso en las columnas de catálogo (choice_*). Los validadores no guardan estado, así que
+        el resultado es el mismo. Retorna los contadores (aciertos, fallos) iniciales de cada mapa.
+        """
+        baseline = []
+        for pos, (idx, validate, col_name, expected_type, message) in enumerate(plan.checks):
+            if expected_type.startswith("choice"):
+                key = (type(self.validator), validate.__name__)
+                if key not in _CATALOG_CACHES:
+                    _CATALOG_CACHES[key] = lru_cache(maxsize=VALUE_CACHE_SIZE)(validate)
+                memo = _CATALOG_CACHES[key]
+            else:
+                memo = lru_cache(maxsize=VALUE_CACHE_SIZE)(validate)
+            info = memo.cache_info()
+            baseline.append((info.hits, info.misses))
+            plan.checks[pos] = (idx, memo, col_name, expected_type, message)
+        return baseline
+
+    def _cache_stats(self, plan: ColumnPlan, baseline: List[Tuple[int, int]]) -> Dict[str, Dict[str, Union[str, int]]]:
+        """Aciertos y fallos de la memoización de cada columna durante el archivo actual."""
+        stats = {}
+        for (_, memo, col_name, expected_type, _), (hits, misses) in zip(plan.checks, baseline):
+            info = memo.cache_info()
+            stats[col_name] = {
+                "tipo": expected_type,
+                "aciertos": info.hits - hits,
+                "fallos": info.misses - misses,
+            }
+        return stats
+
+    def _record_metrics(self, input_file: str, seconds: float) -> None:
+        """Publica en /metrics la medición del archivo procesado (ver repository.metricas)."""
+        self.metrics.registrar(type(self).__module__.rsplit('.', 1)[-1], seconds,
+                               os.path.getsize(input_file), self.validation_stats)
+
+    @contextmanager
+    def _output_writer(self, output_file: str, header: List[str], normalized_header: List[str],
+                       type_mapping: Optional[Dict[str, List[int]]], output_format: str = 'csv',
+                       write_header: bool = True):
+        """
+        Abre la salida con la interfaz de csv.writer: CSV (QUOTING, con el header si
+        write_header) o Parquet, donde las columnas validadas como int, float, date o
+        datetime quedan tipadas y las choice_* como diccionario (ver repository.salida_parquet).
+        """
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Formato de salida no soportado: {output_format}")
+        if output_format == 'parquet':
+            from repository.salida_parquet import EscritorParquet
+
+            plan = self.build_column_plan(header, normalized_header, type_mapping)
+            types = {idx: expected_type for idx, _, _, expected_type, _ in plan.checks}
+            column_types = [types.get(idx) for idx in plan.output_index]
+            with EscritorParquet(output_file, normalized_header, column_types) as writer:
+                yield writer
+            return
+        with open(output_file, 'w', newline='', encoding=ENCODING) as f:
+            writer = self._make_writer(f)
+            if write_header:
+                writer.writerow(normalized_header)
+            yield writer
+
+    def _make_writer(self, f):
+        """Crea el writer CSV de salida."""
+        return csv.writer(f, delimiter=DELIMITER, quotechar='"', quoting=self.QUOTING)
+
+    def _save_output(self, file_path: str, header: List[str], data: List[List[str]]) -> None:
+        """Guarda datos procesados en CSV."""
+        with open(file_path, 'w', newline='', encoding=ENCODING) as f:
+            writer = self._make_writer(f)
+            writer.writerow(header)
+            writer.writerows(data)
+
+    def _save_errors(self, file_path: str, errors: List[ErrorInfo]) -> None:
+        """Guarda errores en CSV."""
+        with open(file_path, 'w', newline='', encoding=ENCODING) as f:
+            writer = csv.DictWriter(f, fieldnames=errors[0].__dict__.keys())
+            writer.writeheader()
+            writer.writerows([e.__dict__ for e in errors])
+
+
+def _process_chunk(processor: BaseCSVProcessor, input_file: str, start: int, end: int, first_row: int,
+                   header: List[str], type_mapping: Optional[Dict[str, List[int]]], batch_size: Optional[int],
+                   output_part: str, error_part: Optional[str],
+                   output_format: str = 'csv') -> Tuple[Dict[str, Dict[str, Union[str, int]]], int, Medicion]:
+    """
+    Procesa en un proceso del pool un rango de bytes de registros completos del archivo.
+    Retorna las estadísticas de memoización, el número de errores y la medición del rango.
+    """
+    with open(input_file, 'rb') as f:
+        f.seek(start)
+        text = f.read(end - start).decode(ENCODING)
+    normalized_header = processor.output_headers(header, type_mapping)
+    processor.metrics = Medicion()
+    with processor._output_writer(output_part, header, normalized_header, type_mapping, output_format,
+                                  write_header=False) as writer, ErrorWriter(error_part) as errors, \
+            processor.metrics:
+        rows = processor.iter_csv(io.StringIO(text, newline=''))
+        processor._process_rows(rows, header, normalized_header, type_mapping,
+                                writer, errors, batch_size, first_row)
+    return processor.validation_stats, errors.count, processor.metrics
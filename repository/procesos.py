@@ -0,0 +1,39 @@
+"""
+Pool de procesos compartido por la API.
+
+Normalizar columnas, convertir archivos y los trabajos asíncronos usan el mismo
+ProcessPoolExecutor de PROCESOS procesos en lugar de crear uno por solicitud:
+con varias solicitudes a la vez el número de procesos no pasa de PROCESOS y las
+tareas esperan en la cola del pool. Quien envía tareas al pool cancela las suyas
+pendientes si falla o se cancela; el pool no se cierra entre solicitudes.
+
+Las tareas que corren en el pool no deben enviar tareas a este mismo pool.
+"""
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+# Procesos de la API para normalizar y convertir (de todas las solicitudes a la vez)
+PROCESOS = int(os.environ.get("API_PROCESOS", "0")) or os.cpu_count() or 1
+
+_pool = None
+_bloqueo = threading.Lock()
+
+
+def pool_compartido() -> ProcessPoolExecutor:
+    """El pool compartido; se crea al primer uso y se recrea si un proceso murió."""
+    global _pool
+    with _bloqueo:
+        # Un proceso terminado abruptamente deja el pool inutilizable (BrokenProcessPool)
+        if _pool is None or getattr(_pool, "_broken", False):
+            _pool = ProcessPoolExecutor(max_workers=PROCESOS)
+        return _pool
+
+
+def cerrar_pool() -> None:
+    """Cierra el pool compartido cancelando las tareas que no han empezado."""
+    global _pool
+    with _bloqueo:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
@@ -1,11 +1,14 @@
 import re
-import unicodedata
+from collections import Counter
 from datetime import datetime, time
-from typing import Tuple, Dict, Union
+from typing import Tuple, Dict, Union, Iterable, Optional
 from valores_choice.calidad_quien_solicito import VALORES_CALIDAD_QUIEN_SOLICITO, VALORES_REEMPLAZO_CALIDAD_QUIEN_SOLICITO
 from valores_choice.clasificacion import VALORES_CLASIFICACION, VALORES_REEMPLAZO_CLASIFICACION
 from valores_choice.direccion_seccional_dian import VALORES_DIRECCION_SECCIONAL, VALORES_REEMPLAZO_DIRECCION_SECCIONAL
 from valores_choice.estado_solicitud import VALORES_ESTADO_SOLICITUD, VALORES_REEMPLAZO_ESTADO_SOLICITUD
+from repository.indice_catalogos import IndiceCatalogo
+from repository.nit import LimpiadorNit
+from repository.normalizacion_texto import limpiar_cadena, normalizar_cadena
 
 VALORES_MACROPROCESO = [
     "TRIBUTARIO",
@@ -21,15 +24,32 @@ DATE_FORMATS = {
     'datetime': "%Y-%m-%d %H:%M:%S"
 }
 
+# Formatos de entrada de validar_date en orden de prioridad: nombre -> (formato o regex, es_rango)
+FORMATOS_ENTRADA_FECHA = {
+    'datetime': (DATE_FORMATS['datetime'], False),
+    'date': (DATE_FORMATS['date'], False),
+    'date_YY': (DATE_FORMATS['date_YY'], False),
+    'date_dd_mm_yyyy': (DATE_FORMATS['date_dd_mm_yyyy'], False),
+    'date_range_iso': (r'^(\d{4}-\d{2}-\d{2})(?: - \d{4}-\d{2}-\d{2})?$', True),  # YYYY-MM-DD range
+    'date_range_dmy': (r'^(\d{1,2}/\d{1,2}/\d{4})(?: - \d{1,2}/\d{1,2}/\d{4})?$', True),  # DD/MM/YYYY range
+}
+
+# Índices de catálogo (búsqueda exacta y aproximada), compilados una vez al importar
+INDICE_DIRECCION_SECCIONAL = IndiceCatalogo("direccion_seccional", VALORES_DIRECCION_SECCIONAL, VALORES_REEMPLAZO_DIRECCION_SECCIONAL)
+INDICE_CALIDAD_QUIEN_SOLICITO = IndiceCatalogo("calidad_quien_solicito", VALORES_CALIDAD_QUIEN_SOLICITO, VALORES_REEMPLAZO_CALIDAD_QUIEN_SOLICITO)
+INDICE_CLASIFICACION = IndiceCatalogo("clasificacion", VALORES_CLASIFICACION, VALORES_REEMPLAZO_CLASIFICACION)
+INDICE_ESTADO_SOLICITUD = IndiceCatalogo("estado_solicitud", VALORES_ESTADO_SOLICITUD, VALORES_REEMPLAZO_ESTADO_SOLICITUD)
+
 class ValidadoresPQRMuisca:
     """Clase para validar y normalizer diferentes tipos de datos según requerimientos de la Defensoría."""
 
+    # limpiar_nit del proyecto (ver repository.nit)
+    LIMPIADOR_NIT = LimpiadorNit()
+
     @staticmethod
     def _normalize_string(valor: str) -> str:
         """Normaliza una cadena eliminando acentos y caracteres especiales."""
-        if not valor:
-            return ""
-        return unicodedata.normalize('NFKD', valor.strip()).encode('ASCII', 'ignore').decode('ASCII')
+        return normalizar_cadena(valor)
 
     @staticmethod
     def _clean_numeric(value: str) -> str:
@@ -37,7 +57,7 @@ class ValidadoresPQRMuisca:
         return re.sub(r"[^\d.-]", "", str(value))
 
     def _normalizar_para_validacion(self, valor: str, reemplazos: Dict[str, str]) -> Tuple[str, bool]:
-        valor_normalizado, _ = self.validar_cadena_caracteres_especiales(valor)
+        valor_normalizado = limpiar_cadena(valor)
 
         valor_normalizado = reemplazos.get(valor_normalizado, valor_normalizado)
 
@@ -53,9 +73,44 @@ class ValidadoresPQRMuisca:
         es_valido = re.fullmatch(r"^-?\d+(\.\d+)?$", valor_limpio) is not None
         return valor_limpio, es_valido
 
-    def validar_date(self, valor: str, formato_salida: str = 'date') -> Tuple[str, bool]:
-
-        valor_original = valor
+    def _parsear_fecha(self, valor: str, formato: str) -> Optional[datetime]:
+        """Intenta un único formato de FORMATOS_ENTRADA_FECHA. Retorna None si el valor no lo cumple."""
+        date_format, es_rango = FORMATOS_ENTRADA_FECHA[formato]
+        try:
+            if es_rango:
+                match = re.match(date_format, valor)
+                if not match:
+                    return None
+                fecha_str = match.group(1)  # Tomamos la primera fecha del rango
+
+                if formato == 'date_range_dmy':
+                    return datetime.strptime(fecha_str, DATE_FORMATS['date_dd_mm_yyyy'])
+                return datetime.strptime(fecha_str, DATE_FORMATS['date'])
+            return datetime.strptime(valor, date_format)
+        except (ValueError, TypeError):
+            return None
+
+    def detectar_formato_fecha(self, valor: str) -> Tuple[Optional[datetime], Optional[str]]:
+        """Prueba los formatos de entrada en orden de prioridad. Retorna (fecha, formato) o (None, None)."""
+        for formato in FORMATOS_ENTRADA_FECHA:
+            dt = self._parsear_fecha(valor, formato)
+            if dt is not None:
+                return dt, formato
+        return None, None
+
+    def inferir_formato_fecha(self, muestra: Iterable[str]) -> Optional[str]:
+        """
+        Infiere el formato de entrada dominante de una columna de fechas a partir de una muestra de valores.
+        El resultado se pasa como formato_entrada a validar_date.
+        """
+        conteo = Counter(
+            self.detectar_formato_fecha(str(valor).strip())[1]
+            for valor in muestra if valor is not None and str(valor).strip()
+        )
+        conteo.pop(None, None)
+        return conteo.most_common(1)[0][0] if conteo else None
+
+    def validar_date(self, valor: str, formato_salida: str = 'date', formato_entrada: str = None) -> Tuple[str, bool]:
         if valor is None:
             return "", False
 
@@ -63,78 +118,44 @@ class ValidadoresPQRMuisca:
         if not valor:
             return "", False
 
-        formatos_intento = [
-        ('datetime', DATE_FORMATS['datetime'], False),
-        ('date', DATE_FORMATS['date'], False),
-        ('date_YY', DATE_FORMATS['date_YY'], False),
-        ('date_dd_mm_yyyy', DATE_FORMATS['date_dd_mm_yyyy'], False),
-        ('date_range_iso', r'^(\d{4}-\d{2}-\d{2})(?: - \d{4}-\d{2}-\d{2})?$', True),  # YYYY-MM-DD range
-        ('date_range_dmy', r'^(\d{1,2}/\d{1,2}/\d{4})(?: - \d{1,2}/\d{1,2}/\d{4})?$', True)  # DD/MM/YYYY range
-    ]
-
-        dt = None
-        formato_detectado = None
-
-        for formato, date_format, es_rango in formatos_intento:
-            try:
-                if es_rango:
-                    match = re.match(date_format, valor)
-                    if not match:
-                        continue
-                    fecha_str = match.group(1)
-
-                    if formato == 'date_range_dmy':
-                        dt = datetime.strptime(fecha_str, DATE_FORMATS['date_dd_mm_yyyy'])
-                    else:
-                        dt = datetime.strptime(fecha_str, DATE_FORMATS['date'])
-
-                    formato_detectado = formato.split('_')[1]  # 'dmy' o 'iso'
-                    break
-                else:
-                    dt = datetime.strptime(valor, date_format)
-                    formato_detectado = formato
-                    break
-            except (ValueError, TypeError):
-                continue
+        # Los formatos de entrada son excluyentes: probar primero el dominante de la columna
+        # da el mismo resultado que recorrerlos todos, y el resto solo se intenta si falla
+        dt, formato = None, None
+        if formato_entrada in FORMATOS_ENTRADA_FECHA:
+            dt, formato = self._parsear_fecha(valor, formato_entrada), formato_entrada
+        if dt is None:
+            dt, formato = self.detectar_formato_fecha(valor)
 
         if dt is None:
             return "", False
 
+        formato_detectado = formato.split('_')[1] if FORMATOS_ENTRADA_FECHA[formato][1] else formato
+
+        # Determinar formato de salida (con fallback a 'date')
         formato_output = DATE_FORMATS.get(formato_salida, DATE_FORMATS['date'])
 
         try:
+            # Caso 1: Tenemos datetime pero queremos solo fecha
             if formato_detectado == 'datetime' and formato_salida in ['date', 'date_dd_mm_yyyy']:
                 if dt.time() == time.min:
                     return dt.strftime(DATE_FORMATS[formato_salida]), True
                 return valor, False  # Tiene hora, no podemos convertir a solo fecha
 
+            # Caso 2: Tenemos fecha pero queremos datetime
             elif formato_detectado in ['date', 'date_dd_mm_yyyy'] and formato_salida == 'datetime':
                 return f"{dt.strftime(DATE_FORMATS['date'])} 00:00:00", True
 
+            # Caso 3: Conversión directa
             return dt.strftime(formato_output), True
 
         except ValueError:
             return valor, False
 
     def limpiar_nit(self, valor: str) -> Tuple[str, bool]:
-        if not valor or str(valor).strip().lower() in {'nan', 'null', ''}:
-            return "", False
-        valor_limpio = str(valor).strip()
-        if re.fullmatch(r'[a-zA-Z\s]+', valor_limpio):
-            return "", False
-        valor_limpio = valor_limpio.replace(".000000", "")
-        if re.fullmatch(r'\d+(?:-\d+)*', valor_limpio):
-            valor_limpio = valor_limpio.split("-")[0]
-        es_valido = not re.fullmatch(r"^[a-zA-Z]+$", valor_limpio) is not None
-        if es_valido:
-            return valor_limpio, es_valido
-        else:
-            return "", es_valido
+        return self.LIMPIADOR_NIT(valor)
 
     def validar_cadena_caracteres_especiales(self, valor: str) -> Tuple[str, bool]:
-        valor_normalizado = self._normalize_string(valor)
-        valor_normalizado = valor_normalizado.replace('.', '').replace(',', '')
-        return valor_normalizado, True
+        return limpiar_cadena(valor), True
 
     def validar_direccion_seccional(self, valor):
         """
@@ -144,31 +165,23 @@ class ValidadoresPQRMuisca:
         if '-' in valor:
             valor = valor.split('-', 1)[1]
         normalizado = self._normalizar_para_validacion(valor.lower(), VALORES_REEMPLAZO_DIRECCION_SECCIONAL)
-        if "direccion seccional de impuestos  y aduanas de " in normalizado:
-            normalizado = normalizado.replace("direccion seccional de impuestos  y aduanas de", "direccion seccional de impuestos y aduanas de")
-        if "direccion seccional de impuestos  de " in normalizado:
-            normalizado = normalizado.replace("direccion seccional de impuestos  de ", "direccion seccional de impuestos de ")
-        if "direccion seccionalde aduanas de" in normalizado:
-            normalizado = normalizado.replace("direccion seccionalde aduanas de", "direccion seccional de aduanas de")
-        if "direccion seccional de impuests y aduanas de" in normalizado:
-            normalizado = normalizado.replace("direccion seccional de impuests y aduanas de", "direccion seccional de impuestos y aduanas de")
-        es_valido = normalizado in VALORES_DIRECCION_SECCIONAL
+        normalizado, es_valido = INDICE_DIRECCION_SECCIONAL.resolver(normalizado)
         return normalizado, True
 
     def validar_calidad_quien_solicito(self, valor):
         normalizado = self._normalizar_para_validacion(valor.upper(), VALORES_REEMPLAZO_CALIDAD_QUIEN_SOLICITO)
-        es_valido = normalizado in VALORES_CALIDAD_QUIEN_SOLICITO
+        normalizado, es_valido = INDICE_CALIDAD_QUIEN_SOLICITO.resolver(normalizado)
         return normalizado, True
 
 
     def validar_clasificacion(self, valor):
         normalizado = self._normalizar_para_validacion(valor.upper(), VALORES_REEMPLAZO_CLASIFICACION)
-        es_valido = normalizado in VALORES_CLASIFICACION
+        normalizado, es_valido = INDICE_CLASIFICACION.resolver(normalizado)
         return normalizado, True
 
 
     def validar_estado_solicitud(self, valor):
         normalizado = self._normalizar_para_validacion(valor.upper(), VALORES_REEMPLAZO_ESTADO_SOLICITUD)
-        es_valido = normalizado in VALORES_ESTADO_SOLICITUD
+        normalizado, es_valido = INDICE_ESTADO_SOLICITUD.resolver(normalizado)
         return normalizado, True
 
@@ -2,6 +2,8 @@ import csv
 import os
 from typing import List, Dict
 
+from repository.normalizacion_texto import NORMALIZAR_ENCABEZADO
+
 # Encabezados de referencia en el orden correcto
 REFERENCE_HEADERS = [
     'ARCHIVO_FUENTE',
@@ -42,18 +44,7 @@ REPLACEMENT_MAP = {
 
 def normalize_column_name(column_name: str) -> str:
     """Normaliza los nombres de columna reemplazando espacios y caracteres especiales."""
-    # Reemplazar espacios, guiones y caracteres especiales
-    column_name = column_name.strip().upper()
-    column_name = column_name.replace(' ', '_')
-    column_name = column_name.replace('-', '_')
-    column_name = column_name.replace('Á', 'A')
-    column_name = column_name.replace('É', 'E')
-    column_name = column_name.replace('Í', 'I')
-    column_name = column_name.replace('Ó', 'O')
-    column_name = column_name.replace('Ú', 'U')
-    column_name = column_name.replace('Ñ', 'N')
-    column_name = column_name.replace('.', '')
-    return column_name
+    return NORMALIZAR_ENCABEZADO(column_name)
 
 def organize_headers(actual_headers: List[str]) -> List[str]:
     """Organiza los headers manteniendo el orden de REFERENCE_HEADERS primero y luego los demás en su orden original."""
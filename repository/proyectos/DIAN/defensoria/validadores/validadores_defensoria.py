@@ -1,10 +1,12 @@
 import re
-import unicodedata
 from datetime import datetime, time
 from typing import Tuple, Dict, Union
 from valores_choice.dependencia_dian import VALORES_DEPENDENCIA_DIAN, VALORES_REEMPLAZO_DEPENDENCIA_DIAN
 from valores_choice.procedimientos import VALORES_PROCEDIMIENTOS, VALORES_REEMPLAZAR_PROCEDIMIENTOS
 from valores_choice.proceso import VALORES_PROCESO
+from repository.indice_catalogos import IndiceCatalogo
+from repository.nit import LimpiadorNit
+from repository.normalizacion_texto import limpiar_cadena, normalizar_cadena
 
 # Constantes
 VALORES_MACROPROCESO = [
@@ -20,15 +22,22 @@ DATE_FORMATS = {
     'datetime': "%Y-%m-%d %H:%M:%S"
 }
 
+# Índices de catálogo (búsqueda exacta y aproximada), compilados una vez al importar
+INDICE_DEPENDENCIA_DIAN = IndiceCatalogo("dependencia_dian", VALORES_DEPENDENCIA_DIAN, VALORES_REEMPLAZO_DEPENDENCIA_DIAN)
+INDICE_PROCEDIMIENTOS = IndiceCatalogo("procedimientos", VALORES_PROCEDIMIENTOS, VALORES_REEMPLAZAR_PROCEDIMIENTOS)
+INDICE_MACROPROCESO = IndiceCatalogo("macroproceso", VALORES_MACROPROCESO)
+INDICE_PROCESO = IndiceCatalogo("proceso", VALORES_PROCESO)
+
 class ValidadoresDefensoria:
     """Clase para validar y normalizar diferentes tipos de datos según requerimientos de la Defensoría."""
 
+    # limpiar_nit del proyecto (ver repository.nit)
+    LIMPIADOR_NIT = LimpiadorNit()
+
     @staticmethod
     def _normalize_string(valor: str) -> str:
         """Normaliza una cadena eliminando acentos y caracteres especiales."""
-        if not valor:
-            return ""
-        return unicodedata.normalize('NFKD', valor.strip()).encode('ASCII', 'ignore').decode('ASCII')
+        return normalizar_cadena(valor)
 
     @staticmethod
     def _clean_numeric(value: str) -> str:
@@ -36,7 +45,7 @@ class ValidadoresDefensoria:
         return re.sub(r"[^\d.-]", "", str(value))
 
     def _normalizar_para_validacion(self, valor: str, reemplazos: Dict[str, str]) -> Tuple[str, bool]:
-        valor_normalizado, _ = self.validar_cadena_caracteres_especiales(valor)
+        valor_normalizado = limpiar_cadena(valor)
 
         if '-' in valor_normalizado and not reemplazos in VALORES_PROCEDIMIENTOS:
             valor_normalizado = valor_normalizado.split('-', 1)[1].strip()
@@ -95,42 +104,27 @@ class ValidadoresDefensoria:
         return dt.strftime(formato_output), True
 
     def limpiar_nit(self, valor: str) -> Tuple[str, bool]:
-        if not valor or str(valor).strip().lower() in {'nan', 'null', ''}:
-            return "", False
-        
-        valor_limpio = str(valor).strip()
-        if re.fullmatch(r'[a-zA-Z\s]+', valor_limpio):
-            return "", False
-        valor_limpio = valor_limpio.replace(".000000", "")
-        if re.fullmatch(r'\d+(?:-\d+)*', valor_limpio):
-            valor_limpio = valor_limpio.split("-")[0]
-        es_valido = not re.fullmatch(r"^[a-zA-Z]+$", valor_limpio) is not None
-        if es_valido:
-            return valor_limpio, es_valido
-        else:
-            return "", es_valido
+        return self.LIMPIADOR_NIT(valor)
 
     def validar_cadena_caracteres_especiales(self, valor: str) -> Tuple[str, bool]:
-        valor_normalizado = self._normalize_string(valor)
-        valor_normalizado = valor_normalizado.replace('.', '').replace(',', '')
-        return valor_normalizado, True
+        return limpiar_cadena(valor), True
 
     def validar_dependencia_dian(self, valor: str) -> Tuple[str, bool]:
         normalizado = self._normalizar_para_validacion(valor.lower(), VALORES_REEMPLAZO_DEPENDENCIA_DIAN)
-        es_valido = normalizado in VALORES_DEPENDENCIA_DIAN
+        normalizado, es_valido = INDICE_DEPENDENCIA_DIAN.resolver(normalizado)
         return normalizado, True
 
     def validar_procedimientos(self, valor: str) -> Tuple[str, bool]:
         normalizado = self._normalizar_para_validacion(valor.upper(), VALORES_REEMPLAZAR_PROCEDIMIENTOS)
-        es_valido = normalizado in VALORES_PROCEDIMIENTOS
+        normalizado, es_valido = INDICE_PROCEDIMIENTOS.resolver(normalizado)
         return normalizado, True
 
     def validar_macroproceso(self, valor: str) -> Tuple[str, bool]:
         normalizado, _ = self.validar_cadena_caracteres_especiales(valor.upper())
-        es_valido = normalizado in VALORES_MACROPROCESO
+        normalizado, es_valido = INDICE_MACROPROCESO.resolver(normalizado)
         return normalizado, True
 
     def validar_proceso(self, valor: str) -> Tuple[str, bool]:
         normalizado, _ = self.validar_cadena_caracteres_especiales(valor.lower())
-        es_valido = normalizado in VALORES_PROCESO
+        normalizado, es_valido = INDICE_PROCESO.resolver(normalizado)
         return normalizado, True
\ No newline at end of file
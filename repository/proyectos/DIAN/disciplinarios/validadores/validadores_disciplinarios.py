@@ -1,10 +1,13 @@
 import re
-import unicodedata
+from collections import Counter
 from datetime import datetime, time
-from typing import Tuple, Dict, Union
+from typing import Tuple, Dict, Union, Iterable, Optional
 from valores_choice.direccion_seccional_dian import VALORES_DIRECCION_SECCIONAL, VALORES_REEMPLAZO_DIRECCION_SECCIONAL
 from valores_choice.departamento import VALORES_DEPARTAMENTO, VALORES_REEMPLAZO_DEPARTAMENTO
 from valores_choice.ciudad import VALORES_CIUDAD, VALORES_REEMPLAZO_CIUDAD
+from repository.indice_catalogos import IndiceCatalogo
+from repository.nit import LimpiadorNit
+from repository.normalizacion_texto import limpiar_cadena, normalizar_cadena
 
 
 
@@ -24,15 +27,30 @@ DATE_FORMATS = {
     'datetime': "%Y-%m-%d %H:%M:%S"
 }
 
+# Formatos de entrada de validar_date en orden de prioridad: nombre -> (formato o regex, es_rango)
+FORMATOS_ENTRADA_FECHA = {
+    'datetime': (DATE_FORMATS['datetime'], False),
+    'date': (DATE_FORMATS['date'], False),
+    'date_dd_mm_yyyy': (DATE_FORMATS['date_dd_mm_yyyy'], False),
+    'date_range_iso': (r'^(\d{4}-\d{2}-\d{2})(?: - \d{4}-\d{2}-\d{2})?$', True),  # YYYY-MM-DD range
+    'date_range_dmy': (r'^(\d{1,2}/\d{1,2}/\d{4})(?: - \d{1,2}/\d{1,2}/\d{4})?$', True),  # DD/MM/YYYY range
+}
+
+# Índices de catálogo (búsqueda exacta y aproximada), compilados una vez al importar
+INDICE_DIRECCION_SECCIONAL = IndiceCatalogo("direccion_seccional", VALORES_DIRECCION_SECCIONAL, VALORES_REEMPLAZO_DIRECCION_SECCIONAL)
+INDICE_DEPARTAMENTO = IndiceCatalogo("departamento", VALORES_DEPARTAMENTO, VALORES_REEMPLAZO_DEPARTAMENTO)
+INDICE_CIUDAD = IndiceCatalogo("ciudad", VALORES_CIUDAD, VALORES_REEMPLAZO_CIUDAD)
+
 class ValidadoresDisciplinarios:
     """Clase para validar y normalizer diferentes tipos de datos según requerimientos de la Defensoría."""
 
+    # limpiar_nit del proyecto (ver repository.nit)
+    LIMPIADOR_NIT = LimpiadorNit()
+
     @staticmethod
     def _normalize_string(valor: str) -> str:
         """Normaliza una cadena eliminando acentos y caracteres especiales."""
-        if not valor:
-            return ""
-        return unicodedata.normalize('NFKD', valor.strip()).encode('ASCII', 'ignore').decode('ASCII')
+        return normalizar_cadena(valor)
 
     @staticmethod
     def _clean_numeric(value: str) -> str:
@@ -40,7 +58,7 @@ class ValidadoresDisciplinarios:
         return re.sub(r"[^\d.-]", "", str(value))
 
     def _normalizar_para_validacion(self, valor: str, reemplazos: Dict[str, str]) -> Tuple[str, bool]:
-        valor_normalizado, _ = self.validar_cadena_caracteres_especiales(valor)
+        valor_normalizado = limpiar_cadena(valor)
 
         valor_normalizado = reemplazos.get(valor_normalizado, valor_normalizado)
 
@@ -56,103 +74,100 @@ class ValidadoresDisciplinarios:
         es_valido = re.fullmatch(r"^-?\d+(\.\d+)?$", valor_limpio) is not None
         return valor_limpio, es_valido
 
-    def validar_date(self, valor: str, formato_salida: str = 'date') -> Tuple[str, bool]:
+    def _parsear_fecha(self, valor: str, formato: str) -> Optional[datetime]:
+        """Intenta un único formato de FORMATOS_ENTRADA_FECHA. Retorna None si el valor no lo cumple."""
+        date_format, es_rango = FORMATOS_ENTRADA_FECHA[formato]
+        try:
+            if es_rango:
+                match = re.match(date_format, valor)
+                if not match:
+                    return None
+                fecha_str = match.group(1)  # Tomamos la primera fecha del rango
+
+                if formato == 'date_range_dmy':
+                    return datetime.strptime(fecha_str, DATE_FORMATS['date_dd_mm_yyyy'])
+                return datetime.strptime(fecha_str, DATE_FORMATS['date'])
+            return datetime.strptime(valor, date_format)
+        except (ValueError, TypeError):
+            return None
+
+    def detectar_formato_fecha(self, valor: str) -> Tuple[Optional[datetime], Optional[str]]:
+        """Prueba los formatos de entrada en orden de prioridad. Retorna (fecha, formato) o (None, None)."""
+        for formato in FORMATOS_ENTRADA_FECHA:
+            dt = self._parsear_fecha(valor, formato)
+            if dt is not None:
+                return dt, formato
+        return None, None
+
+    def inferir_formato_fecha(self, muestra: Iterable[str]) -> Optional[str]:
+        """
+        Infiere el formato de entrada dominante de una columna de fechas a partir de una muestra de valores.
+        El resultado se pasa como formato_entrada a validar_date.
+        """
+        conteo = Counter(
+            self.detectar_formato_fecha(str(valor).strip())[1]
+            for valor in muestra if valor is not None and str(valor).strip()
+        )
+        conteo.pop(None, None)
+        return conteo.most_common(1)[0][0] if conteo else None
+
+    def validar_date(self, valor: str, formato_salida: str = 'date', formato_entrada: str = None) -> Tuple[str, bool]:
         """
         Valida y normaliza una fecha en múltiples formatos de entrada y la convierte al formato especificado.
         
         Args:
             valor: Valor de fecha a validar (puede ser str o None)
             formato_salida: Formato de salida deseado ('date', 'datetime' o 'date_dd_mm_yyyy')
+            formato_entrada: Formato de entrada a intentar primero (ver inferir_formato_fecha)
         
         Returns:
             Tupla con (fecha_normalizada, es_valida)
         """
-        valor_original = valor
         if valor is None:
             return "", False
-        
+
         valor = str(valor).strip()
         if not valor:
             return "", False
-        
-        # Formatos a intentar, en orden de prioridad
-        formatos_intento = [
-        ('datetime', DATE_FORMATS['datetime'], False),
-        ('date', DATE_FORMATS['date'], False),
-        ('date_dd_mm_yyyy', DATE_FORMATS['date_dd_mm_yyyy'], False),
-        ('date_range_iso', r'^(\d{4}-\d{2}-\d{2})(?: - \d{4}-\d{2}-\d{2})?$', True),  # YYYY-MM-DD range
-        ('date_range_dmy', r'^(\d{1,2}/\d{1,2}/\d{4})(?: - \d{1,2}/\d{1,2}/\d{4})?$', True)  # DD/MM/YYYY range
-    ]
-    
-        dt = None
-        formato_detectado = None
-        
-        for formato, date_format, es_rango in formatos_intento:
-            try:
-                if es_rango:
-                    match = re.match(date_format, valor)
-                    if not match:
-                        continue
-                    fecha_str = match.group(1)  # Tomamos la primera fecha del rango
-                    
-                    if formato == 'date_range_dmy':
-                        dt = datetime.strptime(fecha_str, DATE_FORMATS['date_dd_mm_yyyy'])
-                    else:
-                        dt = datetime.strptime(fecha_str, DATE_FORMATS['date'])
-                        
-                    formato_detectado = formato.split('_')[1]  # 'dmy' o 'iso'
-                    break
-                else:
-                    dt = datetime.strptime(valor, date_format)
-                    formato_detectado = formato
-                    break
-            except (ValueError, TypeError):
-                continue
+
+        # Los formatos de entrada son excluyentes: probar primero el dominante de la columna
+        # da el mismo resultado que recorrerlos todos, y el resto solo se intenta si falla
+        dt, formato = None, None
+        if formato_entrada in FORMATOS_ENTRADA_FECHA:
+            dt, formato = self._parsear_fecha(valor, formato_entrada), formato_entrada
+        if dt is None:
+            dt, formato = self.detectar_formato_fecha(valor)
 
         if dt is None:
             return "", False
-        
+
+        formato_detectado = formato.split('_')[1] if FORMATOS_ENTRADA_FECHA[formato][1] else formato
+
         # Determinar formato de salida (con fallback a 'date')
         formato_output = DATE_FORMATS.get(formato_salida, DATE_FORMATS['date'])
-        
-        # Lógica de conversión
+
         try:
             # Caso 1: Tenemos datetime pero queremos solo fecha
             if formato_detectado == 'datetime' and formato_salida in ['date', 'date_dd_mm_yyyy']:
                 if dt.time() == time.min:
                     return dt.strftime(DATE_FORMATS[formato_salida]), True
                 return valor, False  # Tiene hora, no podemos convertir a solo fecha
-            
+
             # Caso 2: Tenemos fecha pero queremos datetime
             elif formato_detectado in ['date', 'date_dd_mm_yyyy'] and formato_salida == 'datetime':
                 return f"{dt.strftime(DATE_FORMATS['date'])} 00:00:00", True
-            
+
             # Caso 3: Conversión directa
             return dt.strftime(formato_output), True
-        
+
         except ValueError:
             return valor, False
-        
+
     def limpiar_nit(self, valor: str) -> Tuple[str, bool]:
-        if not valor or str(valor).strip().lower() in {'nan', 'null', ''}:
-            return "", False
-        
-        valor_limpio = str(valor).strip()
-        if re.fullmatch(r'[a-zA-Z\s]+', valor_limpio):
-            return "", False
-        valor_limpio = valor_limpio.replace(".000000", "")
-        if re.fullmatch(r'\d+(?:-\d+)*', valor_limpio):
-            valor_limpio = valor_limpio.split("-")[0]
-        es_valido = not re.fullmatch(r"^[a-zA-Z]+$", valor_limpio) is not None
-        if es_valido:
-            return valor_limpio, es_valido
-        else:
-            return "", es_valido
+        return self.LIMPIADOR_NIT(valor)
 
     def validar_cadena_caracteres_especiales(self, valor: str) -> Tuple[str, bool]:
-        valor_normalizado = self._normalize_string(valor)
-        valor_normalizado = valor_normalizado.replace('.', '').replace(',', '')
-        return valor_normalizado, True
+        return limpiar_cadena(valor), True
     
     def validar_direccion_seccional(self, valor):
         """
@@ -162,15 +177,7 @@ class ValidadoresDisciplinarios:
         if '-' in valor:
             valor = valor.split('-', 1)[1]
         normalizado = self._normalizar_para_validacion(valor.lower(), VALORES_REEMPLAZO_DIRECCION_SECCIONAL)
-        if "direccion seccional de impuestos  y aduanas de " in normalizado:
-            normalizado = normalizado.replace("direccion seccional de impuestos  y aduanas de", "direccion seccional de impuestos y aduanas de")
-        if "direccion seccional de impuestos  de " in normalizado:
-            normalizado = normalizado.replace("direccion seccional de impuestos  de ", "direccion seccional de impuestos de ")
-        if "direccion seccionalde aduanas de" in normalizado:
-            normalizado = normalizado.replace("direccion seccionalde aduanas de", "direccion seccional de aduanas de")
-        if "direccion seccional de impuests y aduanas de" in normalizado:
-            normalizado = normalizado.replace("direccion seccional de impuests y aduanas de", "direccion seccional de impuestos y aduanas de")
-        es_valido = normalizado in VALORES_DIRECCION_SECCIONAL
+        normalizado, es_valido = INDICE_DIRECCION_SECCIONAL.resolver(normalizado)
         return normalizado, True
 
     def validar_departamento(self, valor):
@@ -179,7 +186,7 @@ class ValidadoresDisciplinarios:
         Retorna True si es válido, False en caso contrario.
         """
         normalizado = self._normalizar_para_validacion(valor.upper(), VALORES_REEMPLAZO_DEPARTAMENTO)
-        es_valido = normalizado in VALORES_DEPARTAMENTO
+        normalizado, es_valido = INDICE_DEPARTAMENTO.resolver(normalizado)
         return normalizado, True
 
 
@@ -189,7 +196,7 @@ class ValidadoresDisciplinarios:
         Retorna True si es válido, False en caso contrario.
         """
         normalizado = self._normalizar_para_validacion(valor.upper(), VALORES_REEMPLAZO_CIUDAD)
-        es_valido = normalizado in VALORES_CIUDAD
+        normalizado, es_valido = INDICE_CIUDAD.resolver(normalizado)
         return normalizado, True
 
     def validar_expediente(self, valor):
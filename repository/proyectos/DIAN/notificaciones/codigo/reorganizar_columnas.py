@@ -1,6 +1,8 @@
 import csv
 import os
 
+from repository.normalizacion_texto import NormalizadorEncabezados
+
 # Encabezados de referencia en el orden correcto
 REFERENCE_HEADERS = [
     "PLAN_IDENTIF_ACTO",
@@ -92,12 +94,15 @@ replacement_muni_depto = {
     'FECHA_PLANILLA': 'FECHA_PLANILLA_REMISION_1'
 }
 
+# Los encabezados de notificaciones solo se pasan a mayúsculas y sin espacios en los extremos
+normalizar_encabezado = NormalizadorEncabezados({})
+
 def organize_headers(actual_headers:list):
     """
     Organiza los headers en el orden de reference_headers y maneja los renombramientos.
     """
     # Normalizar nombres (todo a mayúsculas)
-    actual_headers_list = [header.strip().upper() for header in actual_headers ]
+    actual_headers_list = [normalizar_encabezado(header) for header in actual_headers]
     if actual_headers in ('MUNICIPIO', 'NOMBRE_MUNICIPIO') and ('FECHA_PLANILLA', 'FECHA_PLANILLA_CORR', 'FECHA_PLANILLA_REMI'):
         for key, new_name in replacement_muni_depto.items():
             if key in actual_headers_list:
@@ -151,15 +156,15 @@ def unir_csvs_en_csv(input_filepath, output_filepath):
         reader = csv.DictReader(infile, delimiter='|')
         original_headers = reader.fieldnames if reader.fieldnames else []
 
-        # Estandarizar encabezados originales (strip y upper)
-        actual_headers_list = [header.strip().upper() for header in original_headers]
+        # Estandarizar encabezados originales (strip y upper) una sola vez, no en cada fila
+        claves = {header: normalizar_encabezado(header) for header in original_headers}
 
         with open(output_filepath, mode='w', newline='', encoding='utf-8') as outfile:
             writer = csv.DictWriter(outfile, fieldnames=final_headers, delimiter='|')
             writer.writeheader()
 
             for row in reader:
-                cleaned_row = {key.strip().upper(): (value if value != "nan" else "")  for key, value in row.items()}
+                cleaned_row = {claves[key]: (value if value != "nan" else "") for key, value in row.items()}
                 full_row = {header: cleaned_row.get(header, '') for header in final_headers}
                 writer.writerow(full_row)
     print(f"CSV procesado y guardado en {output_filepath}")
@@ -2,9 +2,12 @@ import csv
 import os
 import re
 
+from repository.nit import separar_nit
+
 def limpiar_nit(valor):
     """
-    Limpia un NIT eliminando caracteres no numéricos y ajustando la longitud.
+    Limpia un NIT eliminando caracteres no numéricos y ajustando la longitud
+    (prefijo del tipo de documento, puntos y dígito de verificación: ver repository.nit).
 
     Args:
         valor: El NIT a limpiar.
@@ -14,8 +17,7 @@ def limpiar_nit(valor):
     """
     if valor is None:
         return None
-    valor = str(valor).strip()
-    valor = valor.replace(".000000", "")
+    valor, _ = separar_nit(str(valor).strip())
     valor = valor.split("-")[0]  # quitar parte después del guion
     valor = re.sub(r"[^\w]", "", valor)    # Elimina no numéricos
     return valor
@@ -1,11 +1,14 @@
 import re
-import unicodedata
+from collections import Counter
 from datetime import datetime, time, timedelta
-from typing import Tuple, Dict, Union
+from typing import Tuple, Dict, Union, Iterable, Optional
 
 from valores_choice.categoria_1 import VALORES_CATEGORIA_1, VALORES_REEMPLAZO_CATEGORIA_1
 from valores_choice.clasificacion import VALORES_REEMPLAZO_CLASIFICACION, VALORES_CLASIFICACION
 from valores_choice.dependen_asigna import VALORES_REEMPLAZO_DEPENDENCIA_ASIGNA, VALORES_DEPENDENCIA_ASIGNA
+from repository.indice_catalogos import IndiceCatalogo
+from repository.nit import LimpiadorNit, VACIOS_NIT_AMPLIADOS
+from repository.normalizacion_texto import limpiar_cadena, normalizar_cadena
 
 
 
@@ -23,15 +26,32 @@ DATE_FORMATS = {
     'datetime': "%Y-%m-%d %H:%M:%S"
 }
 
+# Formatos de entrada de validar_date en orden de prioridad: nombre -> (formato o regex, es_rango)
+FORMATOS_ENTRADA_FECHA = {
+    'datetime': (DATE_FORMATS['datetime'], False),
+    'date': (DATE_FORMATS['date'], False),
+    'date_YY': (DATE_FORMATS['date_YY'], False),
+    'date_dd_mm_yyyy': (DATE_FORMATS['date_dd_mm_yyyy'], False),
+    'date_range_iso': (r'^(\d{4}-\d{2}-\d{2})(?: - \d{4}-\d{2}-\d{2})?$', True),  # YYYY-MM-DD range
+    'date_range_dmy': (r'^(\d{1,2}/\d{1,2}/\d{4})(?: - \d{1,2}/\d{1,2}/\d{4})?$', True),  # DD/MM/YYYY range
+    'excel': (None, False),  # Número de serie de Excel (días desde 1899-12-30)
+}
+
+# Índices de catálogo (búsqueda exacta y aproximada), compilados una vez al importar
+INDICE_CATEGORIA_1 = IndiceCatalogo("categoria_1", VALORES_CATEGORIA_1, VALORES_REEMPLAZO_CATEGORIA_1)
+INDICE_CLASIFICACION = IndiceCatalogo("clasificacion", VALORES_CLASIFICACION, VALORES_REEMPLAZO_CLASIFICACION)
+INDICE_DEPENDENCIA_ASIGNA = IndiceCatalogo("dependencia_asigna", VALORES_DEPENDENCIA_ASIGNA, VALORES_REEMPLAZO_DEPENDENCIA_ASIGNA)
+
 class ValidadoresPQRUGPP:
     """Clase para validar y normalizer diferentes tipos de datos según requerimientos de la Defensoría."""
 
+    # limpiar_nit del proyecto (ver repository.nit)
+    LIMPIADOR_NIT = LimpiadorNit(VACIOS_NIT_AMPLIADOS, conservar_texto=True)
+
     @staticmethod
     def _normalize_string(valor: str) -> str:
         """Normaliza una cadena eliminando acentos y caracteres especiales."""
-        if not valor:
-            return ""
-        return unicodedata.normalize('NFKD', valor.strip()).encode('ASCII', 'ignore').decode('ASCII')
+        return normalizar_cadena(valor)
 
     @staticmethod
     def _clean_numeric(value: str) -> str:
@@ -39,7 +59,7 @@ class ValidadoresPQRUGPP:
         return re.sub(r"[^\d.-]", "", str(value))
 
     def _normalizar_para_validacion(self, valor: str, reemplazos: Dict[str, str]) -> Tuple[str, bool]:
-        valor_normalizado, _ = self.validar_cadena_caracteres_especiales(valor)
+        valor_normalizado = limpiar_cadena(valor)
 
         valor_normalizado = reemplazos.get(valor_normalizado, valor_normalizado)
 
@@ -55,108 +75,104 @@ class ValidadoresPQRUGPP:
         es_valido = re.fullmatch(r"^-?\d+(\.\d+)?$", valor_limpio) is not None
         return valor_limpio, es_valido
 
-    def validar_date(self, valor: str, formato_salida: str = 'date') -> Tuple[str, bool]:
-
-        valor_original = valor
+    def _parsear_fecha(self, valor: str, formato: str) -> Optional[datetime]:
+        """Intenta un único formato de FORMATOS_ENTRADA_FECHA. Retorna None si el valor no lo cumple."""
+        date_format, es_rango = FORMATOS_ENTRADA_FECHA[formato]
+        try:
+            if formato == 'excel':
+                excel_num = float(valor)
+                if 0 <= excel_num <= 100000:
+                    return datetime(1899, 12, 30) + timedelta(days=excel_num)
+                return None
+            if es_rango:
+                match = re.match(date_format, valor)
+                if not match:
+                    return None
+                fecha_str = match.group(1)  # Tomamos la primera fecha del rango
+
+                if formato == 'date_range_dmy':
+                    return datetime.strptime(fecha_str, DATE_FORMATS['date_dd_mm_yyyy'])
+                return datetime.strptime(fecha_str, DATE_FORMATS['date'])
+            return datetime.strptime(valor, date_format)
+        except (ValueError, TypeError):
+            return None
+
+    def detectar_formato_fecha(self, valor: str) -> Tuple[Optional[datetime], Optional[str]]:
+        """Prueba los formatos de entrada en orden de prioridad. Retorna (fecha, formato) o (None, None)."""
+        for formato in FORMATOS_ENTRADA_FECHA:
+            dt = self._parsear_fecha(valor, formato)
+            if dt is not None:
+                return dt, formato
+        return None, None
+
+    def inferir_formato_fecha(self, muestra: Iterable[str]) -> Optional[str]:
+        """
+        Infiere el formato de entrada dominante de una columna de fechas a partir de una muestra de valores.
+        El resultado se pasa como formato_entrada a validar_date.
+        """
+        conteo = Counter(
+            self.detectar_formato_fecha(str(valor).strip())[1]
+            for valor in muestra if valor is not None and str(valor).strip()
+        )
+        conteo.pop(None, None)
+        return conteo.most_common(1)[0][0] if conteo else None
+
+    def validar_date(self, valor: str, formato_salida: str = 'date', formato_entrada: str = None) -> Tuple[str, bool]:
         if valor is None:
             return "", False
 
         valor = str(valor).strip()
         if not valor:
             return "", False
-        
-
-
-        formatos_intento = [
-        ('datetime', DATE_FORMATS['datetime'], False),
-        ('date', DATE_FORMATS['date'], False),
-        ('date_YY', DATE_FORMATS['date_YY'], False),
-        ('date_dd_mm_yyyy', DATE_FORMATS['date_dd_mm_yyyy'], False),
-        ('date_range_iso', r'^(\d{4}-\d{2}-\d{2})(?: - \d{4}-\d{2}-\d{2})?$', True),  # YYYY-MM-DD range
-        ('date_range_dmy', r'^(\d{1,2}/\d{1,2}/\d{4})(?: - \d{1,2}/\d{1,2}/\d{4})?$', True)  # DD/MM/YYYY range
-    ]
-
-        dt = None
-        formato_detectado = None
-
-        for formato, date_format, es_rango in formatos_intento:
-            try:
-                if es_rango:
-                    match = re.match(date_format, valor)
-                    if not match:
-                        continue
-                    fecha_str = match.group(1)
-
-                    if formato == 'date_range_dmy':
-                        dt = datetime.strptime(fecha_str, DATE_FORMATS['date_dd_mm_yyyy'])
-                    else:
-                        dt = datetime.strptime(fecha_str, DATE_FORMATS['date'])
-
-                    formato_detectado = formato.split('_')[1]  # 'dmy' o 'iso'
-                    break
-                else:
-                    dt = datetime.strptime(valor, date_format)
-                    formato_detectado = formato
-                    break
-            except (ValueError, TypeError):
-                continue
-        
+
+        # Los formatos de entrada son excluyentes: probar primero el dominante de la columna
+        # da el mismo resultado que recorrerlos todos, y el resto solo se intenta si falla
+        dt, formato = None, None
+        if formato_entrada in FORMATOS_ENTRADA_FECHA:
+            dt, formato = self._parsear_fecha(valor, formato_entrada), formato_entrada
         if dt is None:
-            try:
-                excel_num = float(valor)
+            dt, formato = self.detectar_formato_fecha(valor)
 
-                if 0 <= excel_num <= 100000:
-                    base_date = datetime(1899, 12, 30)
-                    fecha = (base_date + timedelta(days=excel_num))
-                    if formato_salida == 'date_dd_mm_yyyy':
-                        return fecha.strftime('%d/%m/%Y'), True
-                    elif formato_salida == 'date_YY':
-                        return fecha.strftime('%y-%m-%d'), True
-                    elif formato_salida == 'datetime':
-                        return fecha.strftime('%Y-%m-%d %H:%M:%S'), True
-                    else:  # formato 'date' por defecto
-                        return fecha.strftime('%Y-%m-%d'), True
-                return "", False
-            except (ValueError, TypeError):
-                return "", False
+        if dt is None:
+            return "", False
+
+        if formato == 'excel':
+            if formato_salida == 'date_dd_mm_yyyy':
+                return dt.strftime('%d/%m/%Y'), True
+            elif formato_salida == 'date_YY':
+                return dt.strftime('%y-%m-%d'), True
+            elif formato_salida == 'datetime':
+                return dt.strftime('%Y-%m-%d %H:%M:%S'), True
+            else:  # formato 'date' por defecto
+                return dt.strftime('%Y-%m-%d'), True
 
+        formato_detectado = formato.split('_')[1] if FORMATOS_ENTRADA_FECHA[formato][1] else formato
+
+        # Determinar formato de salida (con fallback a 'date')
         formato_output = DATE_FORMATS.get(formato_salida, DATE_FORMATS['date'])
 
         try:
+            # Caso 1: Tenemos datetime pero queremos solo fecha
             if formato_detectado == 'datetime' and formato_salida in ['date', 'date_dd_mm_yyyy']:
                 if dt.time() == time.min:
                     return dt.strftime(DATE_FORMATS[formato_salida]), True
                 return valor, True
 
+            # Caso 2: Tenemos fecha pero queremos datetime
             elif formato_detectado in ['date', 'date_dd_mm_yyyy'] and formato_salida == 'datetime':
                 return f"{dt.strftime(DATE_FORMATS['date'])} 00:00:00", True
 
+            # Caso 3: Conversión directa
             return dt.strftime(formato_output), True
 
         except ValueError:
             return valor, False
 
     def limpiar_nit(self, valor: str) -> Tuple[str, bool]:
-        if not valor or str(valor).strip().lower() in {'nan', 'null', '', 'sin registro',
-        'desconocido', 'no aplica', 'ninguna', 'no registra', 'sin', 'sin id'
-        ''}:
-            return "", False
-        valor_limpio = str(valor).strip()
-        if re.fullmatch(r'[a-zA-Z\s]+', valor_limpio):
-            return valor_limpio, True
-        valor_limpio = valor_limpio.replace(".000000", "")
-        if re.fullmatch(r'\d+(?:-\d+)*', valor_limpio):
-            valor_limpio = valor_limpio.split("-")[0]
-        es_valido = not re.fullmatch(r"^[a-zA-Z]+$", valor_limpio) is not None
-        if es_valido:
-            return valor_limpio, es_valido
-        else:
-            return valor_limpio, es_valido
+        return self.LIMPIADOR_NIT(valor)
 
     def validar_cadena_caracteres_especiales(self, valor: str) -> Tuple[str, bool]:
-        valor_normalizado = self._normalize_string(valor)
-        valor_normalizado = valor_normalizado.replace('.', '').replace(',', '')
-        return valor_normalizado, True
+        return limpiar_cadena(valor), True
 
     def validar_categoria_1(self, valor):
         """
@@ -166,15 +182,15 @@ class ValidadoresPQRUGPP:
         if '-' in valor:
             valor = valor.split('-', 1)[1]
         normalizado = self._normalizar_para_validacion(valor.upper(), VALORES_REEMPLAZO_CATEGORIA_1)
-        es_valido = normalizado in VALORES_CATEGORIA_1
+        normalizado, es_valido = INDICE_CATEGORIA_1.resolver(normalizado)
         return normalizado, True
 
     def validar_clasificacion(self, valor):
         normalizado = self._normalizar_para_validacion(valor.upper(), VALORES_REEMPLAZO_CLASIFICACION)
-        es_valido = normalizado in VALORES_CLASIFICACION
+        normalizado, es_valido = INDICE_CLASIFICACION.resolver(normalizado)
         return normalizado, True
 
     def validar_dependen_asigna(self, valor):
         normalizado = self._normalizar_para_validacion(valor.lower(), VALORES_REEMPLAZO_DEPENDENCIA_ASIGNA)
-        es_valido = normalizado in VALORES_DEPENDENCIA_ASIGNA
+        normalizado, es_valido = INDICE_DEPENDENCIA_ASIGNA.resolver(normalizado)
         return normalizado, True
@@ -0,0 +1,26 @@
+"""
+Ejecuta un script de un proyecto (su bloque __main__) desde la raíz del repositorio:
+
+    python -m repository.proyectos.ejecutar repository/proyectos/DIAN/PQR/transformar_columnas_pqr_muisca.py
+
+Con -m la raíz del repositorio queda en sys.path (importaciones repository.*) y,
+como al ejecutar el script con python, su directorio va primero en sys.path
+(importaciones validadores.* y valores_choice.* del proyecto).
+"""
+import os
+import runpy
+import sys
+
+
+def ejecutar(script: str) -> None:
+    """Ejecuta script como __main__ con su directorio al inicio de sys.path."""
+    script = os.path.abspath(script)
+    sys.path.insert(0, os.path.dirname(script))
+    sys.argv = [script]
+    runpy.run_path(script, run_name="__main__")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        sys.exit("Uso: python -m repository.proyectos.ejecutar <ruta del script>")
+    ejecutar(sys.argv[1])
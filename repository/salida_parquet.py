@@ -0,0 +1,156 @@
+"""
+Salida en Parquet (Arrow) de los procesadores de columnas y de la unión de CSV.
+
+EscritorParquet tiene la misma interfaz que csv.writer (writerow/writerows), así
+que los procesadores lo usan en lugar del writer CSV sin cambiar su lógica. Las
+filas se acumulan y se escriben en grupos de filas con un esquema tipado:
+
+- Las columnas validadas como int, float, date o datetime se guardan con su
+  tipo (int64, float64, date32, timestamp). Los valores vacíos o que no pasaron
+  la validación quedan nulos; el valor original sigue en el archivo de errores.
+- Las columnas de catálogo (choice_*) y NOMBRE_ARCHIVO, MES_REPORTE y
+  ARCHIVO_FUENTE, con pocos valores distintos, se guardan como diccionario.
+- El resto queda como texto, igual que en el CSV.
+
+Los nombres de columna repetidos se renombran como en pandas ('COL.1'), porque
+los lectores de Parquet no admiten dos columnas con el mismo nombre.
+"""
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+# Filas por grupo de filas del Parquet (y que se acumulan en memoria)
+FILAS_POR_GRUPO = 100000
+COMPRESION = 'zstd'
+# Columnas con valores muy repetidos que se guardan como diccionario
+COLUMNAS_DICCIONARIO = {'NOMBRE_ARCHIVO', 'MES_REPORTE', 'ARCHIVO_FUENTE'}
+TIPO_DICCIONARIO = pa.dictionary(pa.int32(), pa.string())
+TIPOS_ARROW = {
+    'int': pa.int64(),
+    'float': pa.float64(),
+    'date': pa.date32(),
+    # Parquet no tiene timestamp en segundos; en milisegundos se lee con el mismo tipo
+    'datetime': pa.timestamp('ms'),
+}
+# Formatos que producen los validadores para cada tipo (lo demás queda nulo)
+PATRONES_VALIDOS = {
+    'int': r'^-?\d{1,18}$',
+    'float': r'^-?\d+(\.\d+)?$',
+}
+FORMATO_FECHA = '%Y-%m-%d'
+FORMATO_FECHA_HORA = '%Y-%m-%d %H:%M:%S'
+
+
+def esquema(columnas: Sequence[str], tipos: Optional[Sequence[Optional[str]]] = None) -> pa.Schema:
+    """
+    Esquema Arrow de las columnas de salida.
+
+    Args:
+        columnas: Nombres de las columnas en orden.
+        tipos: Tipo del type_mapping de cada columna (None en las que no se validan).
+    """
+    from repository.unit_todos_csv import nombres_columnas
+
+    tipos = tipos or [None] * len(columnas)
+    campos = []
+    for columna, tipo in zip(nombres_columnas(list(columnas)), tipos):
+        tipo = tipo or 'str'
+        if tipo in TIPOS_ARROW:
+            tipo_arrow = TIPOS_ARROW[tipo]
+        elif tipo.startswith('choice') or columna in COLUMNAS_DICCIONARIO:
+            tipo_arrow = TIPO_DICCIONARIO
+        else:
+            tipo_arrow = pa.string()
+        campos.append(pa.field(columna, tipo_arrow))
+    return pa.schema(campos)
+
+
+def columna_arrow(valores: List[str], tipo: pa.DataType) -> pa.Array:
+    """Convierte los valores de texto de una columna al tipo Arrow del esquema."""
+    texto = pa.array(valores, pa.string())
+    if tipo == pa.string():
+        return texto
+    if tipo == TIPO_DICCIONARIO:
+        return texto.dictionary_encode()
+    if tipo == pa.int64() or tipo == pa.float64():
+        patron = PATRONES_VALIDOS['int' if tipo == pa.int64() else 'float']
+        return pc.if_else(pc.match_substring_regex(texto, patron), texto, None).cast(tipo)
+    # Fechas: los validadores escriben AAAA-MM-DD (o con hora en las columnas datetime)
+    fecha = pc.strptime(texto, FORMATO_FECHA, 's', error_is_null=True)
+    if tipo == pa.date32():
+        return fecha.cast(tipo)
+    return pc.coalesce(pc.strptime(texto, FORMATO_FECHA_HORA, 'ms', error_is_null=True), fecha.cast(tipo))
+
+
+class EscritorParquet:
+    """Escribe filas de texto en un Parquet tipado, con la interfaz de csv.writer."""
+
+    def __init__(self, ruta: str, columnas: Sequence[str], tipos: Optional[Sequence[Optional[str]]] = None,
+                 filas_por_grupo: int = FILAS_POR_GRUPO):
+        self.esquema = esquema(columnas, tipos)
+        self.filas_por_grupo = filas_por_grupo
+        self._pendientes: List[Sequence[str]] = []
+        self._writer = pq.ParquetWriter(ruta, self.esquema, compression=COMPRESION)
+
+    def writerow(self, fila: Sequence[str]) -> None:
+        self._pendientes.append(fila)
+        if len(self._pendientes) >= self.filas_por_grupo:
+            self._vaciar()
+
+    def writerows(self, filas: Iterable[Sequence[str]]) -> None:
+        for fila in filas:
+            self.writerow(fila)
+
+    def anexar(self, ruta: str) -> None:
+        """Copia los grupos de filas de otro Parquet con el mismo esquema (partes del modo paralelo)."""
+        self._vaciar()
+        for lote in pq.ParquetFile(ruta).iter_batches(batch_size=self.filas_por_grupo):
+            self._writer.write_batch(lote)
+
+    def _vaciar(self) -> None:
+        if not self._pendientes:
+            return
+        columnas = list(zip(*self._pendientes))
+        self._pendientes = []
+        self._writer.write_batch(pa.record_batch(
+            [columna_arrow(list(valores), campo.type) for valores, campo in zip(columnas, self.esquema)],
+            schema=self.esquema,
+        ))
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._vaciar()
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self) -> 'EscritorParquet':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def escribir_union_parquet(rutas: Sequence[str], archivo_salida: str, delimitador: str = '|') -> Dict[str, int]:
+    """
+    Escribe la unión de los CSV (ver unit_todos_csv) en un Parquet.
+
+    Las columnas quedan como texto salvo NOMBRE_ARCHIVO, MES_REPORTE y
+    ARCHIVO_FUENTE, que se guardan como diccionario.
+
+    Returns:
+        Número de filas copiadas de cada ruta.
+    """
+    from repository.unit_todos_csv import esquema_union, filas_archivo, leer_cabecera
+
+    columnas, proyecciones = esquema_union([leer_cabecera(ruta, delimitador) for ruta in rutas])
+    conteo = {}
+    with EscritorParquet(archivo_salida, columnas) as writer:
+        for ruta, proyeccion in zip(rutas, proyecciones):
+            filas = 0
+            for fila in filas_archivo(ruta, proyeccion, delimitador):
+                writer.writerow(fila)
+                filas += 1
+            conteo[ruta] = filas
+    return conteo
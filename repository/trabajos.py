@@ -0,0 +1,220 @@
+"""
+Trabajos asíncronos para los endpoints de normalización de columnas.
+
+Un trabajo se encola y devuelve su id de inmediato; un pool acotado de hilos lo
+ejecuta (cada trabajo reparte sus rangos en el pool de procesos compartido de la
+API, ver repository.procesos). Mientras corre se actualizan las filas
+procesadas y los errores mediante el callback de progreso del CSVProcessor; al
+terminar se registran los archivos resultantes, que la descarga envía como ZIP
+en streaming (o tal cual si solo hay uno).
+
+La cancelación marca el trabajo: si aún está en cola no se ejecuta y si está
+corriendo el callback de progreso lanza TrabajoCancelado para liberar el hilo.
+
+Los resultados conservados no cuentan en la cuota del espacio temporal (al
+completarse el trabajo su directorio se retiene, ver EspacioTemporal.retener):
+tienen su propio límite MAX_BYTES_RETENIDOS. Un hilo elimina cada
+INTERVALO_PURGA segundos los trabajos vencidos y, si los resultados superan el
+límite, los terminados más antiguos aunque no hayan vencido.
+"""
+import contextvars
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from repository.espacio_temporal import EspacioTemporal
+
+# Trabajos que se procesan a la vez; el resto espera en cola
+MAX_TRABAJOS_SIMULTANEOS = 2
+# Segundos que se conservan los resultados de un trabajo terminado
+RETENCION_SEGUNDOS = 24 * 3600
+# Bytes que pueden ocupar en total los resultados conservados (0 sin límite)
+MAX_BYTES_RETENIDOS = int(os.environ.get("TRABAJOS_MAX_BYTES_RETENIDOS", str(5 << 30)))
+# Segundos entre purgas de los trabajos vencidos
+INTERVALO_PURGA = 300
+NOMBRE_ZIP = "archivos_procesados.zip"
+
+PENDIENTE = "pendiente"
+PROCESANDO = "procesando"
+COMPLETADO = "completado"
+ERROR = "error"
+CANCELADO = "cancelado"
+ESTADOS_FINALES = {COMPLETADO, ERROR, CANCELADO}
+
+# Función que procesa el trabajo: recibe el callback de progreso y retorna
+# los archivos a incluir en el ZIP como (ruta, nombre dentro del ZIP)
+Ejecucion = Callable[[Callable[[int, int], None]], List[Tuple[str, str]]]
+
+
+class TrabajoCancelado(Exception):
+    """Detiene el procesamiento de un trabajo cancelado desde el callback de progreso."""
+
+
+@dataclass
+class Trabajo:
+    id: str
+    archivo: str
+    temp_dir: str
+    estado: str = PENDIENTE
+    filas_procesadas: int = 0
+    errores: int = 0
+    creado: float = field(default_factory=time.time)
+    inicio: Optional[float] = None
+    fin: Optional[float] = None
+    archivos: List[Tuple[str, str]] = field(default_factory=list)
+    mensaje_error: Optional[str] = None
+    # Bytes del directorio del trabajo al completarse (resultados conservados)
+    bytes: int = 0
+    cancelacion: threading.Event = field(default_factory=threading.Event, repr=False)
+    future: Optional[Future] = field(default=None, repr=False)
+
+    def resumen(self) -> Dict:
+        """Estado del trabajo para la API."""
+        duracion = ((self.fin or time.time()) - self.inicio) if self.inicio else 0.0
+        return {
+            "id": self.id,
+            "archivo": self.archivo,
+            "estado": self.estado,
+            "filas_procesadas": self.filas_procesadas,
+            "errores": self.errores,
+            "segundos": round(duracion, 3),
+            "filas_por_segundo": round(self.filas_procesadas / duracion, 1) if duracion else 0.0,
+            "error": self.mensaje_error,
+        }
+
+
+class GestorTrabajos:
+    """
+    Cola de trabajos con un pool acotado de hilos.
+
+    Args:
+        max_trabajos: Trabajos que se procesan a la vez.
+        espacio: Espacio temporal donde viven los directorios de los trabajos; si se
+            indica, se retienen al completarse y se liberan con él.
+        max_bytes_retenidos: Límite de los resultados conservados.
+    """
+
+    def __init__(self, max_trabajos: int = MAX_TRABAJOS_SIMULTANEOS, espacio: Optional[EspacioTemporal] = None,
+                 max_bytes_retenidos: int = MAX_BYTES_RETENIDOS):
+        self._pool = ThreadPoolExecutor(max_workers=max_trabajos, thread_name_prefix="trabajo")
+        self._trabajos: Dict[str, Trabajo] = {}
+        self._lock = threading.Lock()
+        self.espacio = espacio
+        self.max_bytes_retenidos = max_bytes_retenidos
+        threading.Thread(target=self._purgar_periodicamente, name="purga-trabajos", daemon=True).start()
+
+    def enviar(self, archivo: str, temp_dir: str, ejecucion: Ejecucion) -> Trabajo:
+        """Encola un trabajo cuyos archivos viven en temp_dir y retorna de inmediato."""
+        self._purgar()
+        trabajo = Trabajo(id=uuid.uuid4().hex, archivo=archivo, temp_dir=temp_dir)
+        with self._lock:
+            self._trabajos[trabajo.id] = trabajo
+        # Con el contexto de la solicitud: las métricas del trabajo quedan bajo su endpoint
+        trabajo.future = self._pool.submit(contextvars.copy_context().run, self._ejecutar, trabajo, ejecucion)
+        return trabajo
+
+    def obtener(self, trabajo_id: str) -> Optional[Trabajo]:
+        with self._lock:
+            return self._trabajos.get(trabajo_id)
+
+    def cancelar(self, trabajo_id: str) -> Optional[Trabajo]:
+        """Cancela un trabajo en cola o en ejecución. Los trabajos terminados no cambian."""
+        trabajo = self.obtener(trabajo_id)
+        if trabajo is None or trabajo.estado in ESTADOS_FINALES:
+            return trabajo
+        trabajo.cancelacion.set()
+        if trabajo.future is not None and trabajo.future.cancel():
+            # Aún no había empezado: el hilo nunca lo tomará
+            self._finalizar(trabajo, CANCELADO)
+        return trabajo
+
+    def _ejecutar(self, trabajo: Trabajo, ejecucion: Ejecucion) -> None:
+        if trabajo.cancelacion.is_set():
+            self._finalizar(trabajo, CANCELADO)
+            return
+        trabajo.estado = PROCESANDO
+        trabajo.inicio = time.time()
+
+        def progreso(filas: int, errores: int) -> None:
+            trabajo.filas_procesadas = filas
+            trabajo.errores = errores
+            if trabajo.cancelacion.is_set():
+                raise TrabajoCancelado()
+
+        try:
+            archivos = ejecucion(progreso)
+            trabajo.archivos = [(ruta, nombre) for ruta, nombre in archivos if os.path.exists(ruta)]
+            self._finalizar(trabajo, COMPLETADO)
+        except Exception as e:
+            # El CSVProcessor envuelve la excepción del callback: se decide por la marca
+            if trabajo.cancelacion.is_set():
+                self._finalizar(trabajo, CANCELADO)
+            else:
+                trabajo.mensaje_error = str(e)
+                self._finalizar(trabajo, ERROR)
+
+    def _finalizar(self, trabajo: Trabajo, estado: str) -> None:
+        if estado == COMPLETADO:
+            trabajo.bytes = _tamano_directorio(trabajo.temp_dir)
+            if self.espacio is not None:
+                self.espacio.retener(trabajo.temp_dir)
+        else:
+            self._liberar(trabajo.temp_dir)
+        trabajo.estado = estado
+        trabajo.fin = time.time()
+        if estado == COMPLETADO and self.max_bytes_retenidos:
+            self._purgar()
+
+    def _liberar(self, directorio: str) -> None:
+        if self.espacio is not None:
+            self.espacio.liberar(directorio)
+        else:
+            shutil.rmtree(directorio, ignore_errors=True)
+
+    def _purgar_periodicamente(self) -> None:
+        while True:
+            time.sleep(INTERVALO_PURGA)
+            self._purgar()
+
+    def _purgar(self) -> None:
+        """
+        Elimina los trabajos terminados hace más de RETENCION_SEGUNDOS y, mientras los
+        resultados superen max_bytes_retenidos, los terminados más antiguos (salvo el
+        último); con sus archivos.
+        """
+        limite = time.time() - RETENCION_SEGUNDOS
+        with self._lock:
+            terminados = sorted((t for t in self._trabajos.values()
+                                 if t.estado in ESTADOS_FINALES and t.fin is not None),
+                                key=lambda t: t.fin)
+            retenidos = sum(t.bytes for t in terminados)
+            vencidos = []
+            for trabajo in terminados:
+                vencido = trabajo.fin < limite
+                # El terminado más reciente se conserva aunque solo él supere el límite
+                excedido = (self.max_bytes_retenidos and retenidos > self.max_bytes_retenidos
+                            and trabajo is not terminados[-1])
+                if not (vencido or excedido):
+                    break
+                vencidos.append(trabajo)
+                retenidos -= trabajo.bytes
+                del self._trabajos[trabajo.id]
+        for trabajo in vencidos:
+            self._liberar(trabajo.temp_dir)
+
+
+def _tamano_directorio(directorio: str) -> int:
+    """Bytes de los archivos de un directorio de trabajo."""
+    total = 0
+    for raiz, _, nombres in os.walk(directorio):
+        for nombre in nombres:
+            try:
+                total += os.lstat(os.path.join(raiz, nombre)).st_size
+            except FileNotFoundError:
+                pass
+    return total
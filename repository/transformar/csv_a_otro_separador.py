@@ -1,6 +1,23 @@
+"""
+Convierte archivos separados por '|@' (ARCHIVO_COLJ_I*) a '|' agregando al
+principio las columnas nombre_archivo y mes_reporte.
+
+La conversión se hace en una sola pasada sobre bloques binarios grandes:
+
+- La codificación se decide con una muestra del inicio del archivo (UTF-8 o
+  latin-1). Si más adelante aparece una línea que no es UTF-8 válida, solo esa
+  línea se decodifica como latin-1, sin descartar lo ya escrito ni volver a
+  procesar el archivo.
+- Cada bloque se corta en el último salto de línea y sus líneas se reescriben
+  con strip() y replace() del separador (equivalente a split + join), con el
+  prefijo ya armado.
+
+La salida siempre es UTF-8.
+"""
+import codecs
 import os
-import csv
 import re
+from typing import List, Tuple
 
 base_path_original = os.path.expanduser("~/Documentos/ITRC/DOCUMENTOS_LIMPIAR/copia_COLJUEGOS_PQRS/2025/CSV")
 base_path_limpio = os.path.expanduser("~/Documentos/ITRC/DOCUMENTOS_LIMPIAR/copia_COLJUEGOS_PQRS/2025/CSV/A")
@@ -13,73 +30,138 @@ lista_archivos_csv_at = [
 
 ]
 
-# Asegurarse de que el directorio de salida exista
-os.makedirs(base_path_limpio, exist_ok=True)
+# Bytes que se leen por bloque
+TAMANO_BLOQUE = 1 << 22
+# Bytes del inicio del archivo con los que se decide la codificación
+TAMANO_MUESTRA = 1 << 16
+CODIFICACION_RESPALDO = 'latin-1'
+
+
+def mes_reporte_de(nombre_archivo: str) -> str:
+    """'MM_AAAA' a partir de la fecha de inicio I<AAAAMMDD> del nombre, o 'Desconocido'."""
+    coincidencia_fecha = re.search(r"I(\d{8})", nombre_archivo)
+    if not coincidencia_fecha:
+        return "Desconocido"
+    fecha_str = coincidencia_fecha.group(1)
+    return f"{fecha_str[4:6]}_{fecha_str[:4]}"
 
-for nombre_archivo_csv_at in lista_archivos_csv_at:
-    archivo_entrada = os.path.join(base_path_original, nombre_archivo_csv_at)
-    nombre_archivo_base, _ = os.path.splitext(nombre_archivo_csv_at)
-    nombre_archivo_csv_pipe = nombre_archivo_base + ".csv"
-    archivo_salida = os.path.join(base_path_limpio, nombre_archivo_csv_pipe)
 
+def detectar_codificacion(muestra: bytes) -> str:
+    """UTF-8 si la muestra (cortada en un salto de línea) decodifica como UTF-8; si no, latin-1."""
+    corte = muestra.rfind(b'\n') + 1
+    try:
+        (muestra[:corte] if corte else muestra).decode('utf-8')
+    except UnicodeDecodeError as e:
+        # Un carácter multibyte cortado al final de la muestra no cuenta como error
+        if corte or e.start < len(muestra) - 3:
+            return CODIFICACION_RESPALDO
+    return 'utf-8'
 
-    if os.path.exists(archivo_entrada):
-        print(f"Procesando archivo: {archivo_entrada}")
+
+def decodificar(datos: bytes, codificacion: str) -> Tuple[str, bool]:
+    """
+    Decodifica un bloque de líneas completas.
+
+    Returns:
+        Tupla (texto, hubo respaldo): si el bloque no es UTF-8 válido se decodifica
+        línea por línea, usando latin-1 solo en las líneas que lo necesitan.
+    """
+    if codificacion != 'utf-8':
+        return datos.decode(codificacion), False
+    try:
+        return datos.decode('utf-8'), False
+    except UnicodeDecodeError:
+        pass
+    lineas: List[str] = []
+    for linea in datos.splitlines(keepends=True):
         try:
-            with open(archivo_entrada, 'r', newline='', encoding='utf-8') as infile, \
-                 open(archivo_salida, 'w', newline='', encoding='utf-8') as outfile:
-                # Escribir la cabecera con las nuevas columnas al principio
-                coincidencia_fecha = re.search(r"I(\d{8})", nombre_archivo_csv_at)
-
-                mes_reporte = "Desconocido"
-                if coincidencia_fecha:
-                    fecha_str = coincidencia_fecha.group(1)
-                    anio = fecha_str[:4]
-                    mes = fecha_str[4:6]
-                    mes_reporte = f"{mes}_{anio}"
-                primera_linea = infile.readline().strip()
-                cabecera = primera_linea.split('|@')
-                nueva_cabecera = ['nombre_archivo', 'mes_reporte'] + cabecera
-                outfile.write('|'.join(nueva_cabecera) + '\n')
-
-                # Escribir los datos con las columnas adicionales vacías al principio
-                for line in infile:
-                    campos = line.strip().split('|@')
-                    nueva_linea = [nombre_archivo_csv_at, mes_reporte] + campos
-                    outfile.write('|'.join(nueva_linea) + '\n')
-            print(f'Archivo convertido y guardado en: {archivo_salida}')
+            lineas.append(linea.decode('utf-8'))
         except UnicodeDecodeError:
-            print(f"Error de codificación UTF-8. Intentando con latin-1 para: {nombre_archivo_csv_at}")
+            lineas.append(linea.decode(CODIFICACION_RESPALDO))
+    return ''.join(lineas), True
+
+
+def convertir_separador(archivo_entrada: str, archivo_salida: str, nombre_archivo: str,
+                        antiguo_separador: str = '|@', nuevo_separador: str = '|',
+                        tamano_bloque: int = TAMANO_BLOQUE) -> str:
+    """
+    Convierte un archivo al nuevo separador agregando nombre_archivo y mes_reporte.
+
+    Args:
+        archivo_entrada: Ruta del archivo original.
+        archivo_salida: Ruta del CSV convertido (UTF-8).
+        nombre_archivo: Valor de la columna nombre_archivo; mes_reporte sale de él.
+        antiguo_separador: Separador del archivo original.
+        nuevo_separador: Separador del archivo convertido.
+        tamano_bloque: Bytes leídos por bloque.
+
+    Returns:
+        Codificación detectada: 'utf-8', 'latin-1' o 'mixta' si hubo líneas en latin-1
+        dentro de un archivo UTF-8.
+    """
+    prefijo = f"{nombre_archivo}{nuevo_separador}{mes_reporte_de(nombre_archivo)}{nuevo_separador}"
+    codificacion = None
+    mixta = False
+    cabecera_pendiente = True
+    resto = b''
+    with open(archivo_entrada, 'rb') as infile, \
+         open(archivo_salida, 'w', newline='', encoding='utf-8') as outfile:
+        while True:
+            bloque = infile.read(tamano_bloque)
+            datos = resto + bloque
+            if bloque:
+                # Solo líneas completas: lo que sigue al último salto pasa al siguiente bloque.
+                # Un '\r' final se deja para el siguiente bloque por si le sigue un '\n'
+                corte = max(datos.rfind(b'\n'), datos.rfind(b'\r', 0, len(datos) - 1)) + 1
+                if not corte:
+                    resto = datos
+                    continue
+                datos, resto = datos[:corte], datos[corte:]
+            if codificacion is None:
+                if datos.startswith(codecs.BOM_UTF8):
+                    datos = datos[len(codecs.BOM_UTF8):]
+                codificacion = detectar_codificacion(datos[:TAMANO_MUESTRA])
+            texto, respaldo = decodificar(datos, codificacion)
+            mixta = mixta or respaldo
+
+            # Mismos finales de línea que la lectura en modo texto con newline=''
+            lineas = texto.replace('\r\n', '\n').replace('\r', '\n').split('\n')
+            if lineas[-1] == '':
+                lineas.pop()
+            if cabecera_pendiente and lineas:
+                cabecera = lineas.pop(0).strip().replace(antiguo_separador, nuevo_separador)
+                outfile.write(f"nombre_archivo{nuevo_separador}mes_reporte{nuevo_separador}{cabecera}\n")
+                cabecera_pendiente = False
+            outfile.write(''.join([
+                prefijo + linea.strip().replace(antiguo_separador, nuevo_separador) + '\n'
+                for linea in lineas
+            ]))
+            if not bloque:
+                break
+        if cabecera_pendiente:
+            # Archivo vacío: solo la cabecera con las nuevas columnas
+            outfile.write(f"nombre_archivo{nuevo_separador}mes_reporte{nuevo_separador}\n")
+    return 'mixta' if mixta else codificacion
+
+
+if __name__ == "__main__":
+    # Asegurarse de que el directorio de salida exista
+    os.makedirs(base_path_limpio, exist_ok=True)
+
+    for nombre_archivo_csv_at in lista_archivos_csv_at:
+        archivo_entrada = os.path.join(base_path_original, nombre_archivo_csv_at)
+        nombre_archivo_base, _ = os.path.splitext(nombre_archivo_csv_at)
+        nombre_archivo_csv_pipe = nombre_archivo_base + ".csv"
+        archivo_salida = os.path.join(base_path_limpio, nombre_archivo_csv_pipe)
+
+        if os.path.exists(archivo_entrada):
+            print(f"Procesando archivo: {archivo_entrada}")
             try:
-                with open(archivo_entrada, 'r', newline='', encoding='latin-1') as infile_latin, \
-                     open(archivo_salida, 'w', newline='', encoding='utf-8') as outfile:
-                    # Escribir la cabecera con las nuevas columnas al principio
-                    coincidencia_fecha = re.search(r"I(\d{8})", nombre_archivo_csv_at)
-
-                    mes_reporte = "Desconocido"
-                    if coincidencia_fecha:
-                        fecha_str = coincidencia_fecha.group(1)
-                        anio = fecha_str[:4]
-                        mes = fecha_str[4:6]
-                        mes_reporte = f"{mes}_{anio}"
-                    primera_linea = infile_latin.readline().strip()
-                    cabecera = primera_linea.split('|@')
-                    nueva_cabecera = ['nombre_archivo', 'mes_reporte'] + cabecera
-                    outfile.write('|'.join(nueva_cabecera) + '\n')
-
-                    # Escribir los datos con las columnas adicionales vacías al principio
-                    for line in infile_latin:
-                        campos = line.strip().split('|@')
-                        nueva_linea = [os.path.splitext(nombre_archivo_csv_at)[0], mes_reporte] + campos
-                        outfile.write('|'.join(nueva_linea) + '\n')
-                print(f'Archivo convertido y guardado (con latin-1) en: {archivo_salida}')
-            except Exception as e_latin:
-                print(f"Error al leer o convertir el archivo {nombre_archivo_csv_at} con latin-1: {e_latin}")
-        except FileNotFoundError:
-            print(f"Error: El archivo {nombre_archivo_csv_at} no se encontró en: {base_path_original}")
-        except Exception as e:
-            print(f"Error al leer o convertir el archivo {nombre_archivo_csv_at}: {e}")
-    else:
-        print(f"El archivo {nombre_archivo_csv_at} no existe en: {base_path_original}")
-
-print("Proceso de conversión de archivos CSV completado.")
\ No newline at end of file
+                codificacion = convertir_separador(archivo_entrada, archivo_salida, nombre_archivo_csv_at)
+                print(f'Archivo convertido y guardado (con {codificacion}) en: {archivo_salida}')
+            except Exception as e:
+                print(f"Error al leer o convertir el archivo {nombre_archivo_csv_at}: {e}")
+        else:
+            print(f"El archivo {nombre_archivo_csv_at} no existe en: {base_path_original}")
+
+    print("Proceso de conversión de archivos CSV completado.")
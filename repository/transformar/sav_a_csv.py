@@ -1,21 +1,108 @@
-import pandas as pd
+"""
+Convierte archivos SPSS (.sav) a CSV separado por '|'.
+
+El .sav se lee por bloques de filas con pyreadstat (el mismo lector que usa
+pd.read_spss) y cada bloque se agrega al CSV en cuanto se lee, de modo que la
+memoria depende del tamaño del bloque y no del archivo. Con varios procesos,
+cada uno lee y formatea bloques completos y el CSV se arma en orden (en un pool
+propio o en el pool compartido que se reciba).
+"""
 import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import pyreadstat
 
 base_path_original = os.path.expanduser("~/Documentos/ITRC/DOCUMENTOS_LIMPIAR/NOTIFICACIONES_DIAN/ORIGINAL/")
 base_path_limpio = os.path.expanduser("~/Documentos/ITRC/DOCUMENTOS_LIMPIAR/NOTIFICACIONES_DIAN/CAMBIO_FORMATO_COLUMNAS/")
 archivo_sav = os.path.join(base_path_original, 'Consolidado2017-2019_ent.sav')
 archivo_csv = os.path.join(base_path_limpio, 'Consolidado2017-2019_ent.csv')
 
-if os.path.exists(archivo_sav):
-    print(f"El archivo .sav existe en: {archivo_sav}")
+# Filas del .sav que se leen y escriben por bloque
+FILAS_POR_BLOQUE = 100000
+
+
+def _bloque_csv(archivo_sav, fila_inicial, filas, etiquetas, cabecera):
+    """Texto CSV de filas [fila_inicial, fila_inicial + filas) del .sav."""
+    df, _ = pyreadstat.read_sav(archivo_sav, row_offset=fila_inicial, row_limit=filas,
+                                apply_value_formats=etiquetas)
+    return df.to_csv(index=False, sep='|', header=cabecera, lineterminator='\n')
+
+
+def _bloques_en_paralelo(archivo_sav, total_filas, filas_por_bloque, etiquetas, procesos, pool=None):
+    """Genera el texto de los bloques en orden; cada proceso lee y formatea su bloque."""
+    inicios = iter(range(0, total_filas, filas_por_bloque))
+    propio = pool is None
+    if propio:
+        pool = ProcessPoolExecutor(max_workers=procesos)
+    # Como mucho dos bloques pendientes por proceso
+    pendientes = deque()
     try:
-        df = pd.read_spss(archivo_sav)
-        df.to_csv(archivo_csv, index=False, sep='|')
-        print(f'Archivo .sav convertido a CSV y guardado en: {archivo_csv}')
-    except Exception as e:
-        print(f"Error al leer el archivo .sav: {e}")
-else:
-    print(f"El archivo .sav no existe en: {archivo_sav}")
+        for inicio in islice(inicios, 2 * procesos):
+            pendientes.append(
+                pool.submit(_bloque_csv, archivo_sav, inicio, filas_por_bloque, etiquetas, inicio == 0))
+        while pendientes:
+            texto = pendientes.popleft().result()
+            for inicio in islice(inicios, 1):
+                pendientes.append(
+                    pool.submit(_bloque_csv, archivo_sav, inicio, filas_por_bloque, etiquetas, False))
+            yield texto
+    finally:
+        # En un pool compartido los bloques pendientes no se leen si la conversión se interrumpe
+        for futuro in pendientes:
+            futuro.cancel()
+        if propio:
+            pool.shutdown()
+
+
+def convertir_sav_a_csv(archivo_sav, directorio_salida, etiquetas=True, procesos=1,
+                        filas_por_bloque=FILAS_POR_BLOQUE, pool=None):
+    """
+    Convierte un archivo .sav a CSV separado por '|' en directorio_salida.
+
+    Args:
+        archivo_sav: Ruta del archivo .sav.
+        directorio_salida: Directorio donde se guarda el CSV.
+        etiquetas: Si es True los valores se escriben con sus etiquetas de SPSS
+            (como pd.read_spss); si es False se escriben los códigos.
+        procesos: Procesos que leen y formatean bloques en paralelo (1 = sin paralelismo).
+        filas_por_bloque: Filas leídas y escritas por bloque.
+        pool: Executor de procesos donde se leen los bloques; si es None se crea uno
+            propio (max_workers=procesos) que se cierra al terminar.
 
+    Returns:
+        Ruta del CSV generado (mismo nombre base que el .sav).
+    """
+    nombre_archivo_base, _ = os.path.splitext(os.path.basename(archivo_sav))
+    archivo_csv = os.path.join(directorio_salida, nombre_archivo_base + ".csv")
+    vacio, metadatos = pyreadstat.read_sav(archivo_sav, metadataonly=True)
+    total_filas = metadatos.number_rows
+    with open(archivo_csv, 'w', newline='', encoding='utf-8') as salida:
+        if procesos > 1 and total_filas and total_filas > filas_por_bloque:
+            for texto in _bloques_en_paralelo(archivo_sav, total_filas, filas_por_bloque,
+                                              etiquetas, procesos, pool):
+                salida.write(texto)
+        else:
+            cabecera = True
+            for df, _ in pyreadstat.read_file_in_chunks(pyreadstat.read_sav, archivo_sav,
+                                                        chunksize=filas_por_bloque,
+                                                        apply_value_formats=etiquetas):
+                df.to_csv(salida, index=False, sep='|', header=cabecera)
+                cabecera = False
+            if cabecera:
+                # Archivo sin filas: solo la cabecera
+                vacio.to_csv(salida, index=False, sep='|')
+    return archivo_csv
 
 
+if __name__ == "__main__":
+    if os.path.exists(archivo_sav):
+        print(f"El archivo .sav existe en: {archivo_sav}")
+        try:
+            archivo_csv = convertir_sav_a_csv(archivo_sav, base_path_limpio)
+            print(f'Archivo .sav convertido a CSV y guardado en: {archivo_csv}')
+        except Exception as e:
+            print(f"Error al leer el archivo .sav: {e}")
+    else:
+        print(f"El archivo .sav no existe en: {archivo_sav}")
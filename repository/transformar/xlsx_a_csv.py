@@ -1,5 +1,12 @@
-import pandas as pd
+import csv
+import datetime
 import os
+from typing import Iterator, List
+
+from openpyxl import load_workbook
+from openpyxl.cell.cell import ERROR_CODES
+
+from repository.unit_todos_csv import nombres_columnas
 
 base_path_original = os.path.expanduser("~/Documentos/ITRC/DOCUMENTOS_LIMPIAR/NOTIFICACIONES_DIAN/ORIGINAL/CSV/INFORME_2025_ENERO_MARZO_2025/")
 base_path_limpio = os.path.expanduser("~/Documentos/ITRC/DOCUMENTOS_LIMPIAR/NOTIFICACIONES_DIAN/ORIGINAL/CSV/INFORME_2025_ENERO_MARZO_2025/")
@@ -23,21 +30,103 @@ lista_archivos_xlsx = [
 
 ]
 
-for nombre_archivo_xlsx in lista_archivos_xlsx:
-    archivo_xlsx = os.path.join(base_path_original, nombre_archivo_xlsx)
-    nombre_archivo_base, _ = os.path.splitext(nombre_archivo_xlsx)
-    nombre_archivo_csv = nombre_archivo_base.replace(" ", "_").replace("de_", "").replace("de", "").replace(".", "_") + ".csv"
-    archivo_csv = os.path.join(base_path_limpio, nombre_archivo_csv)
-
-    if os.path.exists(archivo_xlsx):
-        print(f"Procesando archivo: {archivo_xlsx}")
-        try:
-            df = pd.read_excel(archivo_xlsx)
-            df.to_csv(archivo_csv, index=False, sep='|', encoding='utf-8')
-            print(f'Archivo convertido y guardado en: {archivo_csv}')
-        except Exception as e:
-            print(f"Error al leer el archivo {nombre_archivo_xlsx}: {e}")
-    else:
-        print(f"El archivo {nombre_archivo_xlsx} no existe en: {base_path_original}")
-
-print("Proceso de conversión completado.")
+
+def nombre_csv_de(nombre_archivo_base):
+    """Nombre del CSV de salida: sin espacios, sin 'de' y sin puntos."""
+    return nombre_archivo_base.replace(" ", "_").replace("de_", "").replace("de", "").replace(".", "_") + ".csv"
+
+
+def valor_a_texto(valor) -> str:
+    """
+    Texto de una celda para el CSV. Los números enteros se escriben sin '.0' (códigos y
+    NIT no pasan por float), las fechas sin hora como AAAA-MM-DD y los errores de Excel
+    (#N/A, #REF!...) quedan vacíos como en pd.read_excel.
+    """
+    if valor is None:
+        return ''
+    if isinstance(valor, str):
+        return '' if valor in ERROR_CODES else valor
+    if isinstance(valor, float) and valor.is_integer():
+        return str(int(valor))
+    if isinstance(valor, datetime.datetime) and valor.time() == datetime.time():
+        return valor.strftime('%Y-%m-%d')
+    return str(valor)
+
+
+def _sin_vacios_finales(fila: List[str]) -> List[str]:
+    while fila and fila[-1] == '':
+        fila.pop()
+    return fila
+
+
+def filas_xlsx(archivo_xlsx, filas_omitidas=0) -> Iterator[List[str]]:
+    """
+    Lee la primera hoja en streaming (openpyxl read_only) y genera la cabecera y luego
+    las filas, todo como texto.
+
+    Igual que pd.read_excel: la primera fila es la cabecera (vacías a 'Unnamed: N',
+    repetidas con sufijo '.N'), las filas vacías intermedias se conservan y las finales
+    se descartan, y las filas cortas se completan hasta el ancho de la cabecera.
+
+    Args:
+        archivo_xlsx: Ruta del libro.
+        filas_omitidas: Filas de datos que se descartan después de la cabecera.
+    """
+    wb = load_workbook(archivo_xlsx, read_only=True, data_only=True)
+    try:
+        filas = wb.worksheets[0].iter_rows(values_only=True)
+        cabecera = next(filas, None)
+        if cabecera is None:
+            return
+        cabecera = _sin_vacios_finales([valor_a_texto(valor) for valor in cabecera])
+        yield nombres_columnas(cabecera)
+        ancho = len(cabecera)
+        for _ in range(filas_omitidas):
+            next(filas, None)
+        # Las filas vacías solo se escriben si después aparece una fila con datos
+        vacias = 0
+        for valores in filas:
+            fila = _sin_vacios_finales([valor_a_texto(valor) for valor in valores])
+            if not fila:
+                vacias += 1
+                continue
+            for _ in range(vacias):
+                yield [''] * ancho
+            vacias = 0
+            if len(fila) < ancho:
+                fila.extend([''] * (ancho - len(fila)))
+            yield fila
+    finally:
+        wb.close()
+
+
+def convertir_xlsx_a_csv(archivo_xlsx, directorio_salida, separador='|'):
+    """
+    Convierte la primera hoja de un .xlsx a CSV en directorio_salida, fila a fila.
+
+    Returns:
+        Ruta del CSV generado.
+    """
+    nombre_archivo_base, _ = os.path.splitext(os.path.basename(archivo_xlsx))
+    archivo_csv = os.path.join(directorio_salida, nombre_csv_de(nombre_archivo_base))
+    with open(archivo_csv, 'w', newline='', encoding='utf-8') as salida:
+        writer = csv.writer(salida, delimiter=separador, lineterminator='\n')
+        writer.writerows(filas_xlsx(archivo_xlsx))
+    return archivo_csv
+
+
+if __name__ == "__main__":
+    for nombre_archivo_xlsx in lista_archivos_xlsx:
+        archivo_xlsx = os.path.join(base_path_original, nombre_archivo_xlsx)
+
+        if os.path.exists(archivo_xlsx):
+            print(f"Procesando archivo: {archivo_xlsx}")
+            try:
+                archivo_csv = convertir_xlsx_a_csv(archivo_xlsx, base_path_limpio)
+                print(f'Archivo convertido y guardado en: {archivo_csv}')
+            except Exception as e:
+                print(f"Error al leer el archivo {nombre_archivo_xlsx}: {e}")
+        else:
+            print(f"El archivo {nombre_archivo_xlsx} no existe en: {base_path_original}")
+
+    print("Proceso de conversión completado.")
@@ -1,7 +1,9 @@
-import pandas as pd
+import csv
 import os
 import re
 
+from repository.transformar.xlsx_a_csv import filas_xlsx
+
 base_path_original = os.path.expanduser("~/Documentos/ITRC/DOCUMENTOS_LIMPIAR/copia_COLJUEGOS_PQRS/2021")
 base_path_limpio = os.path.expanduser("~/Documentos/ITRC/DOCUMENTOS_LIMPIAR/copia_COLJUEGOS_PQRS/2021/CSV/")
 archivo_xlsx = os.path.join(base_path_original, 'Mes de Agosto de 2021.xlsx')  # Reemplaza 'archivo.xlsx' con el nombre de tu archivo
@@ -32,12 +34,13 @@ MESES_LOWER = {
     "julio": "7", "agosto": "8", "septiembre": "9", "octubre": "10", "noviembre": "11", "diciembre": "12"
 }
 
-for nombre_archivo_xlsx in lista_archivos_xlsx:
-    archivo_xlsx = os.path.join(base_path_original, nombre_archivo_xlsx)
-    nombre_archivo_base, _ = os.path.splitext(nombre_archivo_xlsx)
-    nombre_archivo_csv = nombre_archivo_base.replace(" ", "_").replace("de_", "").replace("de", "").replace(".", "_") + ".csv"
-    archivo_csv = os.path.join(base_path_limpio, nombre_archivo_csv)
 
+def mes_reporte_de(nombre_archivo_csv):
+    """
+    Mes de reporte 'M_AAAA' según el patrón del nombre del archivo: 'Mes_<mes>_<año>',
+    fecha I<AAAAMMDD>, '_<mes>_<año>_' (dynamics) o '<año>-<mes>' (pqr). Los patrones
+    posteriores tienen prioridad. Si ninguno aplica retorna 'Desconocido'.
+    """
     coincidencia = re.search(r"Mes_([A-Za-z]+)_(\d{4})", nombre_archivo_csv)
     coincidencia_2 = re.search(r"Mes_de_([A-Za-z]+)_de_(\d{4})", nombre_archivo_csv)
     coincidencia_fecha = re.search(r"I(\d{8})", nombre_archivo_csv)
@@ -72,23 +75,42 @@ for nombre_archivo_xlsx in lista_archivos_xlsx:
         mes_numero = coincidencia_pqr.group(2)
         mes_numero_sin_cero = str(int(mes_numero))
         mes_reporte = f"{mes_numero_sin_cero}_{anio}"
-    
+    return mes_reporte
+
+
+def convertir_xlsx_a_csv_con_mes_reporte(archivo_xlsx, directorio_salida, separador='|'):
+    """
+    Convierte un .xlsx a CSV en directorio_salida, fila a fila, descartando la primera
+    fila de datos y agregando al principio las columnas nombre_archivo y mes_reporte.
+
+    Returns:
+        Ruta del CSV generado.
+    """
+    nombre_archivo_base, _ = os.path.splitext(os.path.basename(archivo_xlsx))
+    nombre_archivo_csv = nombre_archivo_base.replace(" ", "_").replace("de_", "").replace("de", "").replace(".", "_") + ".csv"
+    archivo_csv = os.path.join(directorio_salida, nombre_archivo_csv)
+    mes_reporte = mes_reporte_de(nombre_archivo_csv)
+
+    filas = filas_xlsx(archivo_xlsx, filas_omitidas=1)
+    with open(archivo_csv, 'w', newline='', encoding='utf-8') as salida:
+        writer = csv.writer(salida, delimiter=separador, lineterminator='\n')
+        writer.writerow(['nombre_archivo', 'mes_reporte'] + next(filas, []))
+        writer.writerows([nombre_archivo_base, mes_reporte] + fila for fila in filas)
+    return archivo_csv
 
-    if os.path.exists(archivo_xlsx):
-        print(f"Procesando archivo: {archivo_xlsx}")
-        try:
-            df = pd.read_excel(archivo_xlsx)
-            if not df.empty and len(df) > 0:
-                df = df.iloc[1:]
-            df.insert(0, 'nombre_archivo', nombre_archivo_base)
-            df.insert(1, 'mes_reporte', mes_reporte)
 
-            df.to_csv(archivo_csv, index=False, sep='|', encoding='utf-8')
-            print(f'Archivo convertido y guardado en: {archivo_csv}')
-        except Exception as e:
-            print(f"Error al leer el archivo {nombre_archivo_xlsx}: {e}")
-    else:
-        print(f"El archivo {nombre_archivo_xlsx} no existe en: {base_path_original}")
+if __name__ == "__main__":
+    for nombre_archivo_xlsx in lista_archivos_xlsx:
+        archivo_xlsx = os.path.join(base_path_original, nombre_archivo_xlsx)
 
+        if os.path.exists(archivo_xlsx):
+            print(f"Procesando archivo: {archivo_xlsx}")
+            try:
+                archivo_csv = convertir_xlsx_a_csv_con_mes_reporte(archivo_xlsx, base_path_limpio)
+                print(f'Archivo convertido y guardado en: {archivo_csv}')
+            except Exception as e:
+                print(f"Error al leer el archivo {nombre_archivo_xlsx}: {e}")
+        else:
+            print(f"El archivo {nombre_archivo_xlsx} no existe en: {base_path_original}")
 
-print("Proceso de conversión completado.")
+    print("Proceso de conversión completado.")
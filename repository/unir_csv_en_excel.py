@@ -1,68 +1,292 @@
-import pandas as pd
-import os
+"""
+Une varios CSV en un libro de Excel, una hoja por archivo.
+
+Las filas pasan directo del lector CSV a la hoja con xlsxwriter en modo
+constant_memory (cada fila se escribe al disco en cuanto se completa y los
+textos van en línea, sin tabla de cadenas compartidas), de modo que la memoria
+no depende del tamaño de los CSV. Al llegar al límite de filas de Excel se
+continúa en una nueva hoja <nombre>_partN.
+
+Si el libro ya existe, las hojas se agregan (o reemplazan a las del mismo
+nombre) directamente en el paquete ZIP, sin leer ni reescribir las demás hojas.
+"""
 import csv
+import os
+import posixpath
+import re
+import shutil
+import tempfile
+import zipfile
+from typing import Dict, List, Sequence, Tuple
+from xml.sax.saxutils import escape, unescape
 
-def unir_csv_en_excel(lista_archivos_csv, archivo_salida):
+import xlsxwriter
+
+MAX_FILAS = 1048576  # Límite de filas en Excel
+OPCIONES_LIBRO = {
+    'constant_memory': True,
+    # Los valores del CSV se escriben como texto tal cual
+    'strings_to_formulas': False,
+    'strings_to_urls': False,
+    'strings_to_numbers': False,
+}
+
+# Partes del paquete que se reescriben al agregar hojas
+TIPOS_CONTENIDO = '[Content_Types].xml'
+RELACIONES_LIBRO = 'xl/_rels/workbook.xml.rels'
+TIPO_HOJA = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet'
+CONTENIDO_HOJA = 'application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml'
+
+
+def nombre_hoja(ruta, parte):
+    """Nombre de la hoja de una parte: nombre base limitado a 25 caracteres y hoja a 31."""
+    nombre_base = os.path.basename(ruta).replace('.csv', '')[:25]
+    return f"{nombre_base}_part{parte}"[:31]
+
+
+def _escribir_csv(libro, ruta, delimitador, usadas) -> List[str]:
+    """Escribe un CSV en hojas de MAX_FILAS filas y retorna los nombres de las hojas creadas."""
+    hojas = []
+    with open(ruta, 'r', newline='', encoding='utf-8') as archivo_csv:
+        lector_csv = csv.reader(archivo_csv, delimiter=delimitador)
+        hoja = None
+        fila_hoja = MAX_FILAS
+        for fila in lector_csv:
+            if fila_hoja == MAX_FILAS:
+                nombre = nombre_hoja(ruta, len(hojas) + 1)
+                if nombre.lower() in usadas:
+                    raise ValueError(f"la hoja '{nombre}' ya existe en el libro")
+                usadas.add(nombre.lower())
+                hoja = libro.add_worksheet(nombre)
+                hojas.append(nombre)
+                fila_hoja = 0
+            for columna, valor in enumerate(fila):
+                if valor:
+                    hoja.write_string(fila_hoja, columna, valor)
+            fila_hoja += 1
+        if not hojas:
+            # CSV vacío: una hoja vacía como antes
+            nombre = nombre_hoja(ruta, 1)
+            usadas.add(nombre.lower())
+            libro.add_worksheet(nombre)
+            hojas.append(nombre)
+    return hojas
+
+
+def escribir_csv_en_excel(lista_archivos_csv: Sequence[str], archivo_salida: str,
+                          delimitador: str = ',') -> Tuple[Dict[str, List[str]], Dict[str, str]]:
+    """
+    Escribe los CSV en un libro nuevo, fila a fila.
+
+    Args:
+        lista_archivos_csv: Rutas de los CSV, una o más hojas por archivo.
+        archivo_salida: Ruta del libro .xlsx (se sobrescribe si existe).
+        delimitador: Separador de los CSV.
+
+    Returns:
+        Tupla (hojas creadas por ruta, error por ruta de los CSV que no se pudieron escribir).
+    """
+    hojas: Dict[str, List[str]] = {}
+    errores: Dict[str, str] = {}
+    usadas = set()
+    libro = xlsxwriter.Workbook(archivo_salida, OPCIONES_LIBRO)
     try:
-        max_filas = 1048576  # Límite de filas en Excel
-        
-        # Leer el archivo Excel existente (si existe)
-        if os.path.exists(archivo_salida):
-            try:
-                excel_data = pd.read_excel(archivo_salida, sheet_name=None)  # Leer todas las hojas
-            except Exception:
-                excel_data = {}  # Si falla, inicia un diccionario vacío
-        else:
-            excel_data = {}  # Iniciar con un diccionario vacío si el archivo no existe
-        
-        # Procesar los archivos CSV y agregar a excel_data
         for ruta in lista_archivos_csv:
             try:
-                nombre_base = ruta.split('/')[-1].replace('.csv', '')[:25]  # Nombre base limitado a 25 caracteres
-                data = []
-                with open(ruta, 'r', encoding='utf-8') as archivo_csv:
-                    lector_csv = csv.reader(archivo_csv)
-                    for fila in lector_csv:
-                        data.append(fila)
-                
-                df = pd.DataFrame(data)
-                num_partes = (len(df) // max_filas) + 1  # Calcular cuántas partes necesitamos
-                
-                for i in range(num_partes):
-                    inicio = i * max_filas
-                    fin = (i + 1) * max_filas
-                    nombre_hoja = f"{nombre_base}_part{i+1}"[:31]  # Limitar nombre a 31 caracteres
-                    excel_data[nombre_hoja] = df.iloc[inicio:fin]  # Guardar parte en el diccionario
-                    print(f"Parte {i+1} del archivo {ruta} agregada como hoja '{nombre_hoja}'")
+                hojas[ruta] = _escribir_csv(libro, ruta, delimitador, usadas)
             except Exception as e:
-                print(f"Error procesando {ruta}: {e}")
-        
-        # Escribir todo a un nuevo archivo Excel
-        with pd.ExcelWriter(archivo_salida) as writer:
-            for sheet_name, df in excel_data.items():
-                df.to_excel(writer, sheet_name=sheet_name, index=False, header=False)
-    
+                errores[ruta] = str(e)
+    finally:
+        libro.close()
+    return hojas, errores
+
+
+def _atributos(etiqueta: str) -> Dict[str, str]:
+    """Atributos de una etiqueta XML, sin prefijo de espacio de nombres y sin escapar."""
+    return {nombre.split(':')[-1]: unescape(doble or simple, {'&quot;': '"', '&apos;': "'"})
+            for nombre, doble, simple in re.findall(r'([\w:]+)=(?:"([^"]*)"|\'([^\']*)\')', etiqueta)}
+
+
+def _parte(destino: str) -> str:
+    """Nombre dentro del ZIP de un Target de xl/_rels/workbook.xml.rels."""
+    return destino.lstrip('/') if destino.startswith('/') else posixpath.normpath('xl/' + destino)
+
+
+def _hojas_libro(zf: zipfile.ZipFile) -> List[Dict[str, str]]:
+    """Hojas del libro en orden: name, sheetId, id (relación) y parte (ruta en el ZIP)."""
+    libro = zf.read('xl/workbook.xml').decode('utf-8')
+    relaciones = {}
+    for etiqueta in re.findall(r'<(?:\w+:)?Relationship\b[^>]*>', zf.read(RELACIONES_LIBRO).decode('utf-8')):
+        atributos = _atributos(etiqueta)
+        relaciones[atributos['Id']] = atributos
+    hojas = []
+    for etiqueta in re.findall(r'<(?:\w+:)?sheet\b[^>]*>', libro):
+        hoja = _atributos(etiqueta)
+        hoja['parte'] = _parte(relaciones[hoja['id']]['Target'])
+        hojas.append(hoja)
+    return hojas
+
+
+def _insertar_antes(xml: str, cierre: str, contenido: str) -> str:
+    """Inserta contenido antes de la etiqueta de cierre (con o sin prefijo)."""
+    coincidencia = list(re.finditer(r'</(?:\w+:)?' + cierre + '>', xml))[-1]
+    return xml[:coincidencia.start()] + contenido + xml[coincidencia.start():]
+
+
+def anexar_csv_en_excel(lista_archivos_csv: Sequence[str], archivo_excel: str,
+                        delimitador: str = ',') -> Tuple[Dict[str, List[str]], Dict[str, str]]:
+    """
+    Agrega los CSV como hojas a un libro existente trabajando a nivel del ZIP.
+
+    Las hojas nuevas se generan aparte con xlsxwriter y se copian como partes del
+    paquete; una hoja con el mismo nombre que una existente la reemplaza en su
+    posición. Solo se reescriben workbook.xml, sus relaciones y [Content_Types].xml:
+    el resto de hojas no se lee ni se vuelve a serializar. Si falla, el libro se
+    restaura tal como estaba.
+
+    Returns:
+        Tupla (hojas escritas por ruta, error por ruta de los CSV que no se pudieron escribir).
+    """
+    temp_dir = tempfile.mkdtemp(dir=os.path.dirname(os.path.abspath(archivo_excel)))
+    try:
+        # Hojas nuevas en un libro temporal; la primera hoja (seleccionada) no se copia
+        libro_nuevo = os.path.join(temp_dir, 'nuevas.xlsx')
+        libro = xlsxwriter.Workbook(libro_nuevo, OPCIONES_LIBRO)
+        libro.add_worksheet('_')
+        hojas: Dict[str, List[str]] = {}
+        errores: Dict[str, str] = {}
+        usadas = {'_'}
+        try:
+            for ruta in lista_archivos_csv:
+                try:
+                    hojas[ruta] = _escribir_csv(libro, ruta, delimitador, usadas)
+                except Exception as e:
+                    errores[ruta] = str(e)
+        finally:
+            libro.close()
+        escritas = {nombre for nombres in hojas.values() for nombre in nombres}
+
+        with zipfile.ZipFile(archivo_excel) as zf:
+            existentes = {hoja['name'].lower(): hoja for hoja in _hojas_libro(zf)}
+            libro_xml = zf.read('xl/workbook.xml').decode('utf-8')
+            relaciones_xml = zf.read(RELACIONES_LIBRO).decode('utf-8')
+            tipos_xml = zf.read(TIPOS_CONTENIDO).decode('utf-8')
+            partes = set(zf.namelist())
+            # Copia del directorio central para restaurar el libro si algo falla
+            inicio_directorio = zf.start_dir
+        with open(archivo_excel, 'rb') as f:
+            f.seek(inicio_directorio)
+            cola = f.read()
+
+        ids_hoja = [int(hoja['sheetId']) for hoja in existentes.values()]
+        ids_relacion = set(re.findall(r'\bId="([^"]*)"', relaciones_xml))
+        copias: List[Tuple[str, str]] = []  # (parte en el libro nuevo, parte destino)
+        eliminar = {'xl/workbook.xml', RELACIONES_LIBRO, TIPOS_CONTENIDO}
+        reemplazos = False
+        with zipfile.ZipFile(libro_nuevo) as nuevo:
+            for hoja in _hojas_libro(nuevo)[1:]:
+                if hoja['name'] not in escritas:
+                    continue
+                existente = existentes.get(hoja['name'].lower())
+                if existente is not None:
+                    destino = existente['parte']
+                    carpeta, archivo = posixpath.split(destino)
+                    eliminar.update({destino, f"{carpeta}/_rels/{archivo}.rels"})
+                    reemplazos = True
+                else:
+                    n = 1
+                    while f"xl/worksheets/sheet{n}.xml" in partes:
+                        n += 1
+                    destino = f"xl/worksheets/sheet{n}.xml"
+                    partes.add(destino)
+                    id_hoja = max(ids_hoja, default=0) + 1
+                    ids_hoja.append(id_hoja)
+                    n = 1
+                    while f"rId{n}" in ids_relacion:
+                        n += 1
+                    id_relacion = f"rId{n}"
+                    ids_relacion.add(id_relacion)
+                    nombre = escape(hoja['name'], {'"': '&quot;'})
+                    libro_xml = _insertar_antes(
+                        libro_xml, 'sheets', f'<sheet name="{nombre}" sheetId="{id_hoja}" r:id="{id_relacion}"/>')
+                    relaciones_xml = _insertar_antes(
+                        relaciones_xml, 'Relationships',
+                        f'<Relationship Id="{id_relacion}" Type="{TIPO_HOJA}" '
+                        f'Target="/{destino}"/>')
+                    tipos_xml = _insertar_antes(
+                        tipos_xml, 'Types', f'<Override PartName="/{destino}" ContentType="{CONTENIDO_HOJA}"/>')
+                copias.append((hoja['parte'], destino))
+
+            if reemplazos:
+                # La cadena de cálculo puede apuntar a celdas que ya no existen; Excel la reconstruye
+                eliminar.add('xl/calcChain.xml')
+                relaciones_xml = re.sub(r'<(?:\w+:)?Relationship\b[^>]*/calcChain"[^>]*/>', '', relaciones_xml)
+                tipos_xml = re.sub(r'<(?:\w+:)?Override\b[^>]*PartName="/xl/calcChain.xml"[^>]*/>', '', tipos_xml)
+            if 'r:id=' in libro_xml and 'xmlns:r=' not in libro_xml:
+                raise ValueError("workbook.xml sin el espacio de nombres de relaciones")
+
+            try:
+                with zipfile.ZipFile(archivo_excel, 'a', compression=zipfile.ZIP_DEFLATED) as zf:
+                    # Las entradas reemplazadas salen del directorio central; sus datos quedan
+                    # sin referencia dentro del archivo
+                    zf.filelist = [info for info in zf.filelist if info.filename not in eliminar]
+                    for nombre in eliminar:
+                        zf.NameToInfo.pop(nombre, None)
+                    for origen, destino in copias:
+                        with nuevo.open(origen) as entrada, zf.open(destino, 'w', force_zip64=True) as salida:
+                            shutil.copyfileobj(entrada, salida, 1 << 20)
+                    zf.writestr('xl/workbook.xml', libro_xml)
+                    zf.writestr(RELACIONES_LIBRO, relaciones_xml)
+                    zf.writestr(TIPOS_CONTENIDO, tipos_xml)
+            except BaseException:
+                with open(archivo_excel, 'r+b') as f:
+                    f.seek(inicio_directorio)
+                    f.truncate()
+                    f.write(cola)
+                raise
+        return hojas, errores
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def unir_csv_en_excel(lista_archivos_csv, archivo_salida):
+    try:
+        hojas = errores = None
+        # Si el libro ya existe se le agregan las hojas sin reescribir las demás
+        if os.path.exists(archivo_salida):
+            try:
+                hojas, errores = anexar_csv_en_excel(lista_archivos_csv, archivo_salida)
+            except (zipfile.BadZipFile, KeyError) as e:
+                print(f"No se pudo abrir {archivo_salida} ({e}); se genera de nuevo")
+        if hojas is None:
+            hojas, errores = escribir_csv_en_excel(lista_archivos_csv, archivo_salida)
+        for ruta, nombres in hojas.items():
+            for i, nombre in enumerate(nombres):
+                print(f"Parte {i+1} del archivo {ruta} agregada como hoja '{nombre}'")
+        for ruta, error in errores.items():
+            print(f"Error procesando {ruta}: {error}")
     except Exception as e:
         print(f"Error general: {e}")
 
-# Lista de archivos CSV
-rutas_csv_final = [
-    
-    # "/home/anacleto/Descargas/consolidados/CSV/final/2024abr-sep.csv",
-    # "/home/anacleto/Descargas/consolidados/CSV/final/2024ene-mar.csv",
-    # "/home/anacleto/Descargas/consolidados/CSV/final/Consolidadodic2022-dic2023.csv",
-    # "/home/anacleto/Descargas/consolidados/CSV/final/Consolidadojun-nov2022.csv",
-    # "/home/anacleto/Descargas/consolidados/CSV/final/Consolidado2021-mayo2022.csv",
-    # "/home/anacleto/Descargas/consolidados/CSV/final/Consolidado2019-2020_ent.csv",
-    "/home/anacleto/Descargas/consolidados/CSV/final/Consolidado2017-2019_ent.csv",
-    # "/home/anacleto/Descargas/consolidados/CSV/final/Consolidado2017-2022.csv",
-    
-    
-    
-    
-]
-
-
-archivo_excel_salida = "/home/anacleto/Descargas/consolidados/CSV/final/Consolidado_Final.xlsx"
-
-unir_csv_en_excel(rutas_csv_final, archivo_excel_salida)
+
+if __name__ == "__main__":
+    # Lista de archivos CSV
+    rutas_csv_final = [
+
+        # "/home/anacleto/Descargas/consolidados/CSV/final/2024abr-sep.csv",
+        # "/home/anacleto/Descargas/consolidados/CSV/final/2024ene-mar.csv",
+        # "/home/anacleto/Descargas/consolidados/CSV/final/Consolidadodic2022-dic2023.csv",
+        # "/home/anacleto/Descargas/consolidados/CSV/final/Consolidadojun-nov2022.csv",
+        # "/home/anacleto/Descargas/consolidados/CSV/final/Consolidado2021-mayo2022.csv",
+        # "/home/anacleto/Descargas/consolidados/CSV/final/Consolidado2019-2020_ent.csv",
+        "/home/anacleto/Descargas/consolidados/CSV/final/Consolidado2017-2019_ent.csv",
+        # "/home/anacleto/Descargas/consolidados/CSV/final/Consolidado2017-2022.csv",
+
+
+
+
+    ]
+
+    archivo_excel_salida = "/home/anacleto/Descargas/consolidados/CSV/final/Consolidado_Final.xlsx"
+
+    unir_csv_en_excel(rutas_csv_final, archivo_excel_salida)
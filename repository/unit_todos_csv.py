@@ -1,5 +1,23 @@
-import pandas as pd
+"""
+Une varios CSV separados por '|' en un consolidado con la unión de sus columnas.
+
+La unión se hace en streaming con memoria constante: primero se leen solo las
+cabeceras para calcular el esquema (columnas en orden de aparición, como
+pd.concat) y luego las filas de cada archivo se copian al consolidado a través
+de una proyección precalculada (itemgetter sobre la fila rellenada), sin cargar
+ningún archivo completo en memoria.
+
+El resultado es el mismo que el de leer cada archivo con
+pd.read_csv(dtype=str), quitar el '.0' final de cada valor y concatenar: los
+valores que pandas interpreta como nulos quedan vacíos y las cabeceras vacías o
+repetidas se renombran igual que en pandas ('Unnamed: N', 'col.1').
+"""
+import csv
+import io
 import os
+from collections import defaultdict
+from operator import itemgetter
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
 
 # Lista de archivos CSV a combinar
 filenames = [
@@ -15,35 +33,155 @@ filenames = [
 # Ruta base donde están los archivos
 base_path = os.path.expanduser("~/Documentos/ITRC/DOCUMENTOS_LIMPIAR/copia_COLJUEGOS_PQRS")
 
-# Función para limpiar valores tipo '123.0' -> '123'
-def clean_value(val):
-    if isinstance(val, str) and val.endswith('.0'):
-        return val[:-2]
-    return val
-
-# Inicializar lista de DataFrames
-dataframes = []
-
-# Procesar cada archivo
-for filename in filenames:
-    file_path = os.path.join(base_path, filename)
-    if not os.path.isfile(file_path):
-        print(f"⚠️ Archivo no encontrado: {file_path}")
-        continue
-    try:
-        df = pd.read_csv(file_path, delimiter='|', dtype=str)
-        df = df.applymap(clean_value)
-        dataframes.append(df)
-        print(f"📥 Cargado: {filename} ({df.shape[0]} filas)")
-    except Exception as e:
-        print(f"❌ Error al leer {filename}: {e}")
-
-# Verificar si hay data para concatenar
-if not dataframes:
-    print("❗ No se cargó ningún archivo válido. Proceso cancelado.")
-else:
-    combined_df = pd.concat(dataframes, ignore_index=True)
-    output_file = os.path.join(base_path, "consolidado_coljuegos_pqr_2021.csv")
-    combined_df.to_csv(output_file, sep='|', index=False)
-    print(f"✅ Consolidado generado con éxito en: {output_file} ({combined_df.shape[0]} filas)")
+DELIMITADOR = '|'
+# Filas que se acumulan antes de entregar un bloque de texto
+FILAS_POR_BLOQUE = 10000
+# Valores que pd.read_csv convierte en NaN por defecto (se escribían vacíos)
+VALORES_NULOS = {
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND',
+    '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null',
+}
+
+# (número de columnas del archivo, proyección de una fila rellenada al esquema unido)
+Proyeccion = Tuple[int, Callable[[List[str]], Sequence[str]]]
+
+
+def nombres_columnas(cabecera: List[str]) -> List[str]:
+    """Nombres de columna como los asigna pandas: vacíos a 'Unnamed: N' y repetidos con sufijo '.N'."""
+    nombres = [nombre if nombre else f"Unnamed: {i}" for i, nombre in enumerate(cabecera)]
+    conteo = defaultdict(int)
+    for i, nombre in enumerate(nombres):
+        repeticiones = conteo[nombre]
+        while repeticiones > 0:
+            conteo[nombre] = repeticiones + 1
+            nombre = f"{nombre}.{repeticiones}"
+            repeticiones = conteo[nombre]
+        nombres[i] = nombre
+        conteo[nombre] = repeticiones + 1
+    return nombres
+
+
+def leer_cabecera(ruta: str, delimitador: str = DELIMITADOR) -> List[str]:
+    """Lee solo la cabecera de un CSV."""
+    with open(ruta, 'r', newline='', encoding='utf-8-sig') as archivo:
+        cabecera = next(csv.reader(archivo, delimiter=delimitador), None)
+    if not cabecera:
+        raise ValueError("el archivo no tiene cabecera")
+    return nombres_columnas(cabecera)
+
+
+def esquema_union(cabeceras: Sequence[List[str]]) -> Tuple[List[str], List[Proyeccion]]:
+    """
+    Calcula las columnas del consolidado y la proyección de cada archivo.
+
+    Las columnas ausentes en un archivo apuntan a la posición de relleno
+    (len(cabecera)), que siempre vale ''.
+    """
+    columnas: List[str] = []
+    vistas = set()
+    for cabecera in cabeceras:
+        for columna in cabecera:
+            if columna not in vistas:
+                vistas.add(columna)
+                columnas.append(columna)
+
+    proyecciones: List[Proyeccion] = []
+    for cabecera in cabeceras:
+        posiciones: Dict[str, int] = {columna: i for i, columna in enumerate(cabecera)}
+        indices = [posiciones.get(columna, len(cabecera)) for columna in columnas]
+        if len(indices) == 1:
+            # itemgetter con un solo índice no retorna tupla
+            proyeccion = lambda fila, i=indices[0]: (fila[i],)
+        else:
+            proyeccion = itemgetter(*indices)
+        proyecciones.append((len(cabecera), proyeccion))
+    return columnas, proyecciones
+
+
+def filas_archivo(ruta: str, proyeccion: Proyeccion, delimitador: str = DELIMITADOR,
+                  normalizar: bool = True) -> Iterator[List[str]]:
+    """
+    Filas de un archivo proyectadas al esquema unido, con los nulos vacíos y sin el '.0' final
+    (con normalizar=False los valores se copian tal cual).
+    """
+    n_columnas, proyectar = proyeccion
+    relleno = [''] * (n_columnas + 1)
+    with open(ruta, 'r', newline='', encoding='utf-8-sig') as archivo:
+        lector = csv.reader(archivo, delimiter=delimitador)
+        next(lector, None)
+        for fila in lector:
+            if not fila:
+                continue
+            if len(fila) > n_columnas:
+                raise ValueError(
+                    f"{os.path.basename(ruta)}: la línea {lector.line_num} tiene {len(fila)} campos, "
+                    f"se esperaban {n_columnas}"
+                )
+            fila.extend(relleno[len(fila):])
+            if not normalizar:
+                yield list(proyectar(fila))
+                continue
+            yield ['' if valor in VALORES_NULOS else (valor[:-2] if valor.endswith('.0') else valor)
+                   for valor in proyectar(fila)]
+
+
+def bloques_csv_unido(rutas: Sequence[str], delimitador: str = DELIMITADOR,
+                      filas_por_bloque: int = FILAS_POR_BLOQUE,
+                      conteo: Optional[Dict[str, int]] = None) -> Iterator[str]:
+    """
+    Genera el texto del consolidado por bloques de filas.
+
+    Args:
+        rutas: Archivos a unir, en orden.
+        delimitador: Separador de entrada y de salida.
+        filas_por_bloque: Filas por bloque entregado.
+        conteo: Si se indica, recibe el número de filas copiadas de cada ruta.
+    """
+    columnas, proyecciones = esquema_union([leer_cabecera(ruta, delimitador) for ruta in rutas])
+
+    bloque = io.StringIO()
+    writer = csv.writer(bloque, delimiter=delimitador, lineterminator='\n')
+    writer.writerow(columnas)
+    pendientes = 0
+    for ruta, proyeccion in zip(rutas, proyecciones):
+        filas = 0
+        for fila in filas_archivo(ruta, proyeccion, delimitador):
+            writer.writerow(fila)
+            filas += 1
+            pendientes += 1
+            if pendientes >= filas_por_bloque:
+                yield bloque.getvalue()
+                bloque.seek(0)
+                bloque.truncate()
+                pendientes = 0
+        if conteo is not None:
+            conteo[ruta] = filas
+    yield bloque.getvalue()
+
+
+if __name__ == "__main__":
+    # Procesar cada archivo: solo se valida que exista y que su cabecera se pueda leer
+    rutas = []
+    for filename in filenames:
+        file_path = os.path.join(base_path, filename)
+        if not os.path.isfile(file_path):
+            print(f"⚠️ Archivo no encontrado: {file_path}")
+            continue
+        try:
+            leer_cabecera(file_path)
+            rutas.append(file_path)
+        except Exception as e:
+            print(f"❌ Error al leer {filename}: {e}")
 
+    # Verificar si hay data para concatenar
+    if not rutas:
+        print("❗ No se cargó ningún archivo válido. Proceso cancelado.")
+    else:
+        output_file = os.path.join(base_path, "consolidado_coljuegos_pqr_2021.csv")
+        conteo = {}
+        with open(output_file, 'w', newline='', encoding='utf-8') as salida:
+            for bloque in bloques_csv_unido(rutas, conteo=conteo):
+                salida.write(bloque)
+        for ruta, filas in conteo.items():
+            print(f"📥 Cargado: {os.path.basename(ruta)} ({filas} filas)")
+        print(f"✅ Consolidado generado con éxito en: {output_file} ({sum(conteo.values())} filas)")
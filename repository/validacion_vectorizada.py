@@ -0,0 +1,142 @@
+"""
+Motor de validación vectorizado para los CSVProcessor.
+
+Valida un bloque de filas columna por columna con pandas/NumPy y devuelve las
+columnas normalizadas junto con una máscara booleana de errores. El resultado es
+idéntico al de la validación celda a celda:
+
+- validar_entero / validar_flotante se aplican como operaciones de columna
+  (mismo regex de limpieza y de validación que los Validadores*).
+- validar_date / validar_fecha resuelven las fechas ISO (YYYY-MM-DD) con
+  to_datetime y formato explícito; el resto pasa al validador original.
+- validar_cadena_caracteres_especiales usa la variante por columna de
+  repository.normalizacion_texto (siempre es válido).
+- limpiar_nit usa LimpiadorNit.columna del validador (ver repository.nit).
+- Cualquier otro validador se ejecuta una sola vez por valor distinto del
+  bloque (factorize) y el resultado se expande de vuelta a la columna.
+"""
+import inspect
+from typing import Callable, Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from repository.nit import LimpiadorNit
+from repository.normalizacion_texto import limpiar_cadena_columna
+
+NO_NUMERICO = r"[^\d.-]"
+PATRONES_NUMERICOS = {
+    "validar_entero": r"-?\d+",
+    "validar_flotante": r"-?\d+(?:\.\d+)?",
+}
+METODOS_FECHA = {"validar_date", "validar_fecha"}
+METODOS_TEXTO = {"validar_cadena_caracteres_especiales": limpiar_cadena_columna}
+# Solo años de cuatro cifras sin cero inicial: strftime('%Y') no rellena años < 1000
+FECHA_ISO = r"[1-9][0-9]{3}-[0-9]{2}-[0-9]{2}"
+
+
+def limpiar_columna(valores: np.ndarray, null_values: Iterable[str]) -> np.ndarray:
+    """Equivalente de CSVProcessor.clean_value sobre un array de cadenas, una vez por valor distinto."""
+    nulos = set(null_values)
+    codigos, unicos = pd.factorize(valores, sort=False)
+    limpios = np.empty(len(unicos), dtype=object)
+    limpios[:] = [("" if limpio.upper() in nulos else limpio) for limpio in (valor.strip() for valor in unicos)]
+    return limpios[codigos]
+
+
+def _validar_por_valor_distinto(valores: np.ndarray, metodo: Callable) -> Tuple[np.ndarray, np.ndarray]:
+    """Ejecuta el validador una vez por valor distinto y expande el resultado."""
+    codigos, unicos = pd.factorize(valores, sort=False)
+    resultados = [metodo(valor) for valor in unicos]
+    normalizados = np.empty(len(resultados), dtype=object)
+    normalizados[:] = [normalizado for normalizado, _ in resultados]
+    validos = np.fromiter((bool(es_valido) for _, es_valido in resultados), dtype=bool, count=len(resultados))
+    return normalizados[codigos], ~validos[codigos]
+
+
+def _nombre_validador(metodo: Callable) -> str:
+    """Nombre del método validador detrás de la memoización (lru_cache) y del partial de formato de fecha."""
+    metodo = inspect.unwrap(metodo)
+    return getattr(getattr(metodo, "func", metodo), "__name__", "")
+
+
+def _limpiador_nit(metodo: Callable):
+    """LimpiadorNit del validador detrás de limpiar_nit, o None si el validador no lo declara."""
+    validador = getattr(inspect.unwrap(metodo), "__self__", None)
+    limpiador = getattr(validador, "LIMPIADOR_NIT", None)
+    return limpiador if isinstance(limpiador, LimpiadorNit) else None
+
+
+def validar_columna(valores: pd.Series, metodo: Callable) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Valida una columna ya limpia con el método de un validador.
+
+    Returns:
+        Tupla (valores normalizados, máscara de error). Los valores vacíos no se validan.
+    """
+    nombre = _nombre_validador(metodo)
+    resultado = valores.to_numpy(dtype=object, copy=True)
+    error = np.zeros(len(resultado), dtype=bool)
+    pendientes = resultado != ""
+
+    if nombre in PATRONES_NUMERICOS:
+        limpios = valores.str.replace(NO_NUMERICO, "", regex=True)
+        validos = limpios.str.fullmatch(PATRONES_NUMERICOS[nombre]).to_numpy(dtype=bool)
+        resultado[pendientes] = limpios.to_numpy(dtype=object)[pendientes]
+        error[pendientes] = ~validos[pendientes]
+        return resultado, error
+
+    if nombre in METODOS_TEXTO:
+        resultado[pendientes] = METODOS_TEXTO[nombre](valores[pendientes]).to_numpy(dtype=object)
+        return resultado, error
+
+    limpiador_nit = _limpiador_nit(metodo) if nombre == "limpiar_nit" else None
+    if limpiador_nit is not None:
+        normalizados, validos = limpiador_nit.columna(valores[pendientes])
+        resultado[pendientes] = normalizados
+        error[pendientes] = ~validos
+        return resultado, error
+
+    if nombre in METODOS_FECHA:
+        iso = valores.str.fullmatch(FECHA_ISO).to_numpy(dtype=bool) & pendientes
+        if iso.any():
+            fechas = pd.to_datetime(valores[iso], format="%Y-%m-%d", errors="coerce")
+            # Una fecha ISO válida se normaliza a sí misma
+            pendientes[np.flatnonzero(iso)[fechas.notna().to_numpy()]] = False
+
+    if pendientes.any():
+        normalizados, errores = _validar_por_valor_distinto(resultado[pendientes], metodo)
+        resultado[pendientes] = normalizados
+        error[pendientes] = errores
+    return resultado, error
+
+
+def validar_bloque(filas: List[List[str]], checks, null_values: Iterable[str],
+                   columnas_extra: int = 0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Limpia y valida un bloque de filas (todas con el mismo número de columnas).
+
+    Args:
+        filas: Filas crudas del bloque.
+        checks: ColumnPlan.checks del CSVProcessor: (índice, método, columna, tipo, mensaje).
+        null_values: Valores que se consideran nulos.
+        columnas_extra: Columnas vacías que se agregan al final de los normalizados.
+
+    Returns:
+        Tupla (limpios, normalizados, máscara) de arrays de NumPy: los valores limpios
+        antes de validar (filas x columnas), los valores finales (con las columnas
+        extra) y una máscara (filas x checks) que es True donde hay error.
+    """
+    bloque = np.empty((len(filas), len(filas[0]) if filas else 0), dtype=object)
+    bloque[:] = filas
+    limpios = np.empty_like(bloque)
+    for idx in range(bloque.shape[1]):
+        limpios[:, idx] = limpiar_columna(bloque[:, idx], null_values)
+    normalizados = np.full((bloque.shape[0], bloque.shape[1] + columnas_extra), "", dtype=object)
+    normalizados[:, :bloque.shape[1]] = limpios
+    mascara = np.zeros((len(bloque), len(checks)), dtype=bool)
+    for posicion, (idx, metodo, _, _, _) in enumerate(checks):
+        valores, error = validar_columna(pd.Series(limpios[:, idx], dtype=object), metodo)
+        normalizados[:, idx] = valores
+        mascara[:, posicion] = error
+    return limpios, normalizados, mascara
@@ -0,0 +1,107 @@
+"""
+ZIP generado en streaming para las respuestas de los endpoints.
+
+En lugar de escribir el ZIP completo en disco y servirlo después, cada miembro se
+comprime en cuanto está disponible y los bytes se entregan por bloques (zipfile
+escribe sobre un flujo no buscable usando descriptores de datos). Los miembros
+se consumen de forma perezosa: si el iterable convierte los archivos uno a uno,
+el cliente recibe el primero mientras se convierte el siguiente.
+
+El nivel de compresión se configura con la variable de entorno
+ZIP_NIVEL_COMPRESION: 0 solo almacena (sin compresión) y 1-9 usa deflate. Los
+formatos que ya vienen comprimidos (xlsx, parquet...) siempre se almacenan.
+
+El tiempo de compresión (sin la obtención de los miembros ni la espera del
+cliente) y los bytes enviados se publican en /metrics (ver repository.metricas).
+"""
+import os
+import zipfile
+from functools import partial
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from repository.metricas import BYTES, BYTES_POR_SEGUNDO, Medicion, observar_etapa
+
+# 0 = solo almacenar, 1-9 = deflate (mayor nivel, menor tamaño y más CPU)
+NIVEL_COMPRESION = int(os.environ.get("ZIP_NIVEL_COMPRESION", "6"))
+# Bytes que se leen de cada miembro por iteración
+TAMANO_BLOQUE = 1 << 20
+# Formatos ya comprimidos: volver a comprimirlos solo gasta CPU
+EXTENSIONES_COMPRIMIDAS = {".xlsx", ".zip", ".gz", ".parquet", ".sav"}
+
+
+class _SalidaEnBloques:
+    """Flujo de solo escritura que acumula los bytes hasta que el generador los entrega."""
+
+    def __init__(self):
+        self._partes: List[bytes] = []
+
+    def write(self, datos) -> int:
+        self._partes.append(bytes(datos))
+        return len(datos)
+
+    def flush(self) -> None:
+        pass
+
+    def vaciar(self) -> bytes:
+        datos = b"".join(self._partes)
+        self._partes.clear()
+        return datos
+
+
+def _compresion(nombre: str, nivel: int) -> Tuple[int, Optional[int]]:
+    """Método y nivel de compresión de un miembro."""
+    if nivel <= 0 or os.path.splitext(nombre)[1].lower() in EXTENSIONES_COMPRIMIDAS:
+        return zipfile.ZIP_STORED, None
+    return zipfile.ZIP_DEFLATED, nivel
+
+
+def generar_zip(miembros: Iterable[Tuple[str, str]], nivel: Optional[int] = None,
+                tamano_bloque: int = TAMANO_BLOQUE) -> Iterator[bytes]:
+    """
+    Genera los bytes de un ZIP a medida que se comprimen los miembros.
+
+    Args:
+        miembros: Pares (ruta, nombre dentro del ZIP). Se consumen de uno en uno;
+            las rutas que no existen se omiten.
+        nivel: Nivel de compresión (0 = solo almacenar). Por defecto NIVEL_COMPRESION.
+        tamano_bloque: Bytes leídos de cada archivo por iteración.
+    """
+    medicion = Medicion()
+    enviados = 0
+    try:
+        zip_bloques = _generar_zip(medicion.iterar('miembros', miembros), nivel, tamano_bloque)
+        for datos in medicion.iterar('zip', zip_bloques):
+            enviados += len(datos)
+            yield datos
+    finally:
+        segundos = medicion.etapas.get('zip', 0.0) - medicion.etapas.get('miembros', 0.0)
+        observar_etapa('zip', 'compresion', segundos)
+        BYTES.sumar(enviados, origen='zip')
+        if segundos > 0:
+            BYTES_POR_SEGUNDO.fijar(enviados / segundos, origen='zip')
+
+
+def _generar_zip(miembros: Iterable[Tuple[str, str]], nivel: Optional[int],
+                 tamano_bloque: int) -> Iterator[bytes]:
+    nivel = NIVEL_COMPRESION if nivel is None else nivel
+    salida = _SalidaEnBloques()
+    with zipfile.ZipFile(salida, "w") as zipf:
+        for ruta, nombre in miembros:
+            if not os.path.exists(ruta):
+                continue
+            zipf.compression, zipf.compresslevel = _compresion(nombre, nivel)
+            # Sin posibilidad de retroceder, ZIP64 debe decidirse antes de escribir
+            zip64 = os.path.getsize(ruta) * 1.05 > zipfile.ZIP64_LIMIT
+            with open(ruta, "rb") as origen, zipf.open(nombre, "w", force_zip64=zip64) as destino:
+                for bloque in iter(partial(origen.read, tamano_bloque), b""):
+                    destino.write(bloque)
+                    datos = salida.vaciar()
+                    if datos:
+                        yield datos
+            datos = salida.vaciar()
+            if datos:
+                yield datos
+    # Directorio central
+    datos = salida.vaciar()
+    if datos:
+        yield datos
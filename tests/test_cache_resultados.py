@@ -0,0 +1,64 @@
+"""
+CacheResultados: clave por contenido, parámetros y versión del código; publicación
+solo de envíos completos y desalojo LRU por tamaño.
+"""
+import os
+
+from repository.cache_resultados import CacheResultados, hash_archivo, version_codigo
+
+
+def test_clave_determinista():
+    clave = CacheResultados.clave("endpoint", {"b": 1, "a": [2, 3]}, "ñ")
+    assert clave == CacheResultados.clave("endpoint", {"a": [2, 3], "b": 1}, "ñ")
+    assert clave != CacheResultados.clave("endpoint", {"a": [3, 2], "b": 1}, "ñ")
+    assert len(clave) == 64
+
+
+def test_hash_y_version_del_codigo(tmp_path):
+    modulo = tmp_path / "conversor.py"
+    modulo.write_text("VALOR = 1\n")
+    otro = tmp_path / "otro.txt"
+    otro.write_text("VALOR = 1\n")
+    assert hash_archivo(str(modulo)) == hash_archivo(str(otro))
+
+    version = version_codigo(str(tmp_path))
+    assert version_codigo(str(tmp_path)) == version
+    modulo.write_text("VALOR = 22\n")
+    assert version_codigo(str(tmp_path)) != version
+
+
+def test_guardar_mientras_envia(tmp_path):
+    cache = CacheResultados(str(tmp_path), max_bytes=1 << 20)
+    assert list(cache.guardar_mientras_envia("completa", iter([b"ab", b"cd"]))) == [b"ab", b"cd"]
+    with open(cache.obtener("completa"), "rb") as f:
+        assert f.read() == b"abcd"
+
+    list(cache.guardar_mientras_envia("sin_confirmar", iter([b"x"]), lambda: False))
+    assert cache.obtener("sin_confirmar") is None
+
+    # El cliente se desconecta antes de terminar el envío
+    envio = cache.guardar_mientras_envia("interrumpida", iter([b"x", b"y"]))
+    next(envio)
+    envio.close()
+    assert cache.obtener("interrumpida") is None
+    assert os.listdir(tmp_path) == ["completa"]
+
+
+def test_desalojo_lru(tmp_path):
+    cache = CacheResultados(str(tmp_path), max_bytes=15)
+    for momento, clave in enumerate(["usada", "vieja", "nueva"]):
+        list(cache.guardar_mientras_envia(clave, iter([b"12345"])))
+        os.utime(tmp_path / clave, (momento, momento))
+    # obtener la marca como la más reciente
+    cache.obtener("usada")
+    cache.max_bytes = 10
+    cache.desalojar()
+    assert sorted(os.listdir(tmp_path)) == ["nueva", "usada"]
+
+
+def test_cache_desactivada(tmp_path):
+    cache = CacheResultados(str(tmp_path / "cache"), max_bytes=0)
+    assert not cache.activa
+    assert list(cache.guardar_mientras_envia("clave", iter([b"x"]))) == [b"x"]
+    assert cache.obtener("clave") is None
+    assert not os.path.exists(tmp_path / "cache")
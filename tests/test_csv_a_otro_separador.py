@@ -0,0 +1,58 @@
+"""
+convertir_separador: cambio de separador en una pasada por bloques, con las
+columnas nombre_archivo y mes_reporte, la codificación detectada (UTF-8, latin-1
+o mixta) y los finales de línea cortados entre bloques.
+"""
+import codecs
+
+import pytest
+
+from repository.transformar.csv_a_otro_separador import convertir_separador, detectar_codificacion, mes_reporte_de
+
+NOMBRE = "ARCHIVO_COLJ_I20250101_F20250131.csv"
+
+
+def convertir(tmp_path, datos: bytes, tamano_bloque: int = 1 << 22):
+    entrada = tmp_path / "entrada.csv"
+    entrada.write_bytes(datos)
+    salida = tmp_path / "salida.csv"
+    codificacion = convertir_separador(str(entrada), str(salida), NOMBRE, tamano_bloque=tamano_bloque)
+    return codificacion, salida.read_text(encoding="utf-8")
+
+
+def test_mes_reporte_de():
+    assert mes_reporte_de(NOMBRE) == "01_2025"
+    assert mes_reporte_de("sin_fecha.csv") == "Desconocido"
+
+
+def test_detectar_codificacion():
+    assert detectar_codificacion("año\n".encode("utf-8")) == "utf-8"
+    assert detectar_codificacion("año\n".encode("latin-1")) == "latin-1"
+    # Un carácter multibyte cortado al final de la muestra no es un error
+    assert detectar_codificacion("añ".encode("utf-8")[:-1]) == "utf-8"
+
+
+@pytest.mark.parametrize("tamano_bloque", [1 << 22, 3])
+def test_convierte_separador_y_agrega_columnas(tmp_path, tamano_bloque):
+    datos = codecs.BOM_UTF8 + "A|@B\r\n1 |@ñ\r\n2|@x\r\n".encode("utf-8")
+    codificacion, texto = convertir(tmp_path, datos, tamano_bloque)
+    assert codificacion == "utf-8"
+    assert texto == (
+        "nombre_archivo|mes_reporte|A|B\n"
+        f"{NOMBRE}|01_2025|1 |ñ\n"
+        f"{NOMBRE}|01_2025|2|x\n"
+    )
+
+
+def test_latin1_y_mixta(tmp_path):
+    assert convertir(tmp_path, "A|@B\nñ|@1\n".encode("latin-1")) == (
+        "latin-1", f"nombre_archivo|mes_reporte|A|B\n{NOMBRE}|01_2025|ñ|1\n"
+    )
+    datos = "A|@B\n".encode("utf-8") + b"x|@1\n" * 20000 + "ñ|@2\n".encode("latin-1")
+    codificacion, texto = convertir(tmp_path, datos)
+    assert codificacion == "mixta"
+    assert texto.endswith(f"{NOMBRE}|01_2025|ñ|2\n")
+
+
+def test_archivo_vacio(tmp_path):
+    assert convertir(tmp_path, b"") == ("utf-8", "nombre_archivo|mes_reporte|\n")
@@ -0,0 +1,70 @@
+"""
+EspacioTemporal: cuota de disco compartida entre procesos, reservas por directorio
+y limpieza de las sesiones caídas.
+"""
+import io
+import os
+
+import pytest
+
+from repository.espacio_temporal import RESERVA_POR_BYTE, EspacioAgotado, EspacioTemporal
+
+
+def test_reservas_dentro_de_la_cuota(tmp_path):
+    espacio = EspacioTemporal(str(tmp_path), max_bytes=100)
+    directorio = espacio.crear_directorio()
+    espacio.reservar(directorio, 60)
+    with pytest.raises(EspacioAgotado):
+        espacio.reservar(directorio, 50)
+    # Una reserva que no cabe no se suma
+    assert espacio.uso() == 60
+    espacio.reservar(directorio, 40)
+    with pytest.raises(EspacioAgotado):
+        espacio.crear_directorio()
+
+
+def test_guardar_reserva_el_archivo_y_su_salida(tmp_path):
+    espacio = EspacioTemporal(str(tmp_path), max_bytes=100)
+    directorio = espacio.crear_directorio()
+    ruta = os.path.join(directorio, "entrada.csv")
+    espacio.guardar(io.BytesIO(b"x" * 10), ruta)
+    assert os.path.getsize(ruta) == 10
+    assert espacio.uso() == 10 * RESERVA_POR_BYTE
+    with pytest.raises(EspacioAgotado):
+        espacio.guardar(io.BytesIO(b"x" * 100), os.path.join(directorio, "grande.csv"))
+
+
+def test_liberar_y_retener(tmp_path):
+    espacio = EspacioTemporal(str(tmp_path), max_bytes=100)
+    liberado = espacio.crear_directorio()
+    retenido = espacio.crear_directorio()
+    espacio.reservar(liberado, 30)
+    espacio.reservar(retenido, 30)
+    espacio.liberar(liberado)
+    espacio.retener(retenido)
+    assert espacio.uso() == 0
+    assert not os.path.exists(liberado)
+    assert os.path.isdir(retenido)
+
+
+def test_cuota_compartida_entre_sesiones(tmp_path):
+    primera = EspacioTemporal(str(tmp_path), max_bytes=100)
+    segunda = EspacioTemporal(str(tmp_path), max_bytes=100)
+    primera.reservar(primera.crear_directorio(), 70)
+    assert segunda.uso() == 70
+    with pytest.raises(EspacioAgotado):
+        segunda.reservar(segunda.crear_directorio(), 40)
+
+
+def test_sesion_caida_libera_su_cuota(tmp_path):
+    caida = EspacioTemporal(str(tmp_path), max_bytes=100)
+    activa = EspacioTemporal(str(tmp_path), max_bytes=100)
+    directorio = caida.crear_directorio()
+    caida.reservar(directorio, 90)
+    # El proceso termina: se suelta el bloqueo de su sesión
+    caida._bloqueo.close()
+    assert activa.uso() == 90
+    # Al agotarse la cuota se descartan las sesiones caídas antes de negar la reserva
+    activa.reservar(activa.crear_directorio(), 50)
+    assert activa.uso() == 50
+    assert not os.path.exists(directorio)
@@ -0,0 +1,62 @@
+"""
+IndiceCatalogo: búsqueda exacta, por clave plegada y alias, y corrección
+aproximada por trigramas y distancia de edición con su auditoría y su LRU.
+"""
+import repository.indice_catalogos as indice_catalogos
+from repository.indice_catalogos import IndiceCatalogo, distancia_edicion, mismo_caso, plegar
+
+CIUDADES = ["BUCARAMANGA", "BOGOTA", "MEDELLIN", "CALI", "CARTAGENA"]
+
+
+def indice():
+    return IndiceCatalogo("ciudades", CIUDADES, {"BGTA": "BOGOTÁ"})
+
+
+def test_plegar_y_mismo_caso():
+    assert plegar("  Bogotá   D.C. ") == "bogota d.c."
+    assert mismo_caso("abc", "XyZ") == "xyz"
+    assert mismo_caso("ABC", "XyZ") == "XYZ"
+    assert mismo_caso("Abc", "XyZ") == "XyZ"
+
+
+def test_distancia_edicion_con_transposiciones_y_maximo():
+    assert distancia_edicion("abcd", "acbd", 2) == 1
+    assert distancia_edicion("impuests", "impuestos", 2) == 1
+    assert distancia_edicion("abc", "xyzw", 1) == 2
+
+
+def test_resolver_exacto_plegado_y_alias():
+    catalogo = indice()
+    assert "BOGOTA" in catalogo
+    assert catalogo.resolver("BOGOTA") == ("BOGOTA", True)
+    assert catalogo.resolver("bogotá") == ("bogota", True)
+    assert catalogo.resolver("BGTA") == ("BOGOTA", True)
+    assert not catalogo.auditoria
+
+
+def test_resolver_aproximado_queda_en_la_auditoria():
+    catalogo = indice()
+    assert catalogo.resolver("bucaramnaga") == ("bucaramanga", True)
+    assert catalogo.resolver("Bucaramnaga") == ("BUCARAMANGA", True)
+    [registro] = catalogo.auditoria
+    assert (registro["valor"], registro["canonico"], registro["distancia"]) == ("bucaramnaga", "BUCARAMANGA", 1)
+
+
+def test_sin_coincidencia_confiable():
+    catalogo = indice()
+    assert catalogo.resolver("xyz") == ("xyz", False)
+    # Una edición en cuatro letras no alcanza el umbral de confianza
+    assert catalogo.resolver("CALO") == ("CALO", False)
+
+
+def test_empate_entre_canonicos_no_se_corrige():
+    catalogo = IndiceCatalogo("palabras", ["CASA", "CAZA"], umbral=0.5)
+    assert catalogo.resolver("CAPA") == ("CAPA", False)
+
+
+def test_busquedas_aproximadas_acotadas(monkeypatch):
+    monkeypatch.setattr(indice_catalogos, "TAMANO_APROXIMADOS", 2)
+    catalogo = indice()
+    for valor in ["medelin", "bucaramnaga", "cartagna", "medelin"]:
+        catalogo.resolver(valor)
+    assert list(catalogo._aproximados) == ["cartagna", "medelin"]
@@ -0,0 +1,68 @@
+"""
+NIT: dígito de verificación de la DIAN, separación del número y su DV, limpiar_nit
+de los validadores y las variantes por columna, que coinciden valor a valor.
+"""
+import pytest
+
+from repository.nit import (
+    VACIOS_NIT_AMPLIADOS,
+    LimpiadorNit,
+    digito_verificacion,
+    dv_valido,
+    separar_nit,
+)
+
+VALORES = [
+    "800197268-4", "800197268-5", "800197268", "900.123.456-7", "NIT 800.197.268-4",
+    "C.C. 1.234.567", "12-34-56", "abc", "800197268.000000", "1234567890123456-1",
+    "null", "sin registro", " 890903938-8 ",
+]
+
+
+@pytest.mark.parametrize("nit, dv", [("800197268", 4), ("890903938", 8), ("899999068", 1)])
+def test_digito_verificacion(nit, dv):
+    assert digito_verificacion(nit) == dv
+
+
+@pytest.mark.parametrize("valor, esperado", [
+    ("900.123.456-7", ("900123456", "7")),
+    ("NIT 800197268-4", ("800197268", "4")),
+    ("C.C. 1.234.567", ("1234567", "")),
+    ("800197268.000000", ("800197268", "")),
+    # Con varios guiones solo se conserva el primer número
+    ("12-34-56", ("12", "")),
+    ("abc", ("abc", "")),
+])
+def test_separar_nit(valor, esperado):
+    assert separar_nit(valor) == esperado
+
+
+def test_dv_valido():
+    assert dv_valido("800197268-4") == "SI"
+    assert dv_valido("800197268-5") == "NO"
+    assert dv_valido("800197268") == ""
+    # Más dígitos que pesos: no se verifica
+    assert dv_valido("1234567890123456-1") == ""
+
+
+def test_limpiador_nit():
+    limpiar = LimpiadorNit()
+    assert limpiar("  123 ") == ("123", True)
+    assert limpiar("null") == ("", False)
+    assert limpiar("sin dato") == ("", False)
+    assert limpiar("NIT 800.197.268-4") == ("800197268", True)
+    assert LimpiadorNit(conservar_texto=True)("sin dato") == ("sin dato", True)
+    assert LimpiadorNit(VACIOS_NIT_AMPLIADOS)("No Aplica") == ("", False)
+
+
+def test_variantes_por_columna_coinciden_con_las_de_un_valor():
+    pd = pytest.importorskip("pandas")
+    from repository.nit import dv_valido_columna
+
+    valores = pd.Series(VALORES * 3)
+    assert dv_valido_columna(valores).tolist() == [dv_valido(valor) for valor in valores]
+    assert dv_valido_columna(valores.to_numpy(dtype=object)).tolist() == [dv_valido(valor) for valor in valores]
+
+    limpiar = LimpiadorNit(VACIOS_NIT_AMPLIADOS)
+    normalizados, validos = limpiar.columna(valores)
+    assert list(zip(normalizados.tolist(), validos.tolist())) == [limpiar(valor) for valor in valores]
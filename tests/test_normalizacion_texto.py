@@ -0,0 +1,64 @@
+"""
+Normalización de texto: quitar_tildes equivale a NFKD + ASCII, los encabezados se
+normalizan con un memo acotado y las variantes *_columna conservan los nulos.
+"""
+import unicodedata
+
+import pytest
+
+import repository.normalizacion_texto as normalizacion_texto
+from repository.normalizacion_texto import (
+    NORMALIZAR_ENCABEZADO,
+    NORMALIZAR_ENCABEZADO_CON_BARRA,
+    NormalizadorEncabezados,
+    limpiar_cadena,
+    normalizar_cadena,
+    quitar_tildes,
+)
+
+
+def nfkd_ascii(valor):
+    return unicodedata.normalize('NFKD', valor).encode('ASCII', 'ignore').decode('ASCII')
+
+
+@pytest.mark.parametrize("valor", [
+    "".join(map(chr, range(256))),
+    "Bogotá D.C. ½",
+    "ŁÓDŹ 北京 ﬁ Ω",
+    "NIÑO pingüino",
+])
+def test_quitar_tildes_equivale_a_nfkd(valor):
+    assert quitar_tildes(valor) == nfkd_ascii(valor)
+
+
+def test_normalizar_y_limpiar_cadena():
+    assert normalizar_cadena("  Medellín ") == "Medellin"
+    assert normalizar_cadena("") == ""
+    assert limpiar_cadena(" 1.234,5 Café ") == "12345 Cafe"
+
+
+def test_normalizar_encabezados():
+    assert NORMALIZAR_ENCABEZADO(" Fecha de Radicación ") == "FECHA_DE_RADICACION"
+    assert NORMALIZAR_ENCABEZADO("Núm. doc-id/año") == "NUM_DOC_ID/ANO"
+    assert NORMALIZAR_ENCABEZADO_CON_BARRA("Núm. doc-id/año") == "NUM_DOC_ID_ANO"
+
+
+def test_memo_de_encabezados_acotado(monkeypatch):
+    monkeypatch.setattr(normalizacion_texto, "MAX_ENCABEZADOS_MEMO", 2)
+    normalizador = NormalizadorEncabezados({' ': '_'})
+    for nombre in ["a b", "c d", "e f"]:
+        normalizador(nombre)
+    assert normalizador._memo == {"e f": "E_F"}
+
+
+def test_variantes_por_columna_conservan_nulos():
+    pd = pytest.importorskip("pandas")
+    from repository.normalizacion_texto import limpiar_cadena_columna, quitar_tildes_columna
+
+    valores = pd.Series(["Bogotá", None, "Bogotá", " 1.2 "], name="ciudad")
+    resultado = quitar_tildes_columna(valores)
+    assert resultado.isna().tolist() == [False, True, False, False]
+    assert resultado.dropna().tolist() == ["Bogota", "Bogota", " 1.2 "]
+    resultado = limpiar_cadena_columna(valores)
+    assert resultado.dropna().tolist() == ["Bogota", "Bogota", "12"]
+    assert resultado.name == "ciudad"
@@ -0,0 +1,91 @@
+"""
+Lectura de los CSV de entrada de BaseCSVProcessor (pipe_tokenizer con PipeDialect
+y tokenizadores propios) y plan de columnas (ColumnPlan): validación por columna y
+reorganización de la salida según REFERENCE_HEADERS y REPLACEMENT_MAP.
+"""
+import csv
+import io
+
+from repository.procesador_csv import BaseCSVProcessor, pipe_tokenizer
+
+
+def tokenizar(texto: str):
+    return list(pipe_tokenizer(io.StringIO(texto, newline='')))
+
+
+def test_campos_entre_comillas_con_separador_y_salto_de_linea():
+    assert tokenizar('a|"b|c"|d\n"x\ny"|2\n') == [['a', 'b|c', 'd'], ['x\ny', '2']]
+
+
+def test_comillas_dobles_dentro_de_un_campo():
+    assert tokenizar('"dijo ""hola"""|z\n') == [['dijo "hola"', 'z']]
+
+
+def test_salto_de_linea_literal_se_convierte_en_salto_real():
+    assert tokenizar('a\\nb|c\n') == [['a\nb', 'c']]
+    assert tokenizar('a\\\\nb|c\n') == [['a\nb', 'c']]
+
+
+def test_separador_escapado():
+    assert tokenizar('a\\|b|c\n') == [['a|b', 'c']]
+
+
+def test_tokenizador_propio(tmp_path):
+    ruta = tmp_path / "entrada.csv"
+    ruta.write_text("A;B\n1;2\n", encoding="utf-8")
+
+    def punto_y_coma(f):
+        return (linea.rstrip('\n').split(';') for linea in f)
+
+    assert BaseCSVProcessor(tokenizer=punto_y_coma).read_csv(str(ruta)) == (['A', 'B'], [['1', '2']])
+
+
+class Validador:
+    def validar_entero(self, valor):
+        return (valor, True) if valor.isdigit() else ("", False)
+
+
+class Procesador(BaseCSVProcessor):
+    REFERENCE_HEADERS = ["ID", "NOMBRE", "CIUDAD"]
+    REPLACEMENT_MAP = {"NOMBRE_COMPLETO": "NOMBRE"}
+    VALIDATION_METHODS = {"int": ("validar_entero", "entero")}
+    ERROR_MESSAGES = {"entero": "No es un entero"}
+    QUOTING = csv.QUOTE_MINIMAL
+
+
+def test_plan_de_columnas():
+    procesador = Procesador(Validador(), check_digit=True)
+    header = ["Nombre completo", "Extra", "Id", "Nit"]
+    type_mapping = {"int": [3], "nit": [4]}
+    salida = procesador.output_headers(header, type_mapping)
+    assert salida == ["ID", "NOMBRE", "EXTRA", "NIT", "DV_VALIDO"]
+
+    plan = procesador.build_column_plan(header, salida, type_mapping)
+    # CIUDAD no está en el archivo: organize_headers la omite. DV_VALIDO va
+    # después de la columna vacía (n_cols)
+    assert plan.output_index == [2, 0, 1, 3, 5]
+    assert plan.n_cols == 4
+    assert plan.check_digits == [3]
+    [(idx, _, columna, tipo, mensaje)] = plan.checks
+    assert (idx, columna, tipo, mensaje) == (2, "Id", "int", "No es un entero")
+
+
+def test_plan_con_columna_de_referencia_ausente():
+    procesador = Procesador(Validador())
+    header = ["Id", "Nombre"]
+    plan = procesador.build_column_plan(header, ["CIUDAD", "NOMBRE", "ID"], {"int": [1]})
+    # Las columnas sin origen apuntan a la columna vacía (n_cols)
+    assert plan.output_index == [2, 1, 0]
+
+
+def test_process_csv_reorganiza_y_reporta_errores(tmp_path):
+    entrada = tmp_path / "entrada.csv"
+    entrada.write_text("Nombre completo|Id\nAna|1\nLuis|x\nnull|3\n", encoding="utf-8")
+    salida = tmp_path / "salida.csv"
+    errores = tmp_path / "errores.csv"
+    Procesador(Validador()).process_csv(str(entrada), str(salida), str(errores), {"int": [2]})
+
+    assert salida.read_text(encoding="utf-8").splitlines() == ["ID|NOMBRE", "1|Ana", "|Luis", "3|"]
+    with open(errores, newline="", encoding="utf-8") as f:
+        [error] = list(csv.DictReader(f))
+    assert (error["columna"], error["valor"], error["fila"], error["error"]) == ("Id", "x", "2", "No es un entero")
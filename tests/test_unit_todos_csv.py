@@ -0,0 +1,48 @@
+"""
+Unión en streaming de CSV separados por '|' (bloques_csv_unido): esquema con la
+unión de columnas en orden de aparición, nulos y '.0' como en pandas y conteo de
+filas por archivo.
+"""
+import pytest
+
+from repository.unit_todos_csv import bloques_csv_unido, leer_cabecera, nombres_columnas
+
+
+def escribir(ruta, texto):
+    ruta.write_text(texto, encoding="utf-8")
+    return str(ruta)
+
+
+def test_nombres_columnas_como_pandas():
+    assert nombres_columnas(["A", "", "A", "A.1", "A"]) == ["A", "Unnamed: 1", "A.1", "A.1.1", "A.2"]
+
+
+def test_union_de_columnas_en_orden_de_aparicion(tmp_path):
+    primero = escribir(tmp_path / "a.csv", "A|B\n1|2.0\nNULL|x\n")
+    segundo = escribir(tmp_path / "b.csv", "C|A\n3|4\n\n")
+    conteo = {}
+    texto = "".join(bloques_csv_unido([primero, segundo], filas_por_bloque=1, conteo=conteo))
+    assert texto.splitlines() == ["A|B|C", "1|2|", "|x|", "4||3"]
+    assert conteo == {primero: 2, segundo: 1}
+
+
+def test_union_coincide_con_pandas(tmp_path):
+    pd = pytest.importorskip("pandas")
+    primero = escribir(tmp_path / "a.csv", "A|B\n1|2.0\nNULL|x\nn/a|7\n")
+    segundo = escribir(tmp_path / "b.csv", "C|A|A\n3|4|5\n")
+    rutas = [primero, segundo]
+    esperado = pd.concat([pd.read_csv(ruta, sep="|", dtype=str) for ruta in rutas], ignore_index=True)
+    esperado = esperado.apply(lambda columna: columna.str.replace(r"\.0$", "", regex=True)).fillna("")
+    esperado_texto = esperado.to_csv(sep="|", index=False, lineterminator="\n")
+    assert "".join(bloques_csv_unido(rutas)) == esperado_texto
+
+
+def test_fila_con_campos_de_mas(tmp_path):
+    ruta = escribir(tmp_path / "a.csv", "A|B\n1|2|3\n")
+    with pytest.raises(ValueError, match="se esperaban 2"):
+        list(bloques_csv_unido([ruta]))
+
+
+def test_archivo_sin_cabecera(tmp_path):
+    with pytest.raises(ValueError):
+        leer_cabecera(escribir(tmp_path / "vacio.csv", ""))
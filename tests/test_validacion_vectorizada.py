@@ -0,0 +1,55 @@
+"""
+El motor por bloques (process_csv con batch_size) produce los mismos archivos de
+salida y de errores que la ruta celda a celda, en todos los proyectos y, con
+ellos, en todos los tipos de VALIDATION_METHODS.
+
+Cada proyecto corre en su propio proceso: todos importan módulos con los mismos
+nombres (validadores, valores_choice).
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip("pandas")
+
+from benchmarks.proyectos import PROYECTOS, RAIZ  # noqa: E402
+
+PROYECTOS_CSV_PROCESSOR = sorted(nombre for nombre, proyecto in PROYECTOS.items() if proyecto.validador)
+FILAS = 1500
+BATCH_SIZE = 200
+
+
+def procesar(nombre: str, directorio: str) -> None:
+    """Genera la entrada del proyecto y la procesa celda a celda y por bloques (en el proceso hijo)."""
+    from benchmarks.generadores import cargar_proyecto, catalogos, generar_csv, tipos_columnas
+    from benchmarks.proyectos import encabezados, type_mapping
+
+    proyecto = PROYECTOS[nombre]
+    modulo, validador = cargar_proyecto(proyecto)
+    columnas = encabezados(proyecto)
+    mapping = type_mapping(proyecto)
+    tipos = tipos_columnas(columnas, mapping)
+    entrada = os.path.join(directorio, "entrada.csv")
+    generar_csv(entrada, columnas, tipos, FILAS, catalogos(modulo, validador, set(tipos)), semilla=7, suciedad=0.3)
+    with open(entrada, "a", encoding="utf-8") as f:
+        # Nulos con espacios, una fila corta y una con campos de más
+        f.write("|".join([" NULL ", "nan", " N/A "] + ["x"] * (len(columnas) - 3)) + "\n")
+        f.write("solo|dos\n")
+        f.write("|".join(["y"] * (len(columnas) + 2)) + "\n")
+    for modo, batch_size in (("celda", None), ("bloque", BATCH_SIZE)):
+        modulo.CSVProcessor(validator=validador, check_digit=True).process_csv(
+            entrada, os.path.join(directorio, f"salida_{modo}.csv"),
+            os.path.join(directorio, f"errores_{modo}.csv"), mapping, batch_size=batch_size)
+
+
+@pytest.mark.parametrize("nombre", PROYECTOS_CSV_PROCESSOR)
+def test_bloques_igual_a_celda_a_celda(nombre, tmp_path):
+    codigo = f"import sys; sys.path.insert(0, {RAIZ!r}); from tests.test_validacion_vectorizada import procesar; procesar(*sys.argv[1:])"
+    proceso = subprocess.run([sys.executable, "-c", codigo, nombre, str(tmp_path)], capture_output=True, text=True)
+    assert proceso.returncode == 0, proceso.stderr
+    for archivo in ("salida", "errores"):
+        celda = (tmp_path / f"{archivo}_celda.csv").read_bytes()
+        assert celda, archivo
+        assert (tmp_path / f"{archivo}_bloque.csv").read_bytes() == celda, archivo